@@ -0,0 +1,127 @@
+"""
+Gemeinsame Hilfsfunktionen der Benchmarks in diesem Verzeichnis.
+
+Die Benchmarks löschen alle Tabellen und legen synthetische Daten an. Sie laufen deshalb nie
+gegen die Datenbank aus .env, sondern gegen BENCH_DATABASE_URI (Standard: eine Wegwerf-SQLite-
+Datei im Temp-Verzeichnis). Für PostgreSQL z.B.:
+    BENCH_DATABASE_URI=postgresql+asyncpg://user:pw@localhost/tracker_bench python benchmarks/bench_indexes.py
+"""
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta, timezone
+
+BENCH_DATABASE_URI = os.environ.get('BENCH_DATABASE_URI') or (
+    f"sqlite+aiosqlite:///{os.path.join(tempfile.gettempdir(), 'tracker_bench.db')}"
+)
+# Muss vor dem ersten Import von tracker.* gesetzt sein, die Engine entsteht beim Import
+os.environ['SQLALCHEMY_DATABASE_URI'] = BENCH_DATABASE_URI
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import insert  # noqa: E402
+
+from tracker.database import engine, AsyncSessionLocal, create_extensions  # noqa: E402
+from tracker.models import base_model, entity_models, user_models, sync_models, rollup_models  # noqa: E402,F401
+
+
+def parse_sizes(value: str) -> list[int]:
+    """'1000,10k,1M' -> [1000, 10000, 1000000]"""
+    factors = {'k': 1_000, 'm': 1_000_000}
+    sizes = []
+    for part in value.split(','):
+        part = part.strip().lower()
+        sizes.append(int(float(part[:-1]) * factors[part[-1]]) if part[-1] in factors else int(part))
+    return sizes
+
+
+async def reset_database() -> None:
+    async with engine.begin() as conn:
+        await conn.run_sync(base_model.Base.metadata.drop_all)
+        await conn.run_sync(create_extensions)
+        await conn.run_sync(base_model.Base.metadata.create_all)
+
+
+async def add_user(db, email: str, **profile) -> int:
+    # Der Hash wird in keinem Benchmark geprüft
+    user_id = await db.scalar(
+        insert(user_models.User).values(email=email, password_hash='-').returning(user_models.User.user_id)
+    )
+    await db.execute(insert(user_models.UserProfile).values(user_id=user_id, **profile))
+    return user_id
+
+
+async def add_foods(db, user_id: int, count: int, rng: random.Random, **columns) -> list[int]:
+    rows = [
+        {'user_id': user_id, 'name': f"Food {i:06d}", 'calories_kcal': rng.randint(20, 900),
+         'protein_g': round(rng.uniform(0, 30), 1), 'carbs_total_g': round(rng.uniform(0, 80), 1),
+         'fat_total_g': round(rng.uniform(0, 40), 1), **columns}
+        for i in range(count)
+    ]
+    return list(await db.scalars(insert(entity_models.Food).returning(entity_models.Food.id), rows))
+
+
+async def add_exercise_types(db, user_id: int, count: int, rng: random.Random) -> list[int]:
+    rows = [
+        {'user_id': user_id, 'name': f"Exercise {i:04d}", 'calories_per_hour': rng.randint(150, 900)}
+        for i in range(count)
+    ]
+    return list(await db.scalars(insert(entity_models.ExerciseType).returning(entity_models.ExerciseType.id), rows))
+
+
+def _log_dates(count: int, days: int, rng: random.Random):
+    end = datetime.now(timezone.utc)
+    return (end - timedelta(seconds=rng.randrange(days * 86400)) for _ in range(count))
+
+
+async def add_logs(db, user_id: int, log_model, parent_ids: list[int], count: int, rng: random.Random,
+                   days: int = 365, batch_size: int = 10_000) -> None:
+    """`count` Logs auf die letzten `days` Tage verteilt (Konsum- oder Aktivitäts-Logs)."""
+    if log_model is entity_models.ConsumptionLog:
+        def row(log_date):
+            return {'user_id': user_id, 'food_id': rng.choice(parent_ids), 'amount_g': rng.randint(10, 500),
+                    'log_date': log_date}
+    else:
+        def row(log_date):
+            return {'user_id': user_id, 'exercise_type_id': rng.choice(parent_ids),
+                    'duration_min': rng.randint(10, 120), 'log_date': log_date}
+
+    rows = [row(log_date) for log_date in _log_dates(count, days, rng)]
+    for offset in range(0, len(rows), batch_size):
+        await db.execute(insert(log_model), rows[offset:offset + batch_size])
+
+
+def summarize(timings: list[float]) -> str:
+    """Median und p95 einer Liste von Laufzeiten (Sekunden) in Millisekunden."""
+    ordered = sorted(timings)
+    p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+    return f"median {statistics.median(ordered) * 1000:9.2f} ms   p95 {p95 * 1000:9.2f} ms"
+
+
+async def measure_async(func, repeat: int) -> list[float]:
+    """Laufzeiten von `repeat` Aufrufen der Coroutine-Funktion `func` (nach einem Aufwärmlauf)."""
+    await func()
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        await func()
+        timings.append(time.perf_counter() - started)
+    return timings
+
+
+def measure(func, repeat: int) -> list[float]:
+    func()
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    return timings
+
+
+__all__ = [
+    'BENCH_DATABASE_URI', 'engine', 'AsyncSessionLocal', 'parse_sizes', 'reset_database', 'add_user',
+    'add_foods', 'add_exercise_types', 'add_logs', 'summarize', 'measure_async', 'measure',
+]
@@ -0,0 +1,112 @@
+"""
+Benchmark der Food-Suche (GET /api/foods/search) auf großen Katalogen: Latenz von
+catalog_crud.search_foods für typische Eingaben im Food-Picker (2-6 Zeichen eines Namens).
+
+Pro Größe werden zwei Benutzer mit je `size` Foods angelegt (der zweite nur, damit der
+user_id-Filter wirklich filtern muss). Die Namen werden aus Wortteilen zusammengesetzt
+("Bio Apfelsaft 1234"), damit Präfixe und Trigramme realistisch viele Treffer haben.
+Für einen Teil der Foods gibt es Logs, das Nutzungs-Ranking (CatalogUsage) wird per
+rollup_crud.rebuild aufgebaut und fließt wie in der App in die Sortierung ein.
+
+Ziel: p99 unter `--target-ms` (Standard 20 ms) bei 100k Foods.
+SQLite prüft nur Präfix-Treffer über ix_foods_user_id_casefold_name, PostgreSQL die
+Trigramm-Suche über ix_foods_user_id_name_trgm (siehe _common.BENCH_DATABASE_URI).
+
+Aufruf (im Verzeichnis V6_fastAPI_frontend_improved):
+    python benchmarks/bench_food_search.py
+    python benchmarks/bench_food_search.py --sizes 10k,100k --repeat 500
+"""
+import argparse
+import asyncio
+import itertools
+import random
+import sys
+
+from _common import (
+    AsyncSessionLocal, BENCH_DATABASE_URI, add_logs, add_user, engine, measure_async, parse_sizes,
+    reset_database, summarize,
+)
+from sqlalchemy import insert
+
+from tracker.crud import catalog_crud, rollup_crud
+from tracker.models.entity_models import ConsumptionLog, Food
+
+PREFIXES = ("", "", "", "Bio ", "Frische ", "Vollkorn ", "Gefrorene ", "Hausgemachte ")
+STEMS = (
+    "Apfel", "Banane", "Birne", "Brot", "Butter", "Erdbeer", "Haferflocken", "Joghurt", "Käse", "Kartoffel",
+    "Linsen", "Müsli", "Nudel", "Orangen", "Paprika", "Quark", "Reis", "Schinken", "Tomaten", "Öl",
+)
+SUFFIXES = ("", "saft", "kuchen", "suppe", "salat", "aufstrich", "chips", "brei")
+
+
+def _names(count: int, rng: random.Random) -> list[str]:
+    return [f"{rng.choice(PREFIXES)}{rng.choice(STEMS)}{rng.choice(SUFFIXES)} {i}" for i in range(count)]
+
+
+def _queries(names: list[str], count: int, rng: random.Random) -> list[str]:
+    """Anfänge zufälliger Namen, wie sie beim Tippen im Picker entstehen."""
+    return [name[:rng.randint(2, 6)] for name in rng.sample(names, min(count, len(names)))]
+
+
+async def _populate(size: int, logs: int, rng: random.Random) -> tuple[int, list[str]]:
+    async with AsyncSessionLocal() as db:
+        user_ids, catalogs = [], []
+        for n in range(2):
+            user_id = await add_user(db, f"bench{n}@example.com")
+            names = _names(size, rng)
+            catalogs.append(names)
+            rows = [{'user_id': user_id, 'name': name, 'calories_kcal': rng.randint(20, 900)} for name in names]
+            food_ids = []
+            for offset in range(0, len(rows), 5_000):
+                food_ids += await db.scalars(insert(Food).returning(Food.id), rows[offset:offset + 5_000])
+            # Nur ein Teil des Katalogs wird tatsächlich gegessen
+            await add_logs(db, user_id, ConsumptionLog, rng.sample(food_ids, max(1, size // 20)), logs, rng)
+            await rollup_crud.rebuild(db, user_id)
+            user_ids.append(user_id)
+        await db.commit()
+    async with engine.begin() as conn:
+        await conn.exec_driver_sql("ANALYZE")
+    # Gesucht wird im Katalog des ersten Benutzers
+    return user_ids[0], catalogs[0]
+
+
+def _p99(timings: list[float]) -> float:
+    ordered = sorted(timings)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))] * 1000
+
+
+async def run(args) -> int:
+    rng = random.Random(42)
+    print(f"database: {BENCH_DATABASE_URI}")
+    print(f"{args.logs:,} logs per user, limit {args.limit}, target p99 < {args.target_ms} ms")
+    for size in args.sizes:
+        await reset_database()
+        user_id, names = await _populate(size, args.logs, rng)
+        queries = itertools.cycle(_queries(names, args.repeat + 1, rng))
+
+        async def search():
+            async with AsyncSessionLocal() as db:
+                await catalog_crud.search_foods(db, user_id=user_id, q=next(queries), limit=args.limit)
+
+        timings = await measure_async(search, args.repeat)
+        p99 = _p99(timings)
+        verdict = "ok" if p99 < args.target_ms else "over target"
+        print(f"\n{size:,} foods per user")
+        print(f"  search  {summarize(timings)}   p99 {p99:9.2f} ms  ({verdict})")
+    await engine.dispose()
+    return 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Food search latency vs. catalog size")
+    parser.add_argument('--sizes', type=parse_sizes, default=parse_sizes('1k,10k,100k'),
+                        help="Foods pro Benutzer, kommagetrennt (Standard: 1k,10k,100k)")
+    parser.add_argument('--logs', type=lambda value: parse_sizes(value)[0], default=20_000, help="Konsum-Logs pro Benutzer")
+    parser.add_argument('--limit', type=int, default=20, help="Treffer pro Suche (wie im Picker)")
+    parser.add_argument('--repeat', type=int, default=300)
+    parser.add_argument('--target-ms', type=float, default=20.0)
+    return asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,112 @@
+"""
+Benchmark der zusammengesetzten Indizes (user_id, log_date) bzw. (user_id, name):
+Latenz der Listen- und Zeitraum-Abfragen in Abhängigkeit von der Tabellengröße,
+jeweils mit und ohne die Indizes.
+
+Pro Größe werden zwei Benutzer mit je `size` Konsum-Logs angelegt (der zweite nur, damit
+der user_id-Filter wirklich filtern muss). Gemessen wird für den ersten Benutzer:
+  - erste Seite der Logs (GET /api/consumption_logs, limit 100)
+  - erste Seite des Food-Katalogs (GET /api/foods, limit 100)
+  - Summe über 7 Tage (Zeitraum-Filter wie in den Dashboard-Detailabfragen)
+Danach werden die Indizes gelöscht, erneut gemessen und über create_missing_indexes()
+wieder angelegt (derselbe Weg wie beim Start für bestehende Datenbanken).
+
+Aufruf (im Verzeichnis V6_fastAPI_frontend_improved):
+    python benchmarks/bench_indexes.py
+    python benchmarks/bench_indexes.py --sizes 1k,10k,100k,1M --repeat 50
+"""
+import argparse
+import asyncio
+import random
+import sys
+from datetime import datetime, timedelta, timezone
+
+from _common import (
+    AsyncSessionLocal, BENCH_DATABASE_URI, add_foods, add_logs, add_user, engine, measure_async,
+    parse_sizes, reset_database, summarize,
+)
+from sqlalchemy import func, select
+
+from tracker.crud import entity_crud
+from tracker.database import create_missing_indexes
+from tracker.models.entity_models import ConsumptionLog, Food
+
+BENCHMARKED_INDEXES = ('ix_consumptionlogs_user_id_log_date', 'ix_foods_user_id_name')
+
+
+async def _populate(size: int, foods: int, rng: random.Random) -> int:
+    async with AsyncSessionLocal() as db:
+        user_ids = []
+        for n in range(2):
+            user_id = await add_user(db, f"bench{n}@example.com")
+            food_ids = await add_foods(db, user_id, foods, rng)
+            await add_logs(db, user_id, ConsumptionLog, food_ids, size, rng)
+            user_ids.append(user_id)
+        await db.commit()
+    async with engine.begin() as conn:
+        await conn.exec_driver_sql("ANALYZE")
+    return user_ids[0]
+
+
+async def _measure(user_id: int, repeat: int) -> dict[str, list[float]]:
+    now = datetime.now(timezone.utc)
+
+    async def logs_page():
+        async with AsyncSessionLocal() as db:
+            await entity_crud.get_items_page(db, user_id=user_id, model_class=ConsumptionLog, limit=100)
+
+    async def foods_page():
+        async with AsyncSessionLocal() as db:
+            await entity_crud.get_items_page(db, user_id=user_id, model_class=Food, limit=100)
+
+    async def week_range():
+        async with AsyncSessionLocal() as db:
+            await db.execute(
+                select(func.count(), func.sum(ConsumptionLog.amount_g)).where(
+                    ConsumptionLog.user_id == user_id,
+                    ConsumptionLog.log_date >= now - timedelta(days=7),
+                    ConsumptionLog.log_date < now,
+                )
+            )
+
+    return {
+        'logs page': await measure_async(logs_page, repeat),
+        'foods page': await measure_async(foods_page, repeat),
+        '7-day range': await measure_async(week_range, repeat),
+    }
+
+
+async def run(args) -> int:
+    print(f"Database: {BENCH_DATABASE_URI}")
+    rng = random.Random(42)
+    for size in args.sizes:
+        await reset_database()
+        user_id = await _populate(size, args.foods, rng)
+
+        with_indexes = await _measure(user_id, args.repeat)
+        async with engine.begin() as conn:
+            for name in BENCHMARKED_INDEXES:
+                await conn.exec_driver_sql(f"DROP INDEX {name}")
+        without_indexes = await _measure(user_id, args.repeat)
+        async with engine.begin() as conn:
+            await conn.run_sync(create_missing_indexes)
+
+        print(f"\n{size:,} logs per user ({args.foods} foods)")
+        for label in with_indexes:
+            print(f"  {label:12} without index: {summarize(without_indexes[label])}")
+            print(f"  {'':12} with index:    {summarize(with_indexes[label])}")
+    await engine.dispose()
+    return 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Query latency vs. table size with and without composite indexes")
+    parser.add_argument('--sizes', type=parse_sizes, default=parse_sizes('1k,10k,100k'),
+                        help="Logs pro Benutzer, kommagetrennt (Standard: 1k,10k,100k)")
+    parser.add_argument('--foods', type=int, default=2000, help="Foods pro Benutzer")
+    parser.add_argument('--repeat', type=int, default=20)
+    return asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,127 @@
+"""
+Benchmark der Nährstoff-Summen (GET /api/nutrients) auf einem großen synthetischen Food-Katalog:
+  - sql:    nutrient_service.get_nutrient_totals, eine Abfrage (Gramm pro Food, dann json(b)_each)
+  - python: Logs samt Food-Dokumenten laden und in Python summieren (Referenz, prüft das Ergebnis)
+
+Pro Katalog-Größe werden `size` Foods mit je `--keys` numerischen Schlüsseln (verteilt auf
+vitamins, minerals, other_compounds, dazu ein Text-Wert, der übersprungen werden muss) und
+`--logs` Konsum-Logs über ein Jahr angelegt. Gemessen wird für die letzten `--days` Tage.
+
+Aufruf (im Verzeichnis V6_fastAPI_frontend_improved):
+    python benchmarks/bench_nutrients.py
+    python benchmarks/bench_nutrients.py --foods 1k,20k,100k --keys 25 --logs 100k --days 7,365
+"""
+import argparse
+import asyncio
+import math
+import random
+import sys
+from collections import defaultdict
+from datetime import date, datetime, timedelta, timezone
+
+from _common import (
+    AsyncSessionLocal, BENCH_DATABASE_URI, add_logs, add_user, engine, measure_async, parse_sizes,
+    reset_database, summarize,
+)
+from sqlalchemy import insert, select
+
+from tracker.models.entity_models import ConsumptionLog, Food
+from tracker.models.rollup_models import utc_range
+from tracker.services import nutrient_service
+from tracker.services.nutrient_service import DOCUMENT_FIELDS, MACRO_FIELDS
+
+
+def _documents(keys: int, rng: random.Random) -> dict:
+    documents = {field: {} for field in DOCUMENT_FIELDS}
+    for k in range(keys):
+        documents[DOCUMENT_FIELDS[k % len(DOCUMENT_FIELDS)]][f"n{k:02d}"] = round(rng.uniform(0, 50), 3)
+    documents['other_compounds']['source'] = "synthetic"
+    return documents
+
+
+async def _populate(foods: int, keys: int, logs: int, rng: random.Random) -> int:
+    async with AsyncSessionLocal() as db:
+        user_id = await add_user(db, "bench@example.com")
+        rows = [
+            {'user_id': user_id, 'name': f"Food {i:06d}", 'calories_kcal': rng.randint(20, 900),
+             'protein_g': round(rng.uniform(0, 30), 1), 'fat_total_g': round(rng.uniform(0, 40), 1),
+             **_documents(keys, rng)}
+            for i in range(foods)
+        ]
+        food_ids = []
+        for offset in range(0, len(rows), 5_000):
+            food_ids += await db.scalars(insert(Food).returning(Food.id), rows[offset:offset + 5_000])
+        await add_logs(db, user_id, ConsumptionLog, food_ids, logs, rng)
+        await db.commit()
+    return user_id
+
+
+async def python_totals(db, user_id: int, start_day: date, end_day: date) -> dict:
+    start, end = utc_range(start_day, end_day)
+    columns = [getattr(Food, field) for field in (*MACRO_FIELDS, *DOCUMENT_FIELDS)]
+    result = await db.execute(
+        select(ConsumptionLog.amount_g, *columns)
+        .join(Food, ConsumptionLog.food_id == Food.id)
+        .where(ConsumptionLog.user_id == user_id, ConsumptionLog.log_date >= start, ConsumptionLog.log_date < end)
+    )
+    sums = {group: defaultdict(float) for group in ('macros', *DOCUMENT_FIELDS)}
+    for amount_g, *values in result.all():
+        factor = amount_g / 100.0
+        macros = dict(zip(MACRO_FIELDS, values[:len(MACRO_FIELDS)]))
+        for group, document in (('macros', macros), *zip(DOCUMENT_FIELDS, values[len(MACRO_FIELDS):])):
+            for key, value in (document or {}).items():
+                if isinstance(value, (int, float)) and not isinstance(value, bool):
+                    sums[group][key] += factor * value
+    return {group: {key: round(total, 2) for key, total in values.items()} for group, values in sums.items()}
+
+
+def _same_totals(sql: dict, python: dict) -> bool:
+    for group in ('macros', *DOCUMENT_FIELDS):
+        if sql[group].keys() != python[group].keys():
+            return False
+        if not all(math.isclose(sql[group][key], python[group][key], abs_tol=0.05) for key in sql[group]):
+            return False
+    return True
+
+
+async def run(args) -> int:
+    rng = random.Random(42)
+    today = datetime.now(timezone.utc).date()
+    print(f"database: {BENCH_DATABASE_URI}")
+    print(f"{args.keys} keys per food, {args.logs:,} logs over 365 days")
+    for foods in args.foods:
+        await reset_database()
+        user_id = await _populate(foods, args.keys, args.logs, rng)
+        print(f"\n{foods:,} foods")
+        for days in args.days:
+            start_day = today - timedelta(days=days - 1)
+            async with AsyncSessionLocal() as db:
+                sql = await nutrient_service.get_nutrient_totals(db, user_id, start_day, today)
+                assert _same_totals(sql, await python_totals(db, user_id, start_day, today))
+
+            async def via_sql():
+                async with AsyncSessionLocal() as db:
+                    await nutrient_service.get_nutrient_totals(db, user_id, start_day, today)
+
+            async def via_python():
+                async with AsyncSessionLocal() as db:
+                    await python_totals(db, user_id, start_day, today)
+
+            for name, path in (('sql', via_sql), ('python', via_python)):
+                print(f"  {days:>3} days  {name:7} {summarize(await measure_async(path, args.repeat))}")
+    await engine.dispose()
+    return 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Nutrient totals: single SQL statement vs. summing in Python")
+    parser.add_argument('--foods', type=parse_sizes, default=parse_sizes('1k,20k,100k'))
+    parser.add_argument('--keys', type=int, default=25, help="Numerische Schlüssel pro Food (über alle Dokumente)")
+    parser.add_argument('--logs', type=lambda value: parse_sizes(value)[0], default=100_000, help="Konsum-Logs insgesamt")
+    parser.add_argument('--days', type=lambda value: [int(v) for v in value.split(',')], default=[7, 365])
+    parser.add_argument('--repeat', type=int, default=5)
+    return asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,72 @@
+"""
+Misst den Login-Durchsatz (bcrypt-Verify über den PasswordHashPool) für verschiedene
+Kostenfaktoren, als Grundlage für BCRYPT_ROUNDS. Pro Faktor werden `--repeat` Mal je `--logins`
+Verifies gleichzeitig in den Pool gegeben, gemessen wird wie im Login-Request über hash_pool.run().
+"pro Kern" ist der Durchsatz (aus dem Median) geteilt durch die Anzahl der Worker (je Worker ein Kern).
+
+Aufruf (im Verzeichnis V6_fastAPI_frontend_improved):
+    python benchmarks/bench_password_hash.py
+    python benchmarks/bench_password_hash.py --rounds 10,11,12,13 --workers 4 --executor process
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+
+from _common import measure, measure_async, parse_sizes, summarize
+from passlib.context import CryptContext
+
+from tracker.auth.hash_pool import PasswordHashPool
+from tracker.config import settings
+
+PASSWORD = "correct horse battery staple"
+# Wie security.pwd_context; beim Verify liest passlib den Kostenfaktor aus dem Hash selbst
+verify_context = CryptContext(schemes=["bcrypt"])
+
+
+def verify(password: str, hashed_password: str) -> bool:
+    return verify_context.verify(password, hashed_password)
+
+
+async def run(args) -> int:
+    print(f"executor: {args.executor}, workers: {args.workers}, {args.logins} concurrent logins x {args.repeat} "
+          f"(configured BCRYPT_ROUNDS: {settings.BCRYPT_ROUNDS})")
+    for rounds in args.rounds:
+        hashed_password = CryptContext(schemes=["bcrypt"], bcrypt__rounds=rounds).hash(PASSWORD)
+        single = measure(lambda: verify(PASSWORD, hashed_password), args.repeat)
+
+        # Warteschlange groß genug, damit kein Verify mit 503 abgelehnt wird
+        pool = PasswordHashPool(args.executor, args.workers, args.logins, retry_after=1)
+
+        async def logins():
+            results = await asyncio.gather(*(pool.run(verify, PASSWORD, hashed_password) for _ in range(args.logins)))
+            assert all(results)
+
+        try:
+            # Der Aufwärmlauf von measure_async startet den Pool (bzw. die Prozesse)
+            batches = await measure_async(logins, args.repeat)
+            avg_latency_ms = pool.stats()['avg_latency_ms']
+        finally:
+            pool.shutdown()
+        throughput = args.logins / statistics.median(batches)
+        print(f"\nrounds {rounds}: {throughput:.1f} logins/s, {throughput / args.workers:.1f} per core, "
+              f"avg latency in pool {avg_latency_ms:.0f} ms")
+        print(f"  single verify    {summarize(single)}")
+        print(f"  {args.logins:>4} logins     {summarize(batches)}")
+    return 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="bcrypt login throughput per core for each cost factor")
+    parser.add_argument('--rounds', type=parse_sizes, default=[10, 11, 12, 13])
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help="Standard: Anzahl der Kerne")
+    parser.add_argument('--executor', choices=['thread', 'process'], default=settings.PASSWORD_HASH_EXECUTOR)
+    parser.add_argument('--logins', type=lambda value: parse_sizes(value)[0], default=40,
+                        help="Gleichzeitige Verifies pro Messung")
+    parser.add_argument('--repeat', type=int, default=3)
+    return asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == '__main__':
+    sys.exit(main())
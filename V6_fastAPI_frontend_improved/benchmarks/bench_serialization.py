@@ -0,0 +1,83 @@
+"""
+Benchmark der Serialisierung großer Listen-Antworten (GET /api/{entity_name}, /api/tracking-data):
+  - response_model: wie FastAPI 0.115 (requirements.txt) ein response_model ausliefert:
+                    Validierung der ORM-Objekte, dump_python(mode='json'), dann json.dumps in JSONResponse
+  - dump_json:      SchemaJSONResponse, Validierung und TypeAdapter.dump_json in pydantic-core (user-014)
+
+Die Zeilen werden einmal über entity_crud.get_items_by_user geladen (mit den column_properties
+der Logs), gemessen wird nur die Umwandlung der ORM-Objekte in den Response-Body.
+
+Aufruf (im Verzeichnis V6_fastAPI_frontend_improved):
+    python benchmarks/bench_serialization.py
+    python benchmarks/bench_serialization.py --sizes 1k,10k,100k --repeat 10
+"""
+import argparse
+import asyncio
+import json
+import random
+import sys
+from typing import List
+
+from _common import (
+    AsyncSessionLocal, add_foods, add_logs, add_user, engine, measure, parse_sizes, reset_database, summarize,
+)
+from fastapi.responses import JSONResponse
+
+from tracker.api.responses import SchemaJSONResponse, get_type_adapter
+from tracker.crud import entity_crud
+from tracker.models import entity_models
+from tracker.schemas import entity_schemas
+
+ENTITIES = (
+    (entity_models.Food, entity_schemas.Food),
+    (entity_models.ConsumptionLog, entity_schemas.ConsumptionLog),
+)
+
+
+async def _load(size: int, rng: random.Random) -> dict:
+    async with AsyncSessionLocal() as db:
+        user_id = await add_user(db, "bench@example.com")
+        food_ids = await add_foods(db, user_id, size, rng)
+        await add_logs(db, user_id, entity_models.ConsumptionLog, food_ids, size, rng)
+        await db.commit()
+    async with AsyncSessionLocal() as db:
+        return {model_class: await entity_crud.get_items_by_user(db, user_id=user_id, model_class=model_class)
+                for model_class, _ in ENTITIES}
+
+
+def response_model(rows, schema) -> bytes:
+    adapter = get_type_adapter(List[schema])
+    value = adapter.validate_python(rows, from_attributes=True)
+    return JSONResponse(adapter.dump_python(value, mode='json')).body
+
+
+def dump_json(rows, schema) -> bytes:
+    return SchemaJSONResponse(rows, List[schema]).body
+
+
+async def run(args) -> int:
+    rng = random.Random(42)
+    for size in args.sizes:
+        await reset_database()
+        rows_by_model = await _load(size, rng)
+        print(f"\n{size:,} rows")
+        for model_class, schema in ENTITIES:
+            rows = rows_by_model[model_class]
+            # Beide Wege müssen dasselbe JSON liefern (nur die Formatierung darf sich unterscheiden)
+            assert json.loads(response_model(rows, schema)) == json.loads(dump_json(rows, schema))
+            for name, path in (('response_model', response_model), ('dump_json', dump_json)):
+                timings = measure(lambda: path(rows, schema), args.repeat)
+                print(f"  {model_class.__tablename__:18} {name:15} {summarize(timings)}")
+    await engine.dispose()
+    return 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="List serialization: response_model path vs. TypeAdapter.dump_json")
+    parser.add_argument('--sizes', type=parse_sizes, default=parse_sizes('1k,10k,100k'))
+    parser.add_argument('--repeat', type=int, default=10)
+    return asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == '__main__':
+    sys.exit(main())
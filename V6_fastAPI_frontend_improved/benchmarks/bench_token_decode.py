@@ -0,0 +1,96 @@
+"""
+Micro-Benchmark der JWT-Prüfung in get_current_user bei hoher Parallelität:
+  - to_thread: jwt.decode über asyncio.to_thread (vor user-007)
+  - inline:    jwt.decode direkt im Event-Loop
+  - cached:    security.decode_access_token (inline + token_cache)
+
+Pro Parallelitätsstufe laufen `--requests` Prüfungen, davon höchstens `--concurrency` gleichzeitig,
+verteilt auf `--tokens` verschiedene Tokens (wiederholte Requests derselben Benutzer).
+Mit --bcrypt-load N laufen währenddessen N bcrypt-Hashes im Standard-Executor, wie bei
+gleichzeitigen Logins vor der Einführung des eigenen Hash-Pools.
+
+Aufruf (im Verzeichnis V6_fastAPI_frontend_improved):
+    python benchmarks/bench_token_decode.py
+    python benchmarks/bench_token_decode.py --concurrency 1,100,1000 --bcrypt-load 8
+"""
+import argparse
+import asyncio
+import sys
+import time
+
+import _common  # noqa: F401  (Import-Pfad und Wegwerf-Datenbank)
+import bcrypt
+import jwt
+
+from tracker import security
+from tracker.auth.token_cache import token_cache
+from tracker.config import settings
+
+
+def _decode(token: str) -> dict:
+    return jwt.decode(token, settings.JWT_SECRET_KEY, algorithms=[settings.JWT_ALGORITHM])
+
+
+async def _to_thread(token: str):
+    return await asyncio.to_thread(_decode, token)
+
+
+async def _inline(token: str):
+    return _decode(token)
+
+
+async def _cached(token: str):
+    return security.decode_access_token(token)
+
+
+async def _bcrypt_load(workers: int, stop: asyncio.Event) -> None:
+    loop = asyncio.get_running_loop()
+
+    async def worker():
+        while not stop.is_set():
+            await loop.run_in_executor(None, bcrypt.hashpw, b"password", bcrypt.gensalt(10))
+
+    await asyncio.gather(*(worker() for _ in range(workers)))
+
+
+async def _run(path, tokens: list[str], requests: int, concurrency: int) -> float:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(i: int):
+        async with semaphore:
+            await path(tokens[i % len(tokens)])
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(requests)))
+    return time.perf_counter() - started
+
+
+async def run(args) -> int:
+    tokens = [security.create_access_token(data={"sub": str(user_id)}) for user_id in range(args.tokens)]
+    paths = {'to_thread': _to_thread, 'inline': _inline, 'cached': _cached}
+    print(f"{args.requests} verifications, {args.tokens} distinct tokens, bcrypt load: {args.bcrypt_load}")
+    for concurrency in args.concurrency:
+        print(f"\nconcurrency {concurrency}")
+        for name, path in paths.items():
+            token_cache.clear()
+            stop = asyncio.Event()
+            load = asyncio.create_task(_bcrypt_load(args.bcrypt_load, stop)) if args.bcrypt_load else None
+            elapsed = await _run(path, tokens, args.requests, concurrency)
+            stop.set()
+            if load:
+                await load
+            print(f"  {name:10} {args.requests / elapsed:12,.0f} req/s   {elapsed / args.requests * 1e6:8.1f} µs/req")
+    return 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="JWT verification: thread hop vs. inline vs. verified-token cache")
+    parser.add_argument('--requests', type=int, default=20_000)
+    parser.add_argument('--tokens', type=int, default=100, help="Anzahl verschiedener Tokens")
+    parser.add_argument('--concurrency', type=lambda value: [int(v) for v in value.split(',')], default=[1, 100, 1000])
+    parser.add_argument('--bcrypt-load', type=int, default=0, help="Gleichzeitige bcrypt-Hashes im Standard-Executor")
+    return asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,123 @@
+"""
+Benchmark der Hydrierung (GET /api/tracking-data) für einen Benutzer mit großer Historie:
+  - sequential: alle Abfragen nacheinander auf einer Session (vor user-010)
+  - gather:     wie get_all_tracking_data, jede Abfrage über _in_own_session parallel
+
+Pro Größe werden `size` Konsum-Logs und size/10 Aktivitäts-Logs angelegt. Gemessen wird nur der
+Datenbank-Teil (ohne Serialisierung), für `--clients` gleichzeitige Hydrierungen. "peak conns"
+ist die höchste gleichzeitig ausgeliehene Zahl an Pool-Verbindungen; bei gather bleibt sie durch
+parallel_query_slots begrenzt, statt mit der Zahl der Clients zu wachsen. Findet ein Client
+innerhalb von pool_timeout keine freie Verbindung, steht "pool timeout" in der Zeile.
+
+Aufruf (im Verzeichnis V6_fastAPI_frontend_improved):
+    python benchmarks/bench_tracking_data.py
+    python benchmarks/bench_tracking_data.py --sizes 10k,100k --clients 1,4,16 --repeat 5
+"""
+import argparse
+import asyncio
+import random
+import sys
+import time
+
+from _common import (
+    AsyncSessionLocal, BENCH_DATABASE_URI, add_exercise_types, add_foods, add_logs, add_user, engine,
+    parse_sizes, reset_database, summarize,
+)
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+
+from tracker.api.api_routes import _in_own_session
+from tracker.config import settings
+from tracker.crud import entity_crud, profile_crud, sync_crud
+from tracker.models.entity_models import ActivityLog, ConsumptionLog, ExerciseType, Food
+
+
+async def _populate(size: int, rng: random.Random) -> int:
+    async with AsyncSessionLocal() as db:
+        user_id = await add_user(db, "bench@example.com")
+        food_ids = await add_foods(db, user_id, 2000, rng)
+        exercise_type_ids = await add_exercise_types(db, user_id, 50, rng)
+        await add_logs(db, user_id, ConsumptionLog, food_ids, size, rng)
+        await add_logs(db, user_id, ActivityLog, exercise_type_ids, max(1, size // 10), rng)
+        await db.commit()
+    return user_id
+
+
+async def sequential(user_id: int):
+    async with AsyncSessionLocal() as db:
+        version = await sync_crud.get_version(db, user_id=user_id)
+        items = [await entity_crud.get_items_by_user(db, user_id=user_id, model_class=model_class)
+                 for model_class in (Food, ExerciseType, ConsumptionLog, ActivityLog)]
+        return version, items, await profile_crud.get_user_profile(db, user_id=user_id)
+
+
+async def gather(user_id: int):
+    version = await _in_own_session(sync_crud.get_version, user_id=user_id)
+    return version, await asyncio.gather(
+        *(_in_own_session(entity_crud.get_items_by_user, user_id=user_id, model_class=model_class)
+          for model_class in (Food, ExerciseType, ConsumptionLog, ActivityLog)),
+        _in_own_session(profile_crud.get_user_profile, user_id=user_id),
+    )
+
+
+async def _watch_pool(stop: asyncio.Event, peak: list[int]) -> None:
+    while not stop.is_set():
+        peak[0] = max(peak[0], engine.pool.checkedout())
+        await asyncio.sleep(0)
+
+
+async def _measure(path, user_id: int, clients: int, repeat: int) -> tuple[list[float], int]:
+    """Laufzeiten je Hydrierung bei `clients` gleichzeitigen Hydrierungen, plus Verbindungs-Spitze."""
+    async def timed():
+        started = time.perf_counter()
+        await path(user_id)
+        return time.perf_counter() - started
+
+    await path(user_id)  # Aufwärmen
+    peak, stop = [0], asyncio.Event()
+    watcher = asyncio.create_task(_watch_pool(stop, peak))
+    timings = []
+    try:
+        for _ in range(repeat):
+            # Alle Clients zu Ende laufen lassen, damit keiner in die nächste Messung hineinreicht
+            results = await asyncio.gather(*(timed() for _ in range(clients)), return_exceptions=True)
+            for result in results:
+                if isinstance(result, BaseException):
+                    raise result
+            timings.extend(results)
+    finally:
+        stop.set()
+        await watcher
+    return timings, peak[0]
+
+
+async def run(args) -> int:
+    rng = random.Random(42)
+    print(f"database: {BENCH_DATABASE_URI}")
+    print(f"pool: {settings.DB_POOL_SIZE} + {settings.DB_MAX_OVERFLOW} overflow, "
+          f"parallel query slots: {(settings.DB_POOL_SIZE + settings.DB_MAX_OVERFLOW) // 2}")
+    for size in args.sizes:
+        await reset_database()
+        user_id = await _populate(size, rng)
+        print(f"\n{size:,} consumption logs, {max(1, size // 10):,} activity logs")
+        for clients in args.clients:
+            for name, path in (('sequential', sequential), ('gather', gather)):
+                try:
+                    timings, peak = await _measure(path, user_id, clients, args.repeat)
+                except PoolTimeoutError:
+                    print(f"  clients {clients:>3}  {name:10} pool timeout ({engine.pool.timeout()} s)")
+                    continue
+                print(f"  clients {clients:>3}  {name:10} {summarize(timings)}   peak conns {peak:>3}")
+    await engine.dispose()
+    return 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="tracking-data hydration: one session vs. parallel sessions")
+    parser.add_argument('--sizes', type=parse_sizes, default=parse_sizes('10k,100k'))
+    parser.add_argument('--clients', type=lambda value: [int(v) for v in value.split(',')], default=[1, 4, 16])
+    parser.add_argument('--repeat', type=int, default=5)
+    return asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == '__main__':
+    sys.exit(main())
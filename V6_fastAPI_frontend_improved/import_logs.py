@@ -0,0 +1,51 @@
+"""
+Kommandozeilen-Import von Consumption- oder Activity-Logs (NDJSON oder CSV), z.B. für
+Migrationen aus anderen Trackern. Nutzt denselben Import wie POST /api/import/{entity_name}
+und gibt nach jedem Block den Fortschritt aus.
+
+Aufruf (im Verzeichnis V6_fastAPI_frontend_improved):
+    python import_logs.py --email user@example.com consumption_logs logs.ndjson
+    python import_logs.py --email user@example.com activity_logs logs.csv --format csv
+"""
+import argparse
+import asyncio
+import sys
+
+from tracker.crud import user_crud
+from tracker.database import AsyncSessionLocal, engine
+from tracker.services import import_service
+
+
+async def run(args) -> int:
+    file_format = args.format or ('csv' if args.path.lower().endswith('.csv') else 'ndjson')
+    async with AsyncSessionLocal() as db:
+        user = await user_crud.get_user_by_email(db, email=args.email)
+        if not user:
+            print(f"Unknown user: {args.email}", file=sys.stderr)
+            return 1
+
+        failed = 0
+        lines = import_service.iter_lines(import_service.iter_file_chunks(args.path))
+        async for report in import_service.import_logs(
+            db, user_id=user.user_id, entity_name=args.entity, lines=lines, format=file_format
+        ):
+            failed += report['failed']
+            print(f"Batch {report['batch']}: {report['imported']}/{report['rows']} imported, "
+                  f"{report['failed']} failed (total {report['total_imported']})")
+            for error in report['errors']:
+                print(f"  line {error['line']}: {error['error']}", file=sys.stderr)
+    await engine.dispose()
+    return 1 if failed else 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Import consumption or activity logs")
+    parser.add_argument('entity', choices=list(import_service.IMPORTABLE))
+    parser.add_argument('path')
+    parser.add_argument('--email', required=True, help="E-Mail des Benutzers, dem die Logs gehören")
+    parser.add_argument('--format', choices=['ndjson', 'csv'], help="Standard: anhand der Dateiendung")
+    return asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == '__main__':
+    sys.exit(main())
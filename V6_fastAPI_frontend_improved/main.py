@@ -1,16 +1,26 @@
-from fastapi import FastAPI
-from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+import os
+
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from tracker.models import base_model
+from tracker.config import settings
+from tracker.compression import ApiCompressionMiddleware
+from tracker.static_files import PrecompressedStaticFiles
 
 # Import router modules from the subdirectories
 from tracker.auth import auth_routes
 from tracker.api import api_routes
 
 # Import database components and models
-from tracker.database import engine
-from tracker.models import entity_models, user_models
+from tracker.database import (
+    engine, AsyncSessionLocal, create_extensions, create_missing_indexes, add_missing_columns,
+    convert_json_columns, has_table
+)
+from tracker.auth.user_cache import user_cache
+from tracker.auth.token_cache import token_cache
+from tracker.auth.hash_pool import hash_pool
+from tracker.models import entity_models, user_models, sync_models, rollup_models
+from tracker.crud import rollup_crud
 from contextlib import asynccontextmanager
 from fastapi import status
 from sqlalchemy import text
@@ -24,12 +34,26 @@ async def lifespan(app: FastAPI):
     # .begin(): stellt sicher, dass alle Befehle darin als eine "Alles-oder-Nichts"-Operation ablaufen.
     async with engine.begin() as conn:  # async with: sichert sauberes schließen der verbindung
         # .begin() stellt sicher, dass alle Befehle darin als eine "Alles-oder-Nichts"-Operation ablaufen
+        rollup_is_new = False
+        for rollup_table in (rollup_models.DailyEnergyRollup, rollup_models.CatalogUsage):
+            rollup_is_new |= not await conn.run_sync(has_table, rollup_table.__tablename__)
+        await conn.run_sync(create_extensions)
         await conn.run_sync(base_model.Base.metadata.create_all)
         # nimmt den kompletten Bauplan aller Tabellen aus deinen models.py
         # weist die Datenbank an (.create_all), alle Tabellen zu erstellen, die noch nicht existieren
+        # Migration für bestehende Datenbanken: fehlende Spalten und Indizes nachträglich anlegen
+        await conn.run_sync(add_missing_columns)
+        await conn.run_sync(convert_json_columns)
+        await conn.run_sync(create_missing_indexes)
+    if rollup_is_new:
+        # Bestehende Logs einmalig in neu angelegte Rollups (Tagessummen, Nutzungs-Ranking) übernehmen
+        async with AsyncSessionLocal() as db:
+            count = await rollup_crud.rebuild_all(db)
+        print(f"Rollups built for {count} users.")
     print("Database is ready.")
     yield # fastapi anwendung wird ausgeführt, wenn der server beendet(Uvicorn heruntergefahren) wird geht es nach yield weiter
     # lifespan funktion is yielding 
+    hash_pool.shutdown()
     print("Server shutting down.")
 
 # Initialize the main FastAPI application
@@ -48,6 +72,18 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Pagination von GET /api/{entity_name} (Cursor der nächsten Seite)
+    expose_headers=["X-Next-Cursor", "Link"],
+)
+
+# Komprimiert API-Antworten ab einer Mindestgröße; statische Dateien kommen vorkomprimiert.
+# Der Export-Stream bleibt unkomprimiert: Brotli/gzip puffern die Chunks, der Download
+# würde sonst erst nach einem großen Teil der Historie beginnen.
+app.add_middleware(
+    ApiCompressionMiddleware,
+    minimum_size=settings.COMPRESSION_MINIMUM_SIZE,
+    excluded_prefixes=("/static", "/templates", "/api/export"),
+    excluded_paths=("/",),
 )
 
 # --- ROUTER REGISTRIERUNG ---
@@ -61,16 +97,29 @@ app.include_router(api_routes.router)
 
 # --- Statische Dateien und Frontend ---
 # Binde statische Dateien ein (falls du welche hast)
-app.mount("/static", StaticFiles(directory="tracker/static"), name="static")
-app.mount("/templates", StaticFiles(directory="tracker/templates"), name="templates")
+# Liefert vorkomprimierte .br/.gz-Varianten aus, wenn precompress_static.py gelaufen ist
+app.mount("/static", PrecompressedStaticFiles(directory="tracker/static"), name="static")
+templates_files = PrecompressedStaticFiles(directory="tracker/templates")
+app.mount("/templates", templates_files, name="templates")
+# index.html mit versionierten Asset-Links, von precompress_static.py erzeugt (nur im Build)
+build_files = PrecompressedStaticFiles(directory="tracker/build", check_dir=False)
+
+def _index_files() -> PrecompressedStaticFiles:
+    """Die gebaute index.html, solange sie nicht älter als das Template ist, sonst das Template."""
+    try:
+        if os.path.getmtime("tracker/build/index.html") >= os.path.getmtime("tracker/templates/index.html"):
+            return build_files
+    except OSError:
+        pass
+    return templates_files
 
 # Hauptroute die das Frontend ausliefert.
-@app.get("/", response_class=FileResponse, include_in_schema=False)
-async def read_root():
+@app.get("/", include_in_schema=False)
+async def read_root(request: Request):
     """
     Liefert die Haupt-index.html-Datei für die Single-Page Application aus.
     """
-    return "tracker/templates/index.html"
+    return await _index_files().get_response("index.html", request.scope)
 
 @app.get("/health", 
          status_code=status.HTTP_200_OK,
@@ -89,7 +138,11 @@ async def health_check():
         return {
             "status": "healthy",
             "database": "connected",
-            "version": "1.0.0"
+            "version": "1.0.0",
+            # Trefferquoten der Auth-Caches, um den Effekt unter Last prüfen zu können
+            "user_cache": user_cache.stats(),
+            "token_cache": token_cache.stats(),
+            "password_hashing": hash_pool.stats()
         }
     except Exception as e:
         return {
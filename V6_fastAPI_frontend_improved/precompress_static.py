@@ -0,0 +1,66 @@
+"""
+Build-Schritt: erzeugt vorkomprimierte Varianten (.gz und, falls das Paket `brotli`
+installiert ist, .br) aller CSS/JS/HTML-Dateien, die PrecompressedStaticFiles direkt
+ausliefert. Außerdem wird eine Kopie von index.html mit ?v=<inhalts-hash> an den
+Asset-Links nach tracker/build geschrieben, damit Browser die Assets dauerhaft cachen
+dürfen. Das Template im Repository bleibt unverändert; main.py liefert die Kopie aus.
+
+Aufruf (im Verzeichnis V6_fastAPI_frontend_improved): python precompress_static.py
+"""
+import gzip
+import hashlib
+import re
+from pathlib import Path
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+BASE_DIR = Path(__file__).parent / "tracker"
+ASSET_DIRS = [BASE_DIR / "static", BASE_DIR / "templates"]
+INDEX_HTML = BASE_DIR / "templates" / "index.html"
+# Build-Ausgabe (nicht versioniert, siehe .gitignore)
+BUILD_DIR = BASE_DIR / "build"
+BUILT_INDEX_HTML = BUILD_DIR / "index.html"
+SUFFIXES = {".css", ".js", ".html"}
+
+
+def iter_assets():
+    for directory in ASSET_DIRS:
+        for path in sorted(directory.rglob("*")):
+            if path.is_file() and path.suffix in SUFFIXES:
+                yield path
+
+def asset_version() -> str:
+    """Hash über alle statischen Dateien: ändert sich, sobald sich irgendein Asset ändert."""
+    digest = hashlib.sha256()
+    for path in iter_assets():
+        if path != INDEX_HTML:
+            digest.update(path.relative_to(BASE_DIR).as_posix().encode())
+            digest.update(path.read_bytes())
+    return digest.hexdigest()[:12]
+
+def stamp_index_html(version: str, source: Path = INDEX_HTML, target: Path = BUILT_INDEX_HTML) -> Path:
+    """Schreibt source mit ?v=<version> an allen /static/-Links nach target."""
+    html = source.read_text(encoding="utf-8")
+    html = re.sub(r'((?:href|src)="/static/[^"?]+)(\?v=[^"]*)?"', rf'\1?v={version}"', html)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    target.write_text(html, encoding="utf-8")
+    return target
+
+def precompress(path: Path) -> None:
+    data = path.read_bytes()
+    # mtime=0 macht die Ausgabe reproduzierbar
+    path.with_name(path.name + ".gz").write_bytes(gzip.compress(data, compresslevel=9, mtime=0))
+    if brotli is not None:
+        path.with_name(path.name + ".br").write_bytes(brotli.compress(data, quality=11))
+
+
+if __name__ == "__main__":
+    version = asset_version()
+    count = 0
+    for asset in (*iter_assets(), stamp_index_html(version)):
+        precompress(asset)
+        count += 1
+    print(f"Precompressed {count} files (brotli: {'yes' if brotli else 'no'}), asset version {version}.")
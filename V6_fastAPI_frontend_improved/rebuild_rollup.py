@@ -0,0 +1,42 @@
+"""
+Baut den Tages-Rollup (dailyenergyrollups) und das Nutzungs-Ranking (catalogusage) komplett
+aus den Logs neu auf, z.B. nach manuellen Änderungen direkt in der Datenbank.
+Ohne --email für alle Benutzer.
+
+Aufruf (im Verzeichnis V6_fastAPI_frontend_improved):
+    python rebuild_rollup.py
+    python rebuild_rollup.py --email user@example.com
+"""
+import argparse
+import asyncio
+import sys
+
+from tracker.crud import rollup_crud, user_crud
+from tracker.database import AsyncSessionLocal, engine
+
+
+async def run(args) -> int:
+    async with AsyncSessionLocal() as db:
+        if args.email:
+            user = await user_crud.get_user_by_email(db, email=args.email)
+            if not user:
+                print(f"Unknown user: {args.email}", file=sys.stderr)
+                return 1
+            await rollup_crud.rebuild(db, user.user_id)
+            await db.commit()
+            count = 1
+        else:
+            count = await rollup_crud.rebuild_all(db)
+    await engine.dispose()
+    print(f"Rollups rebuilt for {count} users.")
+    return 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Rebuild the daily energy rollup and usage ranking from the logs")
+    parser.add_argument('--email', help="Nur den Rollup dieses Benutzers neu aufbauen")
+    return asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == '__main__':
+    sys.exit(main())
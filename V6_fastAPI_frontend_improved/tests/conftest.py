@@ -0,0 +1,109 @@
+"""
+Gemeinsame Fixtures der Tests: In-Memory-SQLite (aiosqlite) statt der Datenbank aus .env,
+eine Event-Loop für die ganze Testsitzung und ein Zähler für ausgeführte SQL-Statements.
+
+Aufruf (im Verzeichnis V6_fastAPI_frontend_improved): python -m pytest tests
+"""
+import asyncio
+import itertools
+import os
+import sys
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Muss vor dem ersten Import von tracker.* gesetzt sein, die Engine entsteht beim Import.
+# aiosqlite nutzt für :memory: einen StaticPool, alle Sessions teilen sich also eine Datenbank.
+os.environ['SQLALCHEMY_DATABASE_URI'] = 'sqlite+aiosqlite://'
+sys.path.insert(0, PROJECT_DIR)
+# main.py bindet tracker/static relativ zum Arbeitsverzeichnis ein
+os.chdir(PROJECT_DIR)
+
+import httpx  # noqa: E402
+import pytest  # noqa: E402
+from sqlalchemy import event, insert  # noqa: E402
+
+from main import app  # noqa: E402
+from tracker import security  # noqa: E402
+from tracker.database import engine  # noqa: E402
+from tracker.models import base_model, user_models  # noqa: E402
+
+_emails = itertools.count(1)
+
+
+class StatementCounter:
+    """Sammelt alle SQL-Statements, die über die Engine an die Datenbank gehen."""
+
+    def __init__(self):
+        self.statements: list[str] = []
+
+    def __call__(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+
+    def __len__(self) -> int:
+        return len(self.statements)
+
+    def clear(self) -> None:
+        self.statements.clear()
+
+
+@pytest.fixture(scope='session')
+def run():
+    """Führt eine Coroutine auf der gemeinsamen Event-Loop aus (die Engine ist an sie gebunden)."""
+    loop = asyncio.new_event_loop()
+
+    async def create_schema():
+        async with engine.begin() as conn:
+            await conn.run_sync(base_model.Base.metadata.create_all)
+
+    loop.run_until_complete(create_schema())
+    yield loop.run_until_complete
+    loop.run_until_complete(engine.dispose())
+    loop.close()
+
+
+async def create_user(**profile) -> int:
+    """Legt einen Benutzer samt Profil direkt an (ohne bcrypt, der Hash wird nie geprüft)."""
+    async with engine.begin() as conn:
+        user_id = await conn.scalar(
+            insert(user_models.User)
+            .values(email=f"user{next(_emails)}@example.com", password_hash='-')
+            .returning(user_models.User.user_id)
+        )
+        await conn.execute(insert(user_models.UserProfile).values(user_id=user_id, **profile))
+    return user_id
+
+
+@pytest.fixture
+def user_id(run) -> int:
+    return run(create_user())
+
+
+def _api_client(user_id: int) -> httpx.AsyncClient:
+    token = security.create_access_token(data={"sub": str(user_id)})
+    return httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app), base_url="http://test",
+        headers={"Authorization": f"Bearer {token}"},
+    )
+
+
+@pytest.fixture
+def client(run, user_id):
+    """API-Client, angemeldet als frischer Benutzer (jeder Test hat eigene Daten)."""
+    api_client = _api_client(user_id)
+    yield api_client
+    run(api_client.aclose())
+
+
+@pytest.fixture
+def other_client(run):
+    """API-Client eines zweiten Benutzers (Import in ein anderes Konto, fremde Daten)."""
+    api_client = _api_client(run(create_user()))
+    yield api_client
+    run(api_client.aclose())
+
+
+@pytest.fixture
+def statements():
+    counter = StatementCounter()
+    event.listen(engine.sync_engine, 'before_cursor_execute', counter)
+    yield counter
+    event.remove(engine.sync_engine, 'before_cursor_execute', counter)
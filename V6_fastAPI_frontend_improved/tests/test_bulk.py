@@ -0,0 +1,120 @@
+"""
+Bulk-Änderungen (PATCH/DELETE /api/{entity_name}/bulk): gemischte Batches aus eigenen,
+unbekannten und fremden IDs liefern ein Ergebnis pro ID und ändern nur die eigenen Zeilen.
+Pro Anfrage steigt die Sync-Version genau einmal, der Rollup zählt jeden Log genau einmal.
+"""
+from datetime import date, datetime, timezone
+
+from sqlalchemy import insert, select
+
+from conftest import create_user
+from tracker.database import engine
+from tracker.models.entity_models import ConsumptionLog, Food
+from tracker.models.rollup_models import DailyEnergyRollup
+from tracker.models.sync_models import SyncState
+
+UNKNOWN_ID = 999_999
+
+
+def _foreign_log_id(run) -> int:
+    async def create():
+        other_user_id = await create_user()
+        async with engine.begin() as conn:
+            food_id = await conn.scalar(
+                insert(Food).values(user_id=other_user_id, name="Fremd", calories_kcal=100).returning(Food.id)
+            )
+            return await conn.scalar(insert(ConsumptionLog).values(
+                user_id=other_user_id, food_id=food_id, amount_g=100,
+                log_date=datetime(2026, 10, 1, 8, tzinfo=timezone.utc),
+            ).returning(ConsumptionLog.id))
+    return run(create())
+
+
+def _sync_version(run, user_id: int) -> int:
+    async def load():
+        async with engine.connect() as conn:
+            return await conn.scalar(select(SyncState.version).where(SyncState.user_id == user_id))
+    return run(load())
+
+
+def _rollup(run, user_id: int) -> dict:
+    async def load():
+        async with engine.connect() as conn:
+            rows = await conn.execute(
+                select(DailyEnergyRollup.day, DailyEnergyRollup.kcal_in, DailyEnergyRollup.n_entries)
+                .where(DailyEnergyRollup.user_id == user_id, DailyEnergyRollup.n_entries > 0)
+            )
+            return {day: (kcal_in, n) for day, kcal_in, n in rows.all()}
+    return run(load())
+
+
+def _foreign_log(run, log_id: int) -> tuple:
+    async def load():
+        async with engine.connect() as conn:
+            row = await conn.execute(
+                select(ConsumptionLog.amount_g, ConsumptionLog.log_date).where(ConsumptionLog.id == log_id)
+            )
+            return row.one_or_none()
+    return run(load())
+
+
+def _create_logs(run, client) -> list[dict]:
+    food = run(client.post("/api/foods", json={"name": "Apfel", "calories_kcal": 50})).json()
+    return run(client.post("/api/consumption_logs/bulk", json=[
+        {"food_id": food["id"], "amount_g": 100, "log_date": "2026-10-01T08:00:00Z"},
+        {"food_id": food["id"], "amount_g": 200, "log_date": "2026-10-01T12:00:00Z"},
+        {"food_id": food["id"], "amount_g": 300, "log_date": "2026-10-02T08:00:00Z"},
+    ])).json()
+
+
+def test_bulk_patch_with_unknown_and_foreign_ids(run, client, user_id):
+    logs = _create_logs(run, client)
+    foreign_id = _foreign_log_id(run)
+    foreign_before = _foreign_log(run, foreign_id)
+    version = _sync_version(run, user_id)
+
+    response = run(client.request("PATCH", "/api/consumption_logs/bulk", json={
+        "ids": [logs[0]["id"], UNKNOWN_ID, foreign_id, logs[1]["id"], logs[0]["id"]],
+        "changes": {"log_date": "2026-10-03T09:00:00Z"},
+    }))
+    assert response.status_code == 200
+    # Doppelte IDs werden einmal gemeldet, die Reihenfolge der Anfrage bleibt
+    assert response.json()["results"] == [
+        {"id": logs[0]["id"], "status": "updated"},
+        {"id": UNKNOWN_ID, "status": "not_found"},
+        {"id": foreign_id, "status": "not_found"},
+        {"id": logs[1]["id"], "status": "updated"},
+    ]
+
+    assert _sync_version(run, user_id) == version + 1
+    assert _foreign_log(run, foreign_id) == foreign_before
+    # Beide Logs sind vom 01.10. auf den 03.10. gewandert, jeder zählt genau einmal
+    assert _rollup(run, user_id) == {date(2026, 10, 2): (150, 1), date(2026, 10, 3): (150, 2)}
+
+    changed = run(client.get("/api/tracking-data/changes", params={"since": version})).json()
+    assert sorted(log["id"] for log in changed["consumption_logs"]) == sorted([logs[0]["id"], logs[1]["id"]])
+
+
+def test_bulk_delete_with_unknown_and_foreign_ids(run, client, user_id):
+    logs = _create_logs(run, client)
+    foreign_id = _foreign_log_id(run)
+    version = _sync_version(run, user_id)
+
+    response = run(client.request("DELETE", "/api/consumption_logs/bulk", json={
+        "ids": [foreign_id, logs[0]["id"], UNKNOWN_ID, logs[2]["id"]],
+    }))
+    assert response.status_code == 200
+    assert response.json()["results"] == [
+        {"id": foreign_id, "status": "not_found"},
+        {"id": logs[0]["id"], "status": "deleted"},
+        {"id": UNKNOWN_ID, "status": "not_found"},
+        {"id": logs[2]["id"], "status": "deleted"},
+    ]
+
+    assert _sync_version(run, user_id) == version + 1
+    assert _foreign_log(run, foreign_id) is not None
+    assert _rollup(run, user_id) == {date(2026, 10, 1): (100, 1)}
+
+    changed = run(client.get("/api/tracking-data/changes", params={"since": version})).json()
+    assert sorted(changed["deleted"]["consumption_logs"]) == sorted([logs[0]["id"], logs[2]["id"]])
+    assert [log["id"] for log in run(client.get("/api/consumption_logs")).json()] == [logs[1]["id"]]
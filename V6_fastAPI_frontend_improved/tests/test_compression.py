@@ -0,0 +1,19 @@
+"""API-Antworten werden komprimiert, der Export-Stream nicht (sonst puffert die Kompression die Chunks)."""
+from tracker.config import settings
+
+
+def test_export_stream_is_not_compressed(run, client):
+    run(client.post("/api/foods/bulk", json=[
+        {"name": f"Food {i}", "calories_kcal": 100 + i} for i in range(200)
+    ]))
+    headers = {"Accept-Encoding": "br, gzip"}
+
+    listing = run(client.get("/api/foods?limit=1000", headers=headers))
+    assert len(listing.content) >= settings.COMPRESSION_MINIMUM_SIZE
+    assert listing.headers.get("content-encoding") in ("br", "gzip")
+
+    for format in ("ndjson", "csv"):
+        export = run(client.get(f"/api/export?format={format}", headers=headers))
+        assert export.status_code == 200
+        assert "content-encoding" not in export.headers
+        assert "Food 199" in export.text
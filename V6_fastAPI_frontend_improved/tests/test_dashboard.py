@@ -0,0 +1,30 @@
+"""Die Tooltip-Details des Dashboards ergeben in jedem Zeitraum die Summen des Rollups."""
+import re
+from datetime import datetime, time, timezone
+
+import pytest
+
+
+def _detail_kcal(details: list[str]) -> int:
+    return sum(int(re.search(r": (-?\d+) kcal$", detail).group(1)) for detail in details)
+
+
+@pytest.mark.parametrize('period', ['day', 'week', 'month', 'year'])
+def test_details_match_bucket_totals(run, client, period):
+    today = datetime.now(timezone.utc).date()
+    foods = run(client.post("/api/foods/bulk", json=[
+        {"name": "Apfel", "calories_kcal": 52}, {"name": "Brot", "calories_kcal": 250},
+    ])).json()
+    log_days = {today, today.replace(day=1), today.replace(month=1, day=1)}
+    run(client.post("/api/consumption_logs/bulk", json=[
+        {"food_id": food["id"], "amount_g": 150,
+         "log_date": datetime.combine(day, time(12), tzinfo=timezone.utc).isoformat()}
+        for day in log_days for food in foods
+    ]))
+
+    data = run(client.get(f"/api/dashboard?period={period}")).json()
+    assert data["total_in"] > 0
+    assert [_detail_kcal(details) for details in data["details_in"]] == data["calories_in"]
+    # Mehrere Tage im selben Bucket ergeben einen Eintrag pro Name
+    filled = [details for details in data["details_in"] if details]
+    assert all(sorted(detail.split(":")[0] for detail in details) == ["Apfel", "Brot"] for details in filled)
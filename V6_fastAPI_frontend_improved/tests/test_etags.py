@@ -0,0 +1,62 @@
+"""
+Bedingte GETs über ETag/If-None-Match: unveränderte Daten werden mit 304 ohne Body bestätigt,
+jeder Schreibzugriff ändert den ETag und jede Seite (limit, cursor) hat einen eigenen.
+"""
+
+
+def _get(run, client, url: str, etag: str | None = None, **params):
+    headers = {"If-None-Match": etag} if etag else {}
+    return run(client.get(url, params=params, headers=headers))
+
+
+def test_tracking_data_revalidation(run, client):
+    first = _get(run, client, "/api/tracking-data")
+    assert first.status_code == 200
+    etag = first.headers["ETag"]
+    assert first.headers["Cache-Control"] == "private, no-cache"
+
+    cached = _get(run, client, "/api/tracking-data", etag)
+    assert cached.status_code == 304
+    assert cached.content == b""
+    assert cached.headers["ETag"] == etag
+    # Mehrere Tags, wie sie Browser mit mehreren Cache-Einträgen schicken
+    assert _get(run, client, "/api/tracking-data", f'"veraltet", {etag}').status_code == 304
+
+    run(client.post("/api/foods", json={"name": "Apfel", "calories_kcal": 52}))
+    changed = _get(run, client, "/api/tracking-data", etag)
+    assert changed.status_code == 200
+    assert changed.headers["ETag"] != etag
+    assert [food["name"] for food in changed.json()["foods"]] == ["Apfel"]
+
+
+def test_list_etag_depends_on_entity_version_and_page(run, client):
+    food = run(client.post("/api/foods", json={"name": "Apfel", "calories_kcal": 52})).json()
+    run(client.post("/api/foods", json={"name": "Brot", "calories_kcal": 250}))
+
+    page = _get(run, client, "/api/foods", limit=1)
+    etag = page.headers["ETag"]
+    assert _get(run, client, "/api/foods", etag, limit=1).status_code == 304
+
+    # Andere Seitengröße bzw. Folgeseite: eigener ETag, das alte Tag bestätigt sie nicht
+    other_limit = _get(run, client, "/api/foods", etag, limit=2)
+    next_page = _get(run, client, "/api/foods", etag, limit=1, cursor=page.headers["X-Next-Cursor"])
+    assert other_limit.status_code == next_page.status_code == 200
+    assert len({etag, other_limit.headers["ETag"], next_page.headers["ETag"]}) == 3
+
+    # Ein neuer Log ändert nur die Version der Logs, die Food-Liste bleibt gültig
+    run(client.post("/api/consumption_logs", json={
+        "food_id": food["id"], "amount_g": 100, "log_date": "2026-10-01T08:00:00Z"
+    }))
+    assert _get(run, client, "/api/foods", etag, limit=1).status_code == 304
+
+    run(client.put(f"/api/foods/{food['id']}", json={"name": "Grüner Apfel", "calories_kcal": 52}))
+    updated = _get(run, client, "/api/foods", etag, limit=1)
+    assert updated.status_code == 200
+    assert updated.headers["ETag"] != etag
+
+
+def test_etag_of_another_user_does_not_match(run, client, other_client):
+    etag = _get(run, client, "/api/foods").headers["ETag"]
+    response = _get(run, other_client, "/api/foods", etag)
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
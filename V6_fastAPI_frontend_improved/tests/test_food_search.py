@@ -0,0 +1,34 @@
+"""SQLite-Fallback der Food-Suche: Präfix-Suche ohne Groß-/Kleinschreibung, auch außerhalb von ASCII."""
+from sqlalchemy import text
+
+from tracker.database import engine
+
+
+def _names(run, client, q: str) -> list[str]:
+    response = run(client.get("/api/foods/search", params={"q": q}))
+    assert response.status_code == 200
+    return [food["name"] for food in response.json()]
+
+
+def test_prefix_search_folds_unicode_case(run, client):
+    run(client.post("/api/foods/bulk", json=[
+        {"name": name, "calories_kcal": 100} for name in ("Äpfel", "Apfelsaft", "Straße", "Öl", "Ölsardinen")
+    ]))
+
+    assert _names(run, client, "äpf") == ["Äpfel"]
+    assert _names(run, client, "ÄPFEL") == ["Äpfel"]
+    assert _names(run, client, "STRASSE") == ["Straße"]
+    assert _names(run, client, "straß") == ["Straße"]
+    assert _names(run, client, "öl") == ["Öl", "Ölsardinen"]
+
+
+def test_search_uses_casefold_index(run):
+    async def plan():
+        async with engine.connect() as conn:
+            rows = await conn.execute(text(
+                "EXPLAIN QUERY PLAN SELECT food_id FROM foods WHERE user_id = 1 "
+                "AND casefold(name) >= 'äp' AND casefold(name) < 'äp' || char(1114111)"
+            ))
+            return " ".join(row[-1] for row in rows)
+    assert "ix_foods_user_id_casefold_name" in run(plan())
+
@@ -0,0 +1,69 @@
+"""
+Import von Logs (POST /api/import/{entity_name}): ein Export (NDJSON oder CSV mit allen
+Entity-Typen) lässt sich bei einem anderen Benutzer wieder einlesen, Foods werden dort über
+ihren Namen aufgelöst. Fehlerhafte Zeilen werden mit Zeilennummer gemeldet.
+"""
+import json
+
+import pytest
+
+
+def _create_history(run, client) -> None:
+    apple, bread = (
+        run(client.post("/api/foods", json={"name": name, "calories_kcal": kcal})).json()
+        for name, kcal in (("Apfel", 52), ("Brot", 250))
+    )
+    running = run(client.post("/api/exercise_types", json={"name": "Laufen", "calories_per_hour": 600})).json()
+    run(client.post("/api/consumption_logs/bulk", json=[
+        {"food_id": apple["id"], "amount_g": 150, "log_date": "2026-10-01T08:00:00Z"},
+        {"food_id": bread["id"], "amount_g": 80, "log_date": "2026-10-01T12:00:00Z"},
+        {"food_id": apple["id"], "amount_g": 120, "log_date": "2026-10-02T08:00:00Z"},
+    ]))
+    run(client.post("/api/activity_logs", json={
+        "exercise_type_id": running["id"], "duration_min": 45, "log_date": "2026-10-02T18:00:00Z"
+    }))
+
+
+def _logs(run, client) -> list[tuple]:
+    logs = run(client.get("/api/consumption_logs")).json()
+    return sorted((log["food_name"], log["amount_g"], log["log_date"], log["calories"]) for log in logs)
+
+
+@pytest.mark.parametrize("format", ["ndjson", "csv"])
+def test_export_round_trip(run, client, other_client, format):
+    _create_history(run, client)
+    export = run(client.get("/api/export", params={"format": format}))
+    assert export.status_code == 200
+
+    # Gleichnamige Foods mit anderen IDs: die IDs des Exports gehören dem anderen Benutzer
+    for name, kcal in (("Apfel", 52), ("Brot", 250)):
+        run(other_client.post("/api/foods", json={"name": name, "calories_kcal": kcal}))
+    response = run(other_client.post(
+        "/api/import/consumption_logs", params={"format": format}, content=export.content
+    ))
+    assert response.status_code == 200
+    # Foods, Bewegungsformen, Aktivitäts-Logs und Profil im Export werden übersprungen
+    assert response.json() == {"imported": 3, "failed": 0, "batches": 1, "errors": []}
+    assert _logs(run, other_client) == _logs(run, client)
+    assert run(other_client.get("/api/activity_logs")).json() == []
+
+
+def test_bad_rows_are_reported_with_line_numbers(run, client):
+    food = run(client.post("/api/foods", json={"name": "Apfel", "calories_kcal": 52})).json()
+    lines = [
+        {"food_id": food["id"], "amount_g": 100, "log_date": "2026-10-01T08:00:00Z"},
+        {"food_name": "Unbekannt", "amount_g": 100, "log_date": "2026-10-01T09:00:00Z"},
+        {"food_name": "apfel", "amount_g": 50, "log_date": "2026-10-01T10:00:00Z"},
+        {"food_id": food["id"], "amount_g": "viel", "log_date": "2026-10-01T11:00:00Z"},
+        {"food_id": food["id"], "amount_g": 100},
+    ]
+    body = "\n".join([*map(json.dumps, lines), "{kein json"])
+    response = run(client.post("/api/import/consumption_logs", content=body.encode()))
+    assert response.status_code == 200
+
+    report = response.json()
+    assert (report["imported"], report["failed"]) == (2, 4)
+    assert [error["line"] for error in report["errors"]] == [2, 4, 5, 6]
+    assert "Unknown food_id" in report["errors"][0]["error"]
+    assert report["errors"][1]["error"].startswith("amount_g")
+    assert [log["amount_g"] for log in run(client.get("/api/consumption_logs")).json()] == [50, 100]
@@ -0,0 +1,76 @@
+"""
+Die Nährstoff-Summen (/api/nutrients?from=&to=) enthalten genau die Logs der Kalendertage des
+Zeitraums in der Zeitzone des Benutzers, auch mit Logs direkt an den Tagesgrenzen.
+"""
+import math
+
+import pytest
+
+FOODS = {
+    "Apfel": {"calories_kcal": 52, "protein_g": 0.3,
+              "vitamins": {"C": 4.6}, "minerals": {"K": 107}, "other_compounds": {"source": "BLS"}},
+    "Brot": {"calories_kcal": 250, "protein_g": 8.5, "fat_total_g": 1.2,
+             "vitamins": {"B1": 0.2, "C": 0}, "minerals": {"K": 180, "Fe": 2.1}},
+}
+# (Food, Gramm, UTC-Zeitpunkt) -> Kalendertag in Berlin (CEST, UTC+2)
+LOGS = [
+    ("Apfel", 100, "2026-09-30T21:59:59Z"),  # 30.09. 23:59:59
+    ("Brot", 80, "2026-09-30T22:00:00Z"),    # 01.10. 00:00:00
+    ("Apfel", 150, "2026-10-01T12:00:00Z"),  # 01.10.
+    ("Brot", 60, "2026-10-02T21:59:59Z"),    # 02.10. 23:59:59
+    ("Apfel", 200, "2026-10-02T22:00:00Z"),  # 03.10. 00:00:00
+]
+LOG_DAYS = ["2026-09-30", "2026-10-01", "2026-10-01", "2026-10-02", "2026-10-03"]
+
+
+def _expected(from_day: str, to_day: str) -> dict:
+    """Referenz: Nährstoffe pro 100 g mal Gramm, summiert über die Logs im Zeitraum."""
+    totals = {"macros": {}, "vitamins": {}, "minerals": {}, "other_compounds": {}}
+    for (name, grams, _), day in zip(LOGS, LOG_DAYS):
+        if not from_day <= day <= to_day:
+            continue
+        food = FOODS[name]
+        documents = {"macros": {key: value for key, value in food.items() if not isinstance(value, dict)}}
+        documents.update({group: food.get(group, {}) for group in ("vitamins", "minerals", "other_compounds")})
+        for group, document in documents.items():
+            for key, value in document.items():
+                if isinstance(value, (int, float)):
+                    totals[group][key] = totals[group].get(key, 0) + value * grams / 100
+    return totals
+
+
+@pytest.fixture
+def logged_client(run, client):
+    assert run(client.put("/api/profile", json={"timezone": "Europe/Berlin"})).status_code == 200
+    foods = run(client.post("/api/foods/bulk", json=[{"name": name, **values} for name, values in FOODS.items()])).json()
+    food_ids = {food["name"]: food["id"] for food in foods}
+    run(client.post("/api/consumption_logs/bulk", json=[
+        {"food_id": food_ids[name], "amount_g": grams, "log_date": log_date} for name, grams, log_date in LOGS
+    ]))
+    return client
+
+
+@pytest.mark.parametrize('from_day, to_day', [
+    ("2026-10-01", "2026-10-02"),
+    ("2026-10-01", "2026-10-01"),
+    ("2026-09-30", "2026-09-30"),
+    ("2026-10-03", "2026-10-03"),
+    ("2026-09-30", "2026-10-03"),
+    ("2026-10-04", "2026-10-10"),
+])
+def test_totals_cover_exactly_the_local_days(run, logged_client, from_day, to_day):
+    response = run(logged_client.get("/api/nutrients", params={"from": from_day, "to": to_day}))
+    assert response.status_code == 200
+    data = response.json()
+    assert (data["from_date"], data["to_date"]) == (from_day, to_day)
+
+    expected = _expected(from_day, to_day)
+    for group, values in expected.items():
+        # Text-Werte (other_compounds.source) werden übersprungen
+        assert data[group].keys() == values.keys()
+        assert all(math.isclose(data[group][key], value, abs_tol=0.01) for key, value in values.items())
+
+
+def test_from_after_to_is_rejected(run, client):
+    response = run(client.get("/api/nutrients", params={"from": "2026-10-02", "to": "2026-10-01"}))
+    assert response.status_code == 400
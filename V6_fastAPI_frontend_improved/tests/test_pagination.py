@@ -0,0 +1,90 @@
+"""
+Keyset-Pagination der Listen-Endpunkte (GET /api/{entity_name}?limit=&cursor=): alle Seiten
+zusammen ergeben jede Zeile genau einmal, auch wenn sich viele Zeilen den Sortierwert teilen,
+die letzte Seite hat keinen Cursor und kaputte Cursors werden abgelehnt.
+"""
+import base64
+import json
+from urllib.parse import parse_qs, urlsplit
+
+import pytest
+
+
+def _walk(run, client, entity_name: str, limit: int) -> tuple[list[dict], list[int]]:
+    """Folgt X-Next-Cursor bis zur letzten Seite; gibt alle Items und die Seitengrößen zurück."""
+    items, page_sizes = [], []
+    params = {"limit": limit}
+    while True:
+        response = run(client.get(f"/api/{entity_name}", params=params))
+        assert response.status_code == 200
+        page = response.json()
+        items += page
+        page_sizes.append(len(page))
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            assert "Link" not in response.headers
+            return items, page_sizes
+        link_url, rel = response.headers["Link"].split("; ")
+        assert rel == 'rel="next"'
+        assert parse_qs(urlsplit(link_url.strip("<>")).query) == {"cursor": [cursor], "limit": [str(limit)]}
+        params = {"limit": limit, "cursor": cursor}
+
+
+def test_log_pages_with_equal_log_dates_have_no_duplicates_or_gaps(run, client):
+    food = run(client.post("/api/foods", json={"name": "Apfel", "calories_kcal": 52})).json()
+    # 4 Logs zur selben Zeit liegen quer über die Seitengrenzen (limit 3)
+    log_dates = ["2026-10-01T08:00:00Z"] + ["2026-10-02T12:00:00Z"] * 4 + ["2026-10-03T08:00:00Z"] * 2
+    logs = run(client.post("/api/consumption_logs/bulk", json=[
+        {"food_id": food["id"], "amount_g": 100 + i, "log_date": log_date} for i, log_date in enumerate(log_dates)
+    ])).json()
+
+    items, page_sizes = _walk(run, client, "consumption_logs", limit=3)
+    assert page_sizes == [3, 3, 1]
+    ids = [item["id"] for item in items]
+    assert len(ids) == len(set(ids)) and set(ids) == {log["id"] for log in logs}
+    # Neueste zuerst, bei gleichem Zeitpunkt die höhere ID zuerst
+    assert [(item["log_date"], item["id"]) for item in items] == sorted(
+        ((item["log_date"], item["id"]) for item in items), reverse=True
+    )
+
+
+def test_catalog_pages_with_equal_names(run, client):
+    foods = run(client.post("/api/foods/bulk", json=[
+        {"name": name, "calories_kcal": 100} for name in ("Brot", "Apfel", "Apfel", "Apfel", "Käse", "Apfel")
+    ])).json()
+
+    items, page_sizes = _walk(run, client, "foods", limit=2)
+    # Genau aufgehende Seiten: die letzte volle Seite hat keinen Cursor, es folgt keine leere
+    assert page_sizes == [2, 2, 2]
+    assert [item["id"] for item in items] == [
+        food["id"] for food in sorted(foods, key=lambda food: (food["name"], food["id"]))
+    ]
+
+
+def test_single_page_has_no_next_cursor(run, client):
+    run(client.post("/api/foods", json={"name": "Apfel", "calories_kcal": 52}))
+    response = run(client.get("/api/foods", params={"limit": 10}))
+    assert response.status_code == 200 and len(response.json()) == 1
+    assert "X-Next-Cursor" not in response.headers and "Link" not in response.headers
+
+
+def _cursor(value) -> str:
+    return base64.urlsafe_b64encode(json.dumps(value).encode()).decode()
+
+
+@pytest.mark.parametrize("cursor", [
+    "kein-cursor",
+    base64.urlsafe_b64encode(b"{kein json").decode(),
+    _cursor(["2026-10-01T08:00:00+00:00"]),
+    _cursor(["kein Datum", 1]),
+    _cursor(["2026-10-01T08:00:00+00:00", "x"]),
+])
+def test_malformed_cursor_is_rejected(run, client, cursor):
+    response = run(client.get("/api/consumption_logs", params={"cursor": cursor}))
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Invalid cursor"
+
+
+def test_catalog_cursor_needs_a_name(run, client):
+    response = run(client.get("/api/foods", params={"cursor": _cursor([42, 1])}))
+    assert response.status_code == 400
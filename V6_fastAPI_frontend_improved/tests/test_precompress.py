@@ -0,0 +1,24 @@
+"""Der Build-Schritt versioniert die Asset-Links in einer Kopie von index.html, nie im Template selbst."""
+import precompress_static
+
+
+def test_stamp_writes_a_copy_and_leaves_the_template_alone(tmp_path):
+    template = precompress_static.INDEX_HTML.read_bytes()
+    target = tmp_path / "build" / "index.html"
+
+    assert precompress_static.stamp_index_html("abc123", target=target) == target
+    assert precompress_static.INDEX_HTML.read_bytes() == template
+    html = target.read_text(encoding="utf-8")
+    assert 'href="/static/css/styles.css?v=abc123"' in html
+    assert 'src="/static/js/app.js?v=abc123"' in html
+
+    # Erneut mit neuer Version (Quelle bereits versioniert): kein doppeltes ?v=
+    precompress_static.stamp_index_html("def456", source=target, target=target)
+    assert "?v=abc123" not in target.read_text(encoding="utf-8")
+    assert target.read_text(encoding="utf-8").count("?v=def456") == 2
+
+
+def test_root_serves_index_html(run, client):
+    response = run(client.get("/"))
+    assert response.status_code == 200
+    assert "/static/js/app.js" in response.text
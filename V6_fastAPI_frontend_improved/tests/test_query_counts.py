@@ -0,0 +1,110 @@
+"""
+Anzahl der SQL-Statements pro Request. Listen (GET /api/{entity_name}) und die Hydrierung
+(GET /api/tracking-data) dürfen nicht mit der Zahl der Einträge wachsen: Anzeige-Felder
+der Logs (food_name, calories, ...) kommen als column_properties mit derselben Abfrage.
+Einzelne Schreibzugriffe (POST/PUT) haben eine feste Zahl an Statements, siehe WRITE_STATEMENTS.
+"""
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from tracker.api.api_entity_config import ENTITY_MAP
+
+# Statements je POST bzw. PUT eines Eintrags auf SQLite. Foods/Bewegungsformen: Versions-Bump und
+# INSERT/UPDATE ... RETURNING, beim PUT zusätzlich die betroffenen Logs und deren Tage.
+# Logs: dazu Verweisprüfung, Nachladen der berechneten Felder, Upsert in den Tages-Rollup sowie
+# UPDATE und INSERT des Nutzungs-Rankings, beim PUT vorher Rollup und Ranking der alten Werte.
+# Auf PostgreSQL laufen Nachladen, Rollup und Ranking im selben Statement (3 statt 7 bzw. 9).
+WRITE_STATEMENTS = {
+    'foods': (2, 4),
+    'exercise_types': (2, 4),
+    'consumption_logs': (7, 9),
+    'activity_logs': (7, 9),
+}
+
+
+def _seed(run, client, count: int) -> None:
+    """Je `count` Foods, Bewegungsformen und Logs, jeder Log mit eigenem Food bzw. eigener Bewegungsform."""
+    start = datetime(2026, 1, 1, 12, tzinfo=timezone.utc)
+    foods = run(client.post("/api/foods/bulk", json=[
+        {"name": f"Food {i}", "calories_kcal": 100 + i} for i in range(count)
+    ])).json()
+    exercise_types = run(client.post("/api/exercise_types/bulk", json=[
+        {"name": f"Exercise {i}", "calories_per_hour": 300 + i} for i in range(count)
+    ])).json()
+    run(client.post("/api/consumption_logs/bulk", json=[
+        {"food_id": food["id"], "amount_g": 150, "log_date": (start + timedelta(hours=i)).isoformat()}
+        for i, food in enumerate(foods)
+    ]))
+    run(client.post("/api/activity_logs/bulk", json=[
+        {"exercise_type_id": exercise_type["id"], "duration_min": 30,
+         "log_date": (start + timedelta(hours=i)).isoformat()}
+        for i, exercise_type in enumerate(exercise_types)
+    ]))
+
+
+def _count_statements(run, client, statements, url: str) -> tuple[int, list]:
+    # Aufwärmen, damit der Benutzer aus dem Cache kommt und nicht mitgezählt wird
+    run(client.get(url))
+    statements.clear()
+    response = run(client.get(url))
+    assert response.status_code == 200
+    return len(statements), response.json()
+
+
+@pytest.mark.parametrize('entity_name', list(ENTITY_MAP))
+def test_list_statement_count_is_constant(run, client, statements, entity_name):
+    _seed(run, client, 2)
+    few, items = _count_statements(run, client, statements, f"/api/{entity_name}?limit=1000")
+    assert len(items) == 2
+
+    _seed(run, client, 48)
+    many, items = _count_statements(run, client, statements, f"/api/{entity_name}?limit=1000")
+    assert len(items) == 50
+    assert many == few
+
+
+def test_tracking_data_statement_count_is_constant(run, client, statements):
+    _seed(run, client, 2)
+    few, data = _count_statements(run, client, statements, "/api/tracking-data")
+    assert len(data["consumption_logs"]) == 2
+
+    _seed(run, client, 48)
+    many, data = _count_statements(run, client, statements, "/api/tracking-data")
+    assert len(data["consumption_logs"]) == 50
+    assert all(log["food_name"].startswith("Food ") and log["calories"] > 0 for log in data["consumption_logs"])
+    assert many == few
+
+
+def _write_body(run, client, entity_name: str) -> dict:
+    if entity_name == 'consumption_logs':
+        food = run(client.get("/api/foods?limit=1")).json()[0]
+        return {"food_id": food["id"], "amount_g": 120, "log_date": "2026-02-01T10:00:00Z"}
+    if entity_name == 'activity_logs':
+        exercise_type = run(client.get("/api/exercise_types?limit=1")).json()[0]
+        return {"exercise_type_id": exercise_type["id"], "duration_min": 45, "log_date": "2026-02-01T10:00:00Z"}
+    if entity_name == 'foods':
+        return {"name": "Neues Food", "calories_kcal": 80}
+    return {"name": "Neue Bewegung", "calories_per_hour": 400}
+
+
+def _count_writes(run, client, statements, entity_name: str) -> tuple[int, int]:
+    body = _write_body(run, client, entity_name)
+    statements.clear()
+    response = run(client.post(f"/api/{entity_name}", json=body))
+    assert response.status_code == 201
+    created = len(statements)
+
+    statements.clear()
+    response = run(client.put(f"/api/{entity_name}/{response.json()['id']}", json=body))
+    assert response.status_code == 200
+    return created, len(statements)
+
+
+@pytest.mark.parametrize('entity_name', list(ENTITY_MAP))
+def test_write_statement_count_is_fixed(run, client, statements, entity_name):
+    _seed(run, client, 2)
+    assert _count_writes(run, client, statements, entity_name) == WRITE_STATEMENTS[entity_name]
+
+    _seed(run, client, 48)
+    assert _count_writes(run, client, statements, entity_name) == WRITE_STATEMENTS[entity_name]
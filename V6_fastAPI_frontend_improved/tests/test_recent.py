@@ -0,0 +1,57 @@
+"""
+Ranking der zuletzt/häufig genutzten Foods (/api/{entity_name}/recent): jeder Log zählt mit
+einer Halbwertszeit von 14 Tagen, viele alte Logs wiegen also weniger als ein neuer. Gelöschte
+Logs werden sofort aus dem Ranking herausgerechnet.
+"""
+from datetime import datetime, timedelta, timezone
+
+
+def _recent(run, client, entity_name: str = "foods", **params) -> list[str]:
+    response = run(client.get(f"/api/{entity_name}/recent", params=params))
+    assert response.status_code == 200
+    return [item["name"] for item in response.json()]
+
+
+def _days_ago(days: float) -> str:
+    return (datetime.now(timezone.utc) - timedelta(days=days)).isoformat()
+
+
+def test_recent_logs_outrank_many_old_ones(run, client):
+    foods = run(client.post("/api/foods/bulk", json=[
+        {"name": name, "calories_kcal": 100} for name in ("Oft", "Neu", "Mittel", "Nie")
+    ])).json()
+    food_ids = {food["name"]: food["id"] for food in foods}
+    # Gewichte: 5 x 2^(-90/14) ≈ 0.06, 1 x 2^(-1/14) ≈ 0.95, 3 x 2^(-10/14) ≈ 1.83
+    logs = run(client.post("/api/consumption_logs/bulk", json=[
+        *({"food_id": food_ids["Oft"], "amount_g": 100, "log_date": _days_ago(90)} for _ in range(5)),
+        {"food_id": food_ids["Neu"], "amount_g": 100, "log_date": _days_ago(1)},
+        *({"food_id": food_ids["Mittel"], "amount_g": 100, "log_date": _days_ago(10)} for _ in range(3)),
+    ])).json()
+    assert _recent(run, client) == ["Mittel", "Neu", "Oft"]
+    assert _recent(run, client, limit=2) == ["Mittel", "Neu"]
+
+    # Zwei von drei Logs gelöscht: 0.61 liegt jetzt unter dem einen neuen Log
+    middle = [log["id"] for log in logs if log["food_id"] == food_ids["Mittel"]]
+    assert run(client.delete(f"/api/consumption_logs/{middle[0]}")).status_code == 204
+    assert run(client.request("DELETE", "/api/consumption_logs/bulk", json={"ids": [middle[1]]})).status_code == 200
+    assert _recent(run, client) == ["Neu", "Mittel", "Oft"]
+
+    # Ohne Logs fällt ein Food ganz aus dem Ranking
+    [new_log] = [log["id"] for log in logs if log["food_id"] == food_ids["Neu"]]
+    assert run(client.delete(f"/api/consumption_logs/{new_log}")).status_code == 204
+    assert _recent(run, client) == ["Mittel", "Oft"]
+
+
+def test_moving_a_log_updates_the_ranking(run, client):
+    running = run(client.post("/api/exercise_types", json={"name": "Laufen", "calories_per_hour": 600})).json()
+    cycling = run(client.post("/api/exercise_types", json={"name": "Radfahren", "calories_per_hour": 500})).json()
+    old = run(client.post("/api/activity_logs", json={
+        "exercise_type_id": running["id"], "duration_min": 30, "log_date": _days_ago(60)
+    })).json()
+    run(client.post("/api/activity_logs", json={
+        "exercise_type_id": cycling["id"], "duration_min": 30, "log_date": _days_ago(20)
+    }))
+    assert _recent(run, client, "exercise_types") == ["Radfahren", "Laufen"]
+
+    assert run(client.put(f"/api/activity_logs/{old['id']}", json={"log_date": _days_ago(0)})).status_code == 200
+    assert _recent(run, client, "exercise_types") == ["Laufen", "Radfahren"]
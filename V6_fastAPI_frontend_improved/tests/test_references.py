@@ -0,0 +1,89 @@
+"""
+Logs dürfen nur auf Foods bzw. Bewegungsformen des eigenen Benutzers verweisen, und
+Logs ohne (existierendes) Food werden mit leerem Namen und 0 kcal ausgeliefert statt mit NULL.
+"""
+from datetime import datetime, timezone
+
+from sqlalchemy import insert
+
+from conftest import create_user
+from tracker.database import engine
+from tracker.models.entity_models import ConsumptionLog, Food
+
+LOG_DATE = "2026-10-01T10:00:00Z"
+
+
+def _foreign_food_id(run) -> int:
+    async def create():
+        other_user_id = await create_user()
+        async with engine.begin() as conn:
+            return await conn.scalar(insert(Food).values(user_id=other_user_id, name="Foreign").returning(Food.id))
+    return run(create())
+
+
+def test_unknown_and_foreign_parents_are_rejected(run, client):
+    food = run(client.post("/api/foods", json={"name": "Apfel", "calories_kcal": 52})).json()
+    foreign_id = _foreign_food_id(run)
+
+    for food_id in (999_999, foreign_id):
+        response = run(client.post("/api/consumption_logs", json={"food_id": food_id, "amount_g": 100, "log_date": LOG_DATE}))
+        assert response.status_code == 422
+    response = run(client.post("/api/activity_logs", json={"exercise_type_id": 999_999, "duration_min": 30, "log_date": LOG_DATE}))
+    assert response.status_code == 422
+
+    log = run(client.post("/api/consumption_logs", json={"food_id": food["id"], "amount_g": 100, "log_date": LOG_DATE})).json()
+    assert (log["food_name"], log["calories"]) == ("Apfel", 52.0)
+    response = run(client.put(f"/api/consumption_logs/{log['id']}", json={"food_id": foreign_id}))
+    assert response.status_code == 422
+    response = run(client.request("PATCH", "/api/consumption_logs/bulk", json={"ids": [log["id"]], "changes": {"food_id": foreign_id}}))
+    assert response.status_code == 422
+
+    logs = run(client.get("/api/consumption_logs")).json()
+    assert [(item["food_id"], item["food_name"]) for item in logs] == [(food["id"], "Apfel")]
+
+
+def test_log_without_food_is_served_with_defaults(run, client, user_id):
+    async def insert_orphan():
+        async with engine.begin() as conn:
+            await conn.execute(insert(ConsumptionLog).values(
+                user_id=user_id, food_id=999_999, amount_g=100, log_date=datetime(2026, 10, 1, 10, tzinfo=timezone.utc)
+            ))
+    run(insert_orphan())
+
+    response = run(client.get("/api/tracking-data"))
+    assert response.status_code == 200
+    [log] = response.json()["consumption_logs"]
+    assert (log["food_name"], log["calories"]) == ("", 0.0)
+
+
+def test_bulk_create_with_unknown_parent_persists_nothing(run, client):
+    food = run(client.post("/api/foods", json={"name": "Apfel", "calories_kcal": 52})).json()
+    foreign_id = _foreign_food_id(run)
+    version = run(client.get("/api/tracking-data")).json()["version"]
+
+    for bad_id in (999_999, foreign_id):
+        response = run(client.post("/api/consumption_logs/bulk", json=[
+            {"food_id": food["id"], "amount_g": 100, "log_date": LOG_DATE},
+            {"food_id": bad_id, "amount_g": 50, "log_date": LOG_DATE},
+        ]))
+        assert response.status_code == 422
+        assert str(bad_id) in response.json()["detail"]
+
+    data = run(client.get("/api/tracking-data")).json()
+    assert data["consumption_logs"] == [] and data["version"] == version
+
+
+def test_bulk_create_without_log_date_is_rejected_per_item(run, client):
+    food = run(client.post("/api/foods", json={"name": "Apfel", "calories_kcal": 52})).json()
+
+    response = run(client.post("/api/consumption_logs/bulk", json=[
+        {"food_id": food["id"], "amount_g": 100, "log_date": LOG_DATE},
+        {"food_id": food["id"], "amount_g": 50},
+        {"food_id": food["id"], "amount_g": 80, "log_date": None},
+    ]))
+    assert response.status_code == 422
+    assert [error["loc"] for error in response.json()["detail"]] == [[1, "log_date"], [2, "log_date"]]
+
+    response = run(client.post("/api/activity_logs", json={"exercise_type_id": 1, "duration_min": 30}))
+    assert response.status_code == 422
+    assert run(client.get("/api/tracking-data")).json()["consumption_logs"] == []
@@ -0,0 +1,95 @@
+"""
+Tages-Rollup und Nutzungs-Ranking werden bei Log-Änderungen inkrementell gepflegt (Deltas
+der alten und neuen Werte). Nach einer Folge von Schreibzugriffen über alle Wege (einzeln,
+Bulk, Cascade beim Löschen eines Foods, geänderte Kalorien) müssen sie genau dem
+entsprechen, was rollup_crud.rebuild aus den Logs neu aufbaut.
+"""
+import math
+
+from sqlalchemy import select
+
+from tracker.crud import rollup_crud
+from tracker.database import AsyncSessionLocal, engine
+from tracker.models.rollup_models import CatalogUsage, DailyEnergyRollup
+
+
+def _snapshot(run, user_id: int) -> tuple[dict, dict]:
+    async def load():
+        async with engine.connect() as conn:
+            days = await conn.execute(
+                select(DailyEnergyRollup.day, DailyEnergyRollup.kcal_in, DailyEnergyRollup.kcal_out_active,
+                       DailyEnergyRollup.n_entries)
+                .where(DailyEnergyRollup.user_id == user_id, DailyEnergyRollup.n_entries > 0)
+            )
+            usage = await conn.execute(
+                select(CatalogUsage.entity, CatalogUsage.item_id, CatalogUsage.score, CatalogUsage.use_count)
+                .where(CatalogUsage.user_id == user_id, CatalogUsage.use_count > 0)
+            )
+            return (
+                {day: (kcal_in, kcal_out, count) for day, kcal_in, kcal_out, count in days.all()},
+                {(entity, item_id): (score, count) for entity, item_id, score, count in usage.all()},
+            )
+    return run(load())
+
+
+def _rebuild(run, user_id: int) -> None:
+    async def rebuild():
+        async with AsyncSessionLocal() as db:
+            await rollup_crud.rebuild(db, user_id)
+            await db.commit()
+    run(rebuild())
+
+
+def test_incremental_rollup_and_usage_match_rebuild(run, client, user_id):
+    apple, bread, cake = (
+        run(client.post("/api/foods", json={"name": name, "calories_kcal": kcal})).json()
+        for name, kcal in (("Apfel", 52), ("Brot", 250), ("Kuchen", 400))
+    )
+    running = run(client.post("/api/exercise_types", json={"name": "Laufen", "calories_per_hour": 600})).json()
+
+    logs = [
+        run(client.post("/api/consumption_logs", json={
+            "food_id": food["id"], "amount_g": amount, "log_date": log_date
+        })).json()
+        for food, amount, log_date in (
+            (apple, 150, "2026-10-01T08:00:00Z"), (apple, 120, "2026-10-02T08:00:00Z"),
+            (bread, 80, "2026-10-02T12:00:00Z"), (cake, 100, "2026-10-03T15:00:00Z"),
+        )
+    ]
+    bulk = run(client.post("/api/consumption_logs/bulk", json=[
+        {"food_id": bread["id"], "amount_g": 60, "log_date": "2026-10-04T07:30:00Z"},
+        {"food_id": apple["id"], "amount_g": 200, "log_date": "2026-10-04T19:00:00Z"},
+        {"food_id": cake["id"], "amount_g": 50, "log_date": "2026-10-05T16:00:00Z"},
+    ])).json()
+    activity = run(client.post("/api/activity_logs", json={
+        "exercise_type_id": running["id"], "duration_min": 45, "log_date": "2026-10-02T18:00:00Z"
+    })).json()
+
+    # Einzeln: Food, Menge und Tag ändern; Bulk: Tag mehrerer Logs verschieben
+    assert run(client.put(f"/api/consumption_logs/{logs[0]['id']}", json={
+        "food_id": bread["id"], "amount_g": 90, "log_date": "2026-10-03T09:00:00Z"
+    })).status_code == 200
+    assert run(client.put(f"/api/activity_logs/{activity['id']}", json={"duration_min": 30})).status_code == 200
+    response = run(client.request("PATCH", "/api/consumption_logs/bulk", json={
+        "ids": [logs[1]["id"], bulk[0]["id"]], "changes": {"log_date": "2026-10-06T10:00:00Z"}
+    }))
+    assert response.status_code == 200
+
+    # Löschen: einzeln, per Bulk und per Cascade mit dem Food; dazu geänderte Kalorien eines Foods
+    assert run(client.delete(f"/api/consumption_logs/{logs[2]['id']}")).status_code == 204
+    assert run(client.request("DELETE", "/api/consumption_logs/bulk", json={"ids": [bulk[1]["id"]]})).status_code == 200
+    assert run(client.delete(f"/api/foods/{cake['id']}")).status_code == 204
+    assert run(client.put(f"/api/foods/{bread['id']}", json={"name": "Brot", "calories_kcal": 270})).status_code == 200
+
+    days, usage = _snapshot(run, user_id)
+    _rebuild(run, user_id)
+    rebuilt_days, rebuilt_usage = _snapshot(run, user_id)
+
+    assert days == rebuilt_days
+    assert usage.keys() == rebuilt_usage.keys() == {
+        ('foods', apple['id']), ('foods', bread['id']), ('exercise_types', running['id']),
+    }
+    for key, (score, count) in usage.items():
+        rebuilt_score, rebuilt_count = rebuilt_usage[key]
+        assert count == rebuilt_count
+        assert math.isclose(score, rebuilt_score, abs_tol=1e-9)
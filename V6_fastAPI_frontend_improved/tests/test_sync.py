@@ -0,0 +1,86 @@
+"""
+Delta-Sync (GET /api/tracking-data/changes?since=N): nach einer gecachten Version kommen nur
+neue und geänderte Einträge sowie Tombstones gelöschter Einträge (auch per Cascade).
+"""
+
+
+def _version(run, client) -> int:
+    return run(client.get("/api/tracking-data")).json()["version"]
+
+
+def _changes(run, client, since: int) -> dict:
+    response = run(client.get("/api/tracking-data/changes", params={"since": since}))
+    assert response.status_code == 200
+    return response.json()
+
+
+def _ids(changes: dict) -> dict:
+    """Geänderte und gelöschte IDs pro Entity-Typ, ohne leere Listen."""
+    entities = ('foods', 'exercise_types', 'consumption_logs', 'activity_logs')
+    changed = {name: sorted(item["id"] for item in changes[name]) for name in entities if changes[name]}
+    deleted = {name: sorted(ids) for name, ids in changes["deleted"].items() if ids}
+    return {'changed': changed, 'deleted': deleted}
+
+
+def test_changes_since_version_with_tombstones(run, client):
+    start = _version(run, client)
+    assert _ids(_changes(run, client, start)) == {'changed': {}, 'deleted': {}}
+
+    # Anlegen
+    apple, bread = (
+        run(client.post("/api/foods", json={"name": name, "calories_kcal": kcal})).json()
+        for name, kcal in (("Apfel", 52), ("Brot", 250))
+    )
+    logs = run(client.post("/api/consumption_logs/bulk", json=[
+        {"food_id": apple["id"], "amount_g": 100, "log_date": "2026-10-01T08:00:00Z"},
+        {"food_id": bread["id"], "amount_g": 80, "log_date": "2026-10-01T12:00:00Z"},
+        {"food_id": bread["id"], "amount_g": 60, "log_date": "2026-10-02T12:00:00Z"},
+    ])).json()
+    created = _changes(run, client, start)
+    assert _ids(created) == {
+        'changed': {'foods': sorted([apple["id"], bread["id"]]), 'consumption_logs': sorted(log["id"] for log in logs)},
+        'deleted': {},
+    }
+    assert created["version"] == _version(run, client) > start
+
+    # Ändern: nur der geänderte Log kommt seit der letzten Version
+    after_create = created["version"]
+    run(client.put(f"/api/consumption_logs/{logs[0]['id']}", json={"amount_g": 150}))
+    updated = _changes(run, client, after_create)
+    assert _ids(updated) == {'changed': {'consumption_logs': [logs[0]["id"]]}, 'deleted': {}}
+    assert (updated["consumption_logs"][0]["amount_g"], updated["consumption_logs"][0]["calories"]) == (150, 78.0)
+
+    # Ein umbenanntes Food liefert auch seine Logs neu (food_name ist Teil des Logs)
+    after_update = updated["version"]
+    run(client.put(f"/api/foods/{apple['id']}", json={"name": "Grüner Apfel", "calories_kcal": 52}))
+    renamed = _changes(run, client, after_update)
+    assert _ids(renamed) == {'changed': {'foods': [apple["id"]], 'consumption_logs': [logs[0]["id"]]}, 'deleted': {}}
+    assert renamed["consumption_logs"][0]["food_name"] == "Grüner Apfel"
+
+    # Löschen: einzeln und per Cascade mit dem Food, beides als Tombstone
+    after_rename = renamed["version"]
+    assert run(client.delete(f"/api/consumption_logs/{logs[0]['id']}")).status_code == 204
+    assert run(client.delete(f"/api/foods/{bread['id']}")).status_code == 204
+    deleted = _changes(run, client, after_rename)
+    assert _ids(deleted) == {
+        'changed': {},
+        'deleted': {'foods': [bread["id"]], 'consumption_logs': sorted(log["id"] for log in logs)},
+    }
+
+    # Seit dem Start: Gelöschte erscheinen nur als Tombstone, nicht mehr als geändert
+    assert _ids(_changes(run, client, start)) == {
+        'changed': {'foods': [apple["id"]]},
+        'deleted': {'foods': [bread["id"]], 'consumption_logs': sorted(log["id"] for log in logs)},
+    }
+    # Ohne neue Änderungen bleibt die Antwort leer
+    assert _ids(_changes(run, client, deleted["version"])) == {'changed': {}, 'deleted': {}}
+
+
+def test_profile_changes_are_synced(run, client):
+    since = _version(run, client)
+    assert _changes(run, client, since)["user_profile"] is None
+
+    assert run(client.put("/api/profile", json={"weight_kg": 72.5})).status_code == 200
+    changes = _changes(run, client, since)
+    assert changes["user_profile"]["weight_kg"] == 72.5
+    assert _changes(run, client, changes["version"])["user_profile"] is None
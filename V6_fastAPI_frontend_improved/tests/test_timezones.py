@@ -0,0 +1,106 @@
+"""
+Kalendertage in der Zeitzone des Benutzers an den Umstellungstagen der Sommerzeit
+(Europe/Berlin 2026: 29.03. hat 23 Stunden, 25.10. hat 25 Stunden). Geprüft werden die
+SQLite-Funktion local_day hinter log_day() und die Tage, denen der Rollup die Logs zuordnet.
+"""
+from datetime import date, datetime, timedelta, timezone
+
+import httpx
+import pytest
+from sqlalchemy import insert, select
+
+from conftest import create_user
+from main import app
+from tracker import security
+from tracker.database import engine
+from tracker.models.entity_models import ConsumptionLog
+from tracker.models.rollup_models import DailyEnergyRollup, log_day, utc_range
+
+TZ = 'Europe/Berlin'
+
+# UTC-Zeitstempel -> Kalendertag in Berlin
+CASES = [
+    (datetime(2026, 3, 28, 22, 30, tzinfo=timezone.utc), date(2026, 3, 28)),   # 23:30 CET
+    (datetime(2026, 3, 28, 23, 30, tzinfo=timezone.utc), date(2026, 3, 29)),   # 00:30 CET, Tag der Umstellung
+    (datetime(2026, 3, 29, 21, 30, tzinfo=timezone.utc), date(2026, 3, 29)),   # 23:30 CEST
+    (datetime(2026, 10, 24, 22, 30, tzinfo=timezone.utc), date(2026, 10, 25)),  # 00:30 CEST, Tag der Umstellung
+    (datetime(2026, 10, 25, 22, 30, tzinfo=timezone.utc), date(2026, 10, 25)),  # 23:30 CET
+    (datetime(2026, 10, 25, 23, 30, tzinfo=timezone.utc), date(2026, 10, 26)),  # 00:30 CET
+]
+
+
+def test_utc_range_has_23_and_25_hour_days():
+    for day, hours in ((date(2026, 3, 29), 23), (date(2026, 10, 25), 25), (date(2026, 10, 26), 24)):
+        start, end = utc_range(day, day, TZ)
+        assert end - start == timedelta(hours=hours)
+
+
+def test_local_day_sql_function_on_dst_days(run, user_id):
+    async def local_days():
+        async with engine.begin() as conn:
+            ids = [
+                await conn.scalar(insert(ConsumptionLog).values(
+                    user_id=user_id, food_id=1, amount_g=100, log_date=log_date
+                ).returning(ConsumptionLog.id))
+                for log_date, _ in CASES
+            ]
+            rows = await conn.execute(
+                select(ConsumptionLog.id, log_day(ConsumptionLog.log_date, TZ)).where(ConsumptionLog.user_id == user_id)
+            )
+            by_id = dict(rows.all())
+            return [by_id[log_id] for log_id in ids]
+
+    assert run(local_days()) == [day for _, day in CASES]
+
+
+@pytest.fixture
+def berlin_client(run):
+    user_id = run(create_user(timezone=TZ))
+    token = security.create_access_token(data={"sub": str(user_id)})
+    api_client = httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app), base_url="http://test",
+        headers={"Authorization": f"Bearer {token}"},
+    )
+    yield user_id, api_client
+    run(api_client.aclose())
+
+
+def _rollup_days(run, user_id: int) -> dict:
+    async def load():
+        async with engine.connect() as conn:
+            rows = await conn.execute(
+                select(DailyEnergyRollup.day, DailyEnergyRollup.n_entries).where(DailyEnergyRollup.user_id == user_id)
+            )
+            return dict(rows.all())
+    return run(load())
+
+
+def test_rollup_assigns_logs_to_local_days_on_dst_days(run, berlin_client):
+    user_id, client = berlin_client
+    food = run(client.post("/api/foods", json={"name": "Apfel", "calories_kcal": 100})).json()
+
+    # Einzeln und als Bulk angelegt; der Rollup ordnet jeden Log über log_day (SQL) seinem Ortstag zu.
+    half = len(CASES) // 2
+    log_ids = []
+    for log_date, _ in CASES[:half]:
+        response = run(client.post("/api/consumption_logs", json={
+            "food_id": food["id"], "amount_g": 100, "log_date": log_date.isoformat()
+        }))
+        assert response.status_code == 201
+        log_ids.append(response.json()["id"])
+    response = run(client.post("/api/consumption_logs/bulk", json=[
+        {"food_id": food["id"], "amount_g": 100, "log_date": log_date.isoformat()} for log_date, _ in CASES[half:]
+    ]))
+    assert response.status_code == 201
+
+    assert _rollup_days(run, user_id) == {
+        date(2026, 3, 28): 1, date(2026, 3, 29): 2, date(2026, 10, 25): 2, date(2026, 10, 26): 1,
+    }
+
+    # 23:30 am 28.03. auf 00:30 am 29.03. verschieben (gleicher UTC-Tag): der alte Tag (per
+    # log_day in SQL ermittelt) wird geleert und bleibt mit 0 Einträgen stehen, der Rollup folgt dem Ortstag
+    response = run(client.put(f"/api/consumption_logs/{log_ids[0]}", json={"log_date": CASES[1][0].isoformat()}))
+    assert response.status_code == 200
+    assert _rollup_days(run, user_id) == {
+        date(2026, 3, 28): 0, date(2026, 3, 29): 3, date(2026, 10, 25): 2, date(2026, 10, 26): 1,
+    }
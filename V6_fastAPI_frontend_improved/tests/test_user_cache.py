@@ -0,0 +1,25 @@
+"""Der UserCache teilt unveränderliche Schnappschüsse zwischen Requests, keine ORM-Objekte."""
+import pydantic
+import pytest
+
+from tracker import security
+from tracker.auth.user_cache import user_cache
+from tracker.database import AsyncSessionLocal
+from tracker.schemas.entity_schemas import CurrentUser
+
+
+def test_current_user_is_a_frozen_snapshot_on_miss_and_hit(run, user_id):
+    token = security.create_access_token(data={"sub": str(user_id)})
+
+    async def current_user():
+        async with AsyncSessionLocal() as db:
+            return await security.get_current_user(token=token, db=db)
+
+    user_cache.invalidate(user_id)
+    from_db = run(current_user())
+    from_cache = run(current_user())
+
+    assert type(from_db) is CurrentUser and from_cache is from_db
+    assert user_cache.get(user_id) is from_db
+    with pytest.raises(pydantic.ValidationError):
+        from_cache.user_id = user_id + 1
@@ -1,21 +1,29 @@
 import asyncio
+import base64
+import hashlib
+import json
+from datetime import datetime, date
 # Erforderliche Imports hinzugefügt
-from fastapi import APIRouter, Depends, HTTPException, status, Request
+from fastapi import APIRouter, Depends, HTTPException, status, Request, Query, Response
+from fastapi.responses import StreamingResponse
 from pydantic import ValidationError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from sqlalchemy.exc import IntegrityError
-from typing import List, Any
+from typing import List, Any, Optional, Literal
 
 from tracker import security
 from tracker.crud import entity_crud
-from tracker.database import get_db
+from tracker.database import get_db, AsyncSessionLocal, parallel_query_slots
 
-from tracker.models import entity_models, user_models
+from tracker.models import entity_models
 from tracker.schemas import entity_schemas
 from tracker.api.api_entity_config import get_entity_config
+from tracker.api.responses import SchemaJSONResponse, get_type_adapter
+from tracker.config import settings
 
-from tracker.crud import profile_crud
+from tracker.crud import profile_crud, sync_crud, catalog_crud
+from tracker.services import dashboard_service, export_service, import_service, nutrient_service
 
 # --- ASYNC DB CHANGES ---
 
@@ -62,63 +70,374 @@ async def get_update_data(entity_name: str, request: Request):
         raise HTTPException(status_code=400, detail="Invalid JSON data")
 
 
+# --- ETAGS ---
+# ETags basieren auf den Änderungszählern (SyncState) und nicht auf dem Response-Body:
+# ein unveränderter Stand kostet so nur eine PK-Abfrage statt Laden + Serialisieren.
+
+def _make_etag(user_id: int, *parts) -> str:
+    # user_id gehört dazu, damit ein geteilter Browser-Cache nie Daten eines anderen Benutzers bestätigt
+    return '"' + "-".join(str(part) for part in (user_id, *parts)) + '"'
+
+def _etag_matches(request: Request, etag: str) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidates or etag in candidates
+
+def _etag_headers(etag: str) -> dict:
+    # no-cache: Browser darf cachen, muss aber immer per If-None-Match revalidieren
+    return {"ETag": etag, "Cache-Control": "private, no-cache"}
+
+def _not_modified(etag: str) -> Response:
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=_etag_headers(etag))
+
+
+async def get_bulk_create_data(entity_name: str, request: Request):
+    """
+    Dependency, die ein JSON-Array für Bulk-Erstellungen parst.
+    Validiert wird die ganze Liste auf einmal über einen TypeAdapter.
+    """
+    config = get_entity_config(entity_name)
+    try:
+        json_data = await request.json()
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid JSON data")
+    if not isinstance(json_data, list) or not json_data:
+        raise HTTPException(status_code=400, detail="Expected a non-empty JSON array")
+    if len(json_data) > settings.BULK_MAX_ITEMS:
+        raise HTTPException(status_code=413, detail=f"At most {settings.BULK_MAX_ITEMS} items per request")
+    try:
+        return get_type_adapter(List[config['create_schema']]).validate_python(json_data)
+    except ValidationError as e:
+        raise HTTPException(status_code=422, detail=e.errors())
+
+
 # --- TRACKING DATA ENDPOINT ---
 
+async def _in_own_session(crud_func, **kwargs):
+    """
+    Führt eine CRUD-Funktion mit einer eigenen Session (und damit eigener Pool-Verbindung) aus.
+    Eine AsyncSession kann keine Statements parallel ausführen, für echtes
+    asyncio.gather braucht daher jede Abfrage ihre eigene Session.
+    Jede Abfrage belegt dabei einen von parallel_query_slots, bevor sie eine Verbindung holt.
+    Wartende Abfragen halten also keine Verbindung, und viele gleichzeitige Hydrierungen
+    laufen langsamer statt den Pool zu leeren (bzw. in pool_timeout zu laufen).
+    """
+    async with parallel_query_slots:
+        async with AsyncSessionLocal() as session:
+            return await crud_func(session, **kwargs)
+
 @router.get("/tracking-data", response_model=entity_schemas.AllTrackingData)
 async def get_all_tracking_data(
-    current_user: user_models.User = Depends(security.get_current_user),
-    db: AsyncSession = Depends(get_db)
+    request: Request,
+    current_user: entity_schemas.CurrentUser = Depends(security.get_current_user)
 ):
     """
     Holt alle relevanten Tracking-Daten für den aktuellen Benutzer in einer einzigen Anfrage.
     Dieser Endpunkt wird zur initialen Hydrierung des Frontend-Anwendungszustands verwendet.
     """
     user_id = current_user.user_id
+
+    # Version vor den Daten lesen: parallele Änderungen kommen beim nächsten Delta erneut
+    version = await _in_own_session(sync_crud.get_version, user_id=user_id)
+    etag = _make_etag(user_id, "tracking", version)
+    if _etag_matches(request, etag):
+        return _not_modified(etag)
     
-    # Parallele Ausführung aller Datenbankabfragen = performanter als sequentielle
+    # Parallele Ausführung aller Datenbankabfragen auf getrennten Verbindungen
     tasks = [
-        entity_crud.get_items_by_user(db, user_id=user_id, model_class=entity_models.Food),
-        entity_crud.get_items_by_user(db, user_id=user_id, model_class=entity_models.ExerciseType),
-        entity_crud.get_items_by_user(db, user_id=user_id, model_class=entity_models.ConsumptionLog),
-        entity_crud.get_items_by_user(db, user_id=user_id, model_class=entity_models.ActivityLog),
-        profile_crud.get_user_profile(db, user_id=user_id)
+        _in_own_session(entity_crud.get_items_by_user, user_id=user_id, model_class=entity_models.Food),
+        _in_own_session(entity_crud.get_items_by_user, user_id=user_id, model_class=entity_models.ExerciseType),
+        _in_own_session(entity_crud.get_items_by_user, user_id=user_id, model_class=entity_models.ConsumptionLog),
+        _in_own_session(entity_crud.get_items_by_user, user_id=user_id, model_class=entity_models.ActivityLog),
+        _in_own_session(profile_crud.get_user_profile, user_id=user_id)
     ]
     
     foods, exercise_types, consumption_logs, activity_logs, profile = await asyncio.gather(*tasks)
 
-    return {
+    data = {
         "foods": foods,
         "exercise_types": exercise_types,
         "consumption_logs": consumption_logs,
         "activity_logs": activity_logs,
-        "user_profile": profile if profile else None
+        "user_profile": profile if profile else None,
+        "version": version
     }
+    return SchemaJSONResponse(data, entity_schemas.AllTrackingData, headers=_etag_headers(etag))
+
+@router.get("/tracking-data/changes", response_model=entity_schemas.TrackingDataChanges)
+async def get_tracking_data_changes(
+    since: int = Query(..., ge=0),
+    current_user: entity_schemas.CurrentUser = Depends(security.get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Liefert nur die Einträge, die nach der Version `since` erstellt, geändert oder gelöscht wurden.
+    Ist die zurückgegebene Version kleiner als `since`, muss der Client komplett neu laden.
+    """
+    changes = await sync_crud.get_changes(db, user_id=current_user.user_id, since=since)
+    return SchemaJSONResponse(changes, entity_schemas.TrackingDataChanges)
+
+# --- DASHBOARD ENDPOINT ---
+
+@router.get("/dashboard", response_model=entity_schemas.DashboardData)
+async def get_dashboard(
+    period: str = Query("week", enum=["day", "week", "month", "year"]),
+    current_user: entity_schemas.CurrentUser = Depends(security.get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Liefert die aggregierten Dashboard-Daten für den gewählten Zeitraum.
+    Die Gruppierung passiert in der Datenbank, übertragen werden nur die Bucket-Summen.
+    """
+    try:
+        return await dashboard_service.get_dashboard_data_for_period(db, user_id=current_user.user_id, period=period)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+# --- NÄHRSTOFF ENDPOINT ---
+
+@router.get("/nutrients", response_model=entity_schemas.NutrientTotals)
+async def get_nutrients(
+    from_date: Optional[date] = Query(None, alias="from"),
+    to_date: Optional[date] = Query(None, alias="to"),
+    current_user: entity_schemas.CurrentUser = Depends(security.get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Summiert Makros und alle Mikronährstoff-Schlüssel (vitamins, minerals, other_compounds)
+    der Konsum-Logs von `from` bis `to` (inklusive, ohne Angabe: heute) in einer Abfrage.
+    """
+    try:
+        return await nutrient_service.get_nutrient_totals(db, user_id=current_user.user_id, start_day=from_date, end_day=to_date)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+# --- FOOD-SUCHE ---
+# Muss vor den generischen /{entity_name}/{item_id}-Routen registriert werden
+
+@router.get("/foods/search", response_model=List[entity_schemas.Food])
+async def search_foods(
+    q: str = Query(..., min_length=1, max_length=100),
+    limit: int = Query(20, ge=1, le=100),
+    current_user: entity_schemas.CurrentUser = Depends(security.get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Sucht Foods des Benutzers nach Namen (PostgreSQL: unscharf per Trigrammen, SQLite: Präfix).
+    Häufig gegessene Foods werden bevorzugt.
+    """
+    q = q.strip()
+    if not q:
+        raise HTTPException(status_code=400, detail="Search query must not be empty")
+    items = await catalog_crud.search_foods(db, user_id=current_user.user_id, q=q, limit=limit)
+    return SchemaJSONResponse(items, List[entity_schemas.Food])
+
+# --- ZULETZT/HÄUFIG GENUTZT (Quick-Logging) ---
+# Ebenfalls vor den generischen Routen, sonst greift /{entity_name}/{item_id}
+
+@router.get("/{entity_name}/recent")
+async def get_recent_items(
+    entity_name: Literal["foods", "exercise_types"],
+    limit: int = Query(10, ge=1, le=50),
+    current_user: entity_schemas.CurrentUser = Depends(security.get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Die zuletzt und am häufigsten geloggten Foods bzw. Bewegungsformen, bestes Ergebnis zuerst.
+    Jeder Log zählt mit einer Halbwertszeit von 14 Tagen (siehe rollup_models.USAGE_HALF_LIFE_DAYS).
+    """
+    config = get_entity_config(entity_name)
+    items = await catalog_crud.get_recent_items(db, user_id=current_user.user_id, parent_model=config['model'], limit=limit)
+    return SchemaJSONResponse(items, List[config['schema']])
+
+# --- EXPORT ENDPOINT ---
+
+@router.get("/export")
+async def export_data(
+    format: Literal["ndjson", "csv"] = "ndjson",
+    current_user: entity_schemas.CurrentUser = Depends(security.get_current_user)
+):
+    """
+    Exportiert die komplette Historie (alle Entity-Typen und das Profil) als Stream.
+    Die Antwort wird chunked übertragen, der Download beginnt also sofort.
+    """
+    if format == "csv":
+        content, media_type = export_service.export_csv(current_user.user_id), "text/csv; charset=utf-8"
+    else:
+        content, media_type = export_service.export_ndjson(current_user.user_id), "application/x-ndjson"
+    return StreamingResponse(
+        content,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="fitness-export.{format}"'}
+    )
+
+# --- IMPORT ENDPOINT ---
+
+@router.post("/import/{entity_name}", response_model=entity_schemas.ImportResult)
+async def import_data(
+    entity_name: Literal["consumption_logs", "activity_logs"],
+    request: Request,
+    format: Literal["ndjson", "csv"] = "ndjson",
+    current_user: entity_schemas.CurrentUser = Depends(security.get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Importiert Logs aus einem NDJSON- oder CSV-Body (z.B. Migration aus anderen Trackern).
+    Foods/Bewegungsformen können über ID oder Namen (food_name/exercise_name) referenziert werden.
+    Der Body wird gestreamt und blockweise geladen. Die Antwort ist eine Zusammenfassung
+    (Summen, Anzahl Blöcke und die ersten Fehler mit Zeilennummer), kein Bericht pro Block.
+    """
+    lines = import_service.iter_lines(request.stream())
+    return await import_service.summarize_import(import_service.import_logs(
+        db, user_id=current_user.user_id, entity_name=entity_name, lines=lines, format=format
+    ))
 
 # --- GENERISCHE ENTITY ENDPOINTS (KORRIGIERT) ---
 
+# Die Bulk-Routen müssen vor den Routen mit {item_id} registriert werden,
+# sonst würde "bulk" als item_id interpretiert.
+
+@router.post("/{entity_name}/bulk", response_model=List[Any], status_code=status.HTTP_201_CREATED)
+async def create_entities_bulk(
+    entity_name: str,
+    items_data: List[Any] = Depends(get_bulk_create_data),
+    current_user: entity_schemas.CurrentUser = Depends(security.get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Erstellt mehrere Items eines Entity-Typs in einer Transaktion (z.B. eine Mahlzeit mit mehreren Foods).
+    Eine unbekannte oder fremde food_id/exercise_type_id lehnt die ganze Anfrage mit 422 ab, nichts wird gespeichert.
+    """
+    config = get_entity_config(entity_name)
+    try:
+        new_items = await entity_crud.create_items(db, user_id=current_user.user_id, items_data=items_data, model_class=config['model'])
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    except IntegrityError:
+        # Verweise und Pflichtfelder sind bereits geprüft; übrig bleibt z.B. ein Food, das
+        # zwischen Prüfung und INSERT von einer anderen Anfrage gelöscht wurde
+        raise HTTPException(status_code=409, detail="Items conflict with a concurrent change, nothing was saved. Please retry.")
+    return SchemaJSONResponse(new_items, List[config['schema']], status_code=status.HTTP_201_CREATED)
+
+def _bulk_ids(ids: List[int]) -> List[int]:
+    """Entfernt Duplikate (Reihenfolge bleibt) und prüft die maximale Anzahl."""
+    ids = list(dict.fromkeys(ids))
+    if not ids:
+        raise HTTPException(status_code=400, detail="No ids given")
+    if len(ids) > settings.BULK_MAX_ITEMS:
+        raise HTTPException(status_code=413, detail=f"At most {settings.BULK_MAX_ITEMS} items per request")
+    return ids
+
+@router.patch("/{entity_name}/bulk", response_model=entity_schemas.BulkResult)
+async def update_entities_bulk(
+    entity_name: str,
+    bulk_data: entity_schemas.BulkUpdate,
+    current_user: entity_schemas.CurrentUser = Depends(security.get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Übernimmt dieselben Änderungen für alle angegebenen IDs in einem UPDATE.
+    Liefert pro ID 'updated', 'not_found' oder 'conflict' (Constraint-Verletzung).
+    Eine unbekannte oder fremde food_id/exercise_type_id lehnt die ganze Anfrage mit 422 ab.
+    """
+    config = get_entity_config(entity_name)
+    ids = _bulk_ids(bulk_data.ids)
+    try:
+        item_data = config['update_schema'].model_validate(bulk_data.changes)
+    except ValidationError as e:
+        raise HTTPException(status_code=422, detail=e.errors())
+    if not item_data.model_fields_set:
+        raise HTTPException(status_code=400, detail="No changes given")
+
+    try:
+        results = await entity_crud.update_items(db, user_id=current_user.user_id, model_class=config['model'], ids=ids, item_data=item_data)
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    return {"results": results}
+
+@router.delete("/{entity_name}/bulk", response_model=entity_schemas.BulkResult)
+async def delete_entities_bulk(
+    entity_name: str,
+    bulk_data: entity_schemas.BulkDelete,
+    current_user: entity_schemas.CurrentUser = Depends(security.get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Löscht alle angegebenen IDs in einem DELETE (abhängige Logs werden mitgelöscht).
+    Liefert pro ID 'deleted', 'not_found' oder 'conflict'.
+    """
+    config = get_entity_config(entity_name)
+    ids = _bulk_ids(bulk_data.ids)
+    results = await entity_crud.delete_items(db, user_id=current_user.user_id, model_class=config['model'], ids=ids)
+    return {"results": results}
+
+def _encode_cursor(key) -> str:
+    """Verpackt den (Sortierwert, id)-Schlüssel als undurchsichtigen URL-sicheren String."""
+    value, item_id = key
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    return base64.urlsafe_b64encode(json.dumps([value, item_id]).encode()).decode()
+
+def _decode_cursor(cursor: str, model_class):
+    """Gegenstück zu _encode_cursor, wirft 400 bei manipulierten oder kaputten Cursors."""
+    try:
+        value, item_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        sort_col, _, _ = entity_crud.get_sort_key(model_class)
+        if sort_col.key == 'log_date':
+            value = datetime.fromisoformat(value)
+        elif not isinstance(value, str):
+            raise ValueError("invalid sort value")
+        return value, int(item_id)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
 @router.get("/{entity_name}", response_model=List[Any])
 async def get_entities(
     entity_name: str,
-    current_user: user_models.User = Depends(security.get_current_user),
+    request: Request,
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = None,
+    current_user: entity_schemas.CurrentUser = Depends(security.get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
     """
-    Holt sich die config und sucht dann mit der get_items_by_user() crud funktion nach dem passenden entitys.
+    Holt eine Seite von Items des Entity-Typs (Keyset-Pagination).
+    Logs sind nach (log_date, id) absteigend, Kataloge nach (name, id) aufsteigend sortiert.
+    Der Body bleibt eine einfache Liste (wie vor der Pagination), der Cursor der nächsten
+    Seite steht im Header `X-Next-Cursor` bzw. als `Link: <...>; rel="next"`.
+    Fehlen beide, ist das die letzte Seite.
     """
     config = get_entity_config(entity_name)
+    model_class = config['model']
+    after = _decode_cursor(cursor, model_class) if cursor else None
+
+    # Der Seiteninhalt hängt auch von limit und cursor ab
+    version = await sync_crud.get_entity_version(db, user_id=current_user.user_id, entity_name=entity_name)
+    page_key = hashlib.sha1(f"{limit}:{cursor or ''}".encode()).hexdigest()[:12]
+    etag = _make_etag(current_user.user_id, entity_name, version, page_key)
+    if _etag_matches(request, etag):
+        return _not_modified(etag)
+
+    items, next_key = await entity_crud.get_items_page(
+        db, user_id=current_user.user_id, model_class=model_class, limit=limit, after=after
+    )
     
-    items = await entity_crud.get_items_by_user(db, user_id=current_user.user_id, model_class=config['model'])
-    
-    Schema = config['schema']
-    # 'model_validate' ist wie 'from_orm' für neue pydantic version UwU
-    return [Schema.model_validate(item, from_attributes=True) for item in items]
+    headers = _etag_headers(etag)
+    if next_key:
+        next_cursor = _encode_cursor(next_key)
+        next_url = request.url.include_query_params(cursor=next_cursor, limit=limit)
+        headers.update({"X-Next-Cursor": next_cursor, "Link": f'<{next_url}>; rel="next"'})
+    # Validierung + Serialisierung der ORM-Objekte in einem Schritt über pydantic-core
+    return SchemaJSONResponse(items, List[config['schema']], headers=headers)
 
 @router.post("/{entity_name}", response_model=Any, status_code=status.HTTP_201_CREATED)
 async def create_entity(
     entity_name: str,
     # KORREKTUR: Nutze die Dependency, um die geparste item_data Instanz zu erhalten
     item_data: Any = Depends(get_create_data), 
-    current_user: user_models.User = Depends(security.get_current_user),
+    current_user: entity_schemas.CurrentUser = Depends(security.get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
     """Endpoint zum Erstellen eines Items für einen Entitätstyp."""
@@ -127,15 +446,10 @@ async def create_entity(
     # BUG ENTFERNT: item_data = config['create_schema']   
         
     # 'item_data' ist jetzt eine validierte Pydantic-Instanz aus der Dependency
-    new_item = await entity_crud.create_item(db, user_id=current_user.user_id, item_data=item_data, model_class=config['model'])
-    
-    # Laden der für Serialisierung benötigten Beziehungen vor schließen der Session
-    if entity_name == 'consumption_logs':
-        # Für Konsum-Log, lade das zugehörige 'food'-Objekt
-        await db.refresh(new_item, attribute_names=['food'])
-    elif entity_name == 'activity_logs':
-        # Für Aktivitäts-Log, lade das zugehörige 'exercise_type'-Objekt
-        await db.refresh(new_item, attribute_names=['exercise_type'])
+    try:
+        new_item = await entity_crud.create_item(db, user_id=current_user.user_id, item_data=item_data, model_class=config['model'])
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
     
     Schema = config['schema']
     return Schema.model_validate(new_item, from_attributes=True)
@@ -147,7 +461,7 @@ async def update_entity(
     item_id: int,
     # KORREKTUR: Nutze die Dependency, um die geparste item_data Instanz zu erhalten
     item_data: Any = Depends(get_update_data), 
-    current_user: user_models.User = Depends(security.get_current_user),
+    current_user: entity_schemas.CurrentUser = Depends(security.get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
     """Endpoint zum Aktualisieren eines Items."""
@@ -155,18 +469,15 @@ async def update_entity(
     
     # BUG ENTFERNT: item_data = config['update_schema']
     
-    db_item = await entity_crud.get_item_by_id(db, user_id=current_user.user_id, item_id=item_id, model_class=config['model'], pk_attr=config['pk'])
-    if not db_item:
-        raise HTTPException(status_code=404, detail="Item not found")
-    
     # 'item_data' ist jetzt eine validierte Pydantic-Instanz
-    updated_item = await entity_crud.update_item(db, db_item=db_item, item_data=item_data)
-    
-    # wie beim Erstellen
-    if entity_name == 'consumption_logs':
-        await db.refresh(updated_item, attribute_names=['food'])
-    elif entity_name == 'activity_logs':
-        await db.refresh(updated_item, attribute_names=['exercise_type'])
+    try:
+        updated_item = await entity_crud.update_item(
+            db, user_id=current_user.user_id, item_id=item_id, item_data=item_data, model_class=config['model']
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    if not updated_item:
+        raise HTTPException(status_code=404, detail="Item not found")
     
     Schema = config['schema']
     return Schema.model_validate(updated_item, from_attributes=True)
@@ -176,7 +487,7 @@ async def update_entity(
 async def delete_entity(
     entity_name: str,
     item_id: int,
-    current_user: user_models.User = Depends(security.get_current_user),
+    current_user: entity_schemas.CurrentUser = Depends(security.get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
     """Endpoint zum Löschen eines Items."""
@@ -0,0 +1,26 @@
+from functools import lru_cache
+from typing import Any
+from fastapi.responses import JSONResponse
+from pydantic import TypeAdapter
+
+
+@lru_cache(maxsize=None)
+def get_type_adapter(schema_type) -> TypeAdapter:
+    """TypeAdapter sind teuer im Aufbau, daher einmal pro Typ erzeugen und wiederverwenden."""
+    return TypeAdapter(schema_type)
+
+
+class SchemaJSONResponse(JSONResponse):
+    """
+    JSON-Antwort, die direkt über pydantic-core (TypeAdapter.dump_json) serialisiert wird.
+    ORM-Objekte werden per from_attributes in einem Durchgang validiert und zu Bytes
+    geschrieben, ohne FastAPIs erneute Validierung gegen das response_model und
+    ohne jsonable_encoder. Für große Listen ist das der entscheidende CPU-Anteil.
+    """
+
+    def __init__(self, content: Any, schema_type, **kwargs):
+        self.adapter = get_type_adapter(schema_type)
+        super().__init__(content, **kwargs)
+
+    def render(self, content: Any) -> bytes:
+        return self.adapter.dump_json(self.adapter.validate_python(content, from_attributes=True))
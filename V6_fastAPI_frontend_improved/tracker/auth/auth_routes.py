@@ -1,11 +1,10 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, status, BackgroundTasks
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.ext.asyncio import AsyncSession
 from tracker import security
 from tracker.schemas import entity_schemas
 from tracker.crud import user_crud, profile_crud
 from tracker.database import get_db
-from tracker.models import user_models
 
 # --- ASYNC DB CHANGES ---
 
@@ -29,7 +28,7 @@ async def register_user(user: entity_schemas.UserCreate, db: AsyncSession = Depe
 @router.post("/login", response_model=entity_schemas.Token)
 # Wir erwarten jetzt ein UserLogin-Schema (JSON) anstelle von Formulardaten
 # macht diesen Endpunkt konsistent mit dem Rest der API
-async def login(user_data: entity_schemas.UserLogin, db: AsyncSession = Depends(get_db)):
+async def login(user_data: entity_schemas.UserLogin, background_tasks: BackgroundTasks, db: AsyncSession = Depends(get_db)):
     # zugriff auf user_data.email statt auf form_data.username
     user = await user_crud.authenticate_user(
         db, email=user_data.email, password=user_data.password
@@ -41,6 +40,11 @@ async def login(user_data: entity_schemas.UserLogin, db: AsyncSession = Depends(
             headers={"WWW-Authenticate": "Bearer"},
         )
     
+    # Veralteter Hash (z.B. geänderte BCRYPT_ROUNDS): nach der Antwort neu hashen,
+    # damit der Login selbst nicht doppelt bcrypt bezahlt
+    if security.password_needs_rehash(user.password_hash):
+        background_tasks.add_task(user_crud.upgrade_password_hash, user.user_id, user_data.password)
+
     access_token = security.create_access_token(
         data={"sub": str(user.user_id)}
     )
@@ -49,7 +53,7 @@ async def login(user_data: entity_schemas.UserLogin, db: AsyncSession = Depends(
 
 @router.get("/profile", response_model=entity_schemas.UserProfile)
 async def read_user_profile(
-    current_user: user_models.User = Depends(security.get_current_user), 
+    current_user: entity_schemas.CurrentUser = Depends(security.get_current_user), 
     db: AsyncSession = Depends(get_db)
 ):
     """
@@ -64,7 +68,7 @@ async def read_user_profile(
 @router.put("/profile", response_model=entity_schemas.UserProfile)
 async def update_user_profile(
     profile_data: entity_schemas.UserProfileUpdate,
-    current_user: user_models.User = Depends(security.get_current_user),
+    current_user: entity_schemas.CurrentUser = Depends(security.get_current_user),
     db: AsyncSession = Depends(get_db)
 ):
     """
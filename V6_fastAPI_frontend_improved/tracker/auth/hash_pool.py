@@ -0,0 +1,84 @@
+import asyncio
+import time
+from concurrent.futures import Executor, ThreadPoolExecutor, ProcessPoolExecutor
+from typing import Callable, Optional
+from fastapi import HTTPException, status
+
+from tracker.config import settings
+
+
+class PasswordHashPool:
+    """
+    Eigener, begrenzter Executor für bcrypt-Aufgaben (Hashen und Verifizieren).
+    Ist der Pool samt Warteschlange voll, wird sofort mit 503 + Retry-After
+    abgelehnt, anstatt weitere Arbeit anzunehmen (Backpressure).
+    """
+
+    def __init__(self, kind: str, workers: int, max_queue: int, retry_after: int):
+        self.kind = kind
+        self.workers = max(1, workers)
+        self.max_queue = max(0, max_queue)
+        self.retry_after = retry_after
+        self._executor: Optional[Executor] = None
+        # Aufträge, die angenommen, aber noch nicht fertig sind (laufend + wartend)
+        self.in_flight = 0
+        self.completed = 0
+        self.rejected = 0
+        self.total_latency_s = 0.0
+        self.max_latency_s = 0.0
+
+    def _get_executor(self) -> Executor:
+        # Lazy, damit beim Import (und in Prozess-Workern) kein Pool entsteht
+        if self._executor is None:
+            if self.kind == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            else:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="pwd-hash")
+        return self._executor
+
+    async def run(self, func: Callable, *args):
+        """Führt `func(*args)` im Hash-Pool aus oder lehnt mit 503 ab, wenn er ausgelastet ist."""
+        if self.in_flight >= self.workers + self.max_queue:
+            self.rejected += 1
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Too many login requests, please retry shortly.",
+                headers={"Retry-After": str(self.retry_after)},
+            )
+
+        self.in_flight += 1
+        started = time.perf_counter()
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_executor(), func, *args)
+        finally:
+            latency = time.perf_counter() - started
+            self.in_flight -= 1
+            self.completed += 1
+            self.total_latency_s += latency
+            self.max_latency_s = max(self.max_latency_s, latency)
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def stats(self) -> dict:
+        return {
+            "executor": self.kind,
+            "workers": self.workers,
+            "in_flight": self.in_flight,
+            "queue_depth": max(0, self.in_flight - self.workers),
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "avg_latency_ms": round(self.total_latency_s / self.completed * 1000, 2) if self.completed else 0.0,
+            "max_latency_ms": round(self.max_latency_s * 1000, 2),
+        }
+
+
+hash_pool = PasswordHashPool(
+    settings.PASSWORD_HASH_EXECUTOR,
+    settings.PASSWORD_HASH_WORKERS,
+    settings.PASSWORD_HASH_MAX_QUEUE,
+    settings.PASSWORD_HASH_RETRY_AFTER_SECONDS,
+)
@@ -0,0 +1,50 @@
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from tracker.config import settings
+
+
+class VerifiedTokenCache:
+    """
+    Begrenzter LRU-Cache für bereits verifizierte JWTs (Token -> Claims).
+    Ein Eintrag gilt nur bis zum `exp` des Tokens, danach muss das Token
+    wieder vollständig dekodiert werden (und schlägt dann als abgelaufen fehl).
+    """
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._entries: OrderedDict[str, dict] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, token: str) -> Optional[dict]:
+        claims = self._entries.get(token)
+        if claims is None:
+            self.misses += 1
+            return None
+        if claims.get("exp", 0) <= time.time():
+            del self._entries[token]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(token)
+        self.hits += 1
+        return claims
+
+    def set(self, token: str, claims: dict) -> None:
+        # Tokens ohne Ablaufdatum werden nicht gecacht
+        if self.max_size <= 0 or "exp" not in claims:
+            return
+        self._entries[token] = claims
+        self._entries.move_to_end(token)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        return {"size": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+token_cache = VerifiedTokenCache(settings.TOKEN_CACHE_MAX_SIZE)
@@ -0,0 +1,67 @@
+import time
+from collections import OrderedDict
+from typing import Optional
+from sqlalchemy import event
+
+from tracker.config import settings
+from tracker.models import user_models
+from tracker.schemas.entity_schemas import CurrentUser
+
+
+class UserCache:
+    """
+    Kleiner In-Process TTL/LRU-Cache für authentifizierte Benutzer.
+    Spart bei jedem geschützten Request die Abfrage `get_user_by_id`.
+    Gespeichert werden unveränderliche CurrentUser-Schnappschüsse, keine ORM-Objekte:
+    die Einträge werden von parallelen Requests geteilt und sind an keine Session gebunden.
+    """
+
+    def __init__(self, ttl_seconds: int, max_size: int):
+        self.ttl_seconds = ttl_seconds
+        self.max_size = max_size
+        self._entries: OrderedDict[int, tuple[float, CurrentUser]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, user_id: int) -> Optional[CurrentUser]:
+        entry = self._entries.get(user_id)
+        if entry is None:
+            self.misses += 1
+            return None
+        expires_at, user = entry
+        if expires_at < time.monotonic():
+            del self._entries[user_id]
+            self.misses += 1
+            return None
+        # LRU: zuletzt benutzter Eintrag wandert ans Ende
+        self._entries.move_to_end(user_id)
+        self.hits += 1
+        return user
+
+    def set(self, user: CurrentUser) -> None:
+        if self.max_size <= 0 or self.ttl_seconds <= 0:
+            return
+        self._entries[user.user_id] = (time.monotonic() + self.ttl_seconds, user)
+        self._entries.move_to_end(user.user_id)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, user_id: int) -> None:
+        self._entries.pop(user_id, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        return {"size": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+user_cache = UserCache(settings.USER_CACHE_TTL_SECONDS, settings.USER_CACHE_MAX_SIZE)
+
+
+# Invalidierungs-Hooks: jede Änderung oder Löschung eines Users über das ORM
+# entfernt den Eintrag, damit kein veralteter Benutzer weiter authentifiziert wird.
+@event.listens_for(user_models.User, "after_update")
+@event.listens_for(user_models.User, "after_delete")
+def _invalidate_user(mapper, connection, target: user_models.User):
+    user_cache.invalidate(target.user_id)
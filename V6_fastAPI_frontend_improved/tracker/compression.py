@@ -0,0 +1,33 @@
+from starlette.middleware.gzip import GZipMiddleware
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+# Brotli ist optional: ohne das Paket wird nur gzip verwendet
+try:
+    from brotli_asgi import BrotliMiddleware
+except ImportError:
+    BrotliMiddleware = None
+
+
+class ApiCompressionMiddleware:
+    """
+    Komprimiert dynamische Antworten (API/JSON) ab `minimum_size` Bytes mit Brotli
+    (falls installiert, sonst gzip). Pfade unter `excluded_prefixes` sowie `excluded_paths`
+    werden durchgereicht, dort liefert PrecompressedStaticFiles bereits vorkomprimierte Dateien aus.
+    """
+
+    def __init__(self, app: ASGIApp, minimum_size: int = 1024,
+                 excluded_prefixes: tuple[str, ...] = (), excluded_paths: tuple[str, ...] = ()):
+        self.app = app
+        self.excluded_prefixes = excluded_prefixes
+        self.excluded_paths = excluded_paths
+        if BrotliMiddleware is not None:
+            self.compressed_app = BrotliMiddleware(app, minimum_size=minimum_size, gzip_fallback=True)
+        else:
+            self.compressed_app = GZipMiddleware(app, minimum_size=minimum_size)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        path = scope.get("path", "")
+        if scope["type"] == "http" and path not in self.excluded_paths and not path.startswith(self.excluded_prefixes):
+            await self.compressed_app(scope, receive, send)
+        else:
+            await self.app(scope, receive, send)
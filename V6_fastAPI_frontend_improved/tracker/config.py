@@ -7,6 +7,12 @@ class Settings(BaseSettings):
     """
     SQLALCHEMY_DATABASE_URI: str = "das könnte eine sqlite:///./test.db oder eine PostgreSQL URI sein oder beides >:O"
 
+    # --- Verbindungs-Pool ---
+    # Feste Verbindungen im Pool und zusätzliche Verbindungen bei Lastspitzen (SQLAlchemy-Standard 5 + 10).
+    # Parallele Abfragen eines Requests (GET /api/tracking-data) belegen zusammen höchstens die Hälfte davon.
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+
     # --- JWT Authentifizierungs-Einstellungen ---
     # Der geheime Schlüssel zum Signieren von JWTs. Sollte lang und zufällig sein.
     JWT_SECRET_KEY: str = "please_change_me_in_production_PLEASE!!!!"
@@ -17,6 +23,35 @@ class Settings(BaseSettings):
     # Die Lebensdauer des Zugriffstokens in Minuten.
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
 
+    # --- Cache für authentifizierte Benutzer ---
+    # Wie lange ein validierter Benutzer ohne erneute DB-Abfrage wiederverwendet wird (Sekunden).
+    USER_CACHE_TTL_SECONDS: int = 60
+    # Maximale Anzahl gecachter Benutzer (älteste Einträge werden zuerst verdrängt).
+    USER_CACHE_MAX_SIZE: int = 1024
+    # Maximale Anzahl bereits verifizierter Tokens, deren Claims wiederverwendet werden.
+    TOKEN_CACHE_MAX_SIZE: int = 4096
+
+    # --- Passwort-Hashing (bcrypt) ---
+    # Kostenfaktor (log2 der Iterationen). Bestehende Hashes mit anderem Faktor
+    # werden beim nächsten erfolgreichen Login im Hintergrund neu gehasht.
+    BCRYPT_ROUNDS: int = 12
+    # Eigener Pool, damit Login-Spitzen nicht den Standard-Executor blockieren.
+    # "thread" oder "process" (Prozesse umgehen die GIL, kosten aber mehr Speicher).
+    PASSWORD_HASH_EXECUTOR: str = "thread"
+    PASSWORD_HASH_WORKERS: int = 2
+    # Maximale Anzahl wartender Hash-Aufträge, darüber wird mit 503 abgelehnt.
+    PASSWORD_HASH_MAX_QUEUE: int = 32
+    # Retry-After (Sekunden), der bei einem vollen Pool mitgeschickt wird.
+    PASSWORD_HASH_RETRY_AFTER_SECONDS: int = 1
+
+    # --- Kompression ---
+    # API-Antworten werden erst ab dieser Größe (Bytes) komprimiert, darunter lohnt es sich nicht.
+    COMPRESSION_MINIMUM_SIZE: int = 1024
+
+    # --- Bulk-Endpunkte ---
+    # Maximale Anzahl an Items pro Bulk-Anfrage.
+    BULK_MAX_ITEMS: int = 1000
+
     # Pydantic-Konfiguration, die angibt, nach einer .env-Datei zu suchen.
     model_config = SettingsConfigDict(
         env_file=".env",
@@ -0,0 +1,82 @@
+from datetime import datetime, timezone
+from sqlalchemy import select, func, literal, or_, and_
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from tracker.crud import rollup_crud
+from tracker.models.entity_models import Food
+from tracker.models.rollup_models import CatalogUsage
+
+
+# --- FOOD-SUCHE ---
+# Ersetzt das Laden und Filtern des kompletten Food-Katalogs im Client.
+# PostgreSQL: Trigramm-Ähnlichkeit (pg_trgm) oder Teilstring-Treffer, beides über den
+# GIN-Index ix_foods_user_id_name_trgm (user_id und Trigramme).
+# SQLite: nur Präfix-Treffer über ix_foods_user_id_casefold_name.
+# Häufig und kürzlich gegessene Foods (Nutzungs-Ranking, siehe CatalogUsage) ranken höher.
+
+# Gewicht der Nutzung gegenüber der Ähnlichkeit (0..1): 10 Logs von heute ergeben ca. +0.24
+SEARCH_RECENT_WEIGHT = 0.1
+# Größtes Zeichen (U+10FFFF), als obere Grenze des Präfix-Bereichs
+_MAX_CHAR = '\U0010ffff'
+
+
+def _escape_like(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+
+def _usage_join(user_id: int, parent_model):
+    entity = rollup_crud.USAGE_ENTITIES[parent_model]
+    # Einträge, deren Logs alle gelöscht wurden, bleiben mit use_count 0 stehen
+    return and_(
+        CatalogUsage.user_id == user_id, CatalogUsage.entity == entity, CatalogUsage.item_id == parent_model.id,
+        CatalogUsage.use_count > 0,
+    )
+
+
+async def search_foods(db: AsyncSession, user_id: int, q: str, limit: int) -> list[Food]:
+    """Foods des Benutzers, deren Name zu q passt, bestes Ergebnis zuerst."""
+    ranked = (
+        select(Food.id)
+        .outerjoin(CatalogUsage, _usage_join(user_id, Food))
+        .where(Food.user_id == user_id)
+        .limit(limit)
+    )
+
+    if db.bind.dialect.name == 'postgresql':
+        # q <% name: q ähnelt einem Wort bzw. Abschnitt des Namens ("apfel" -> "Bio Apfelsaft"),
+        # dazu alle Präfix-Treffer. Beides nutzt den Trigramm-Index.
+        # exp(score - λ·heute) ist die zeitgewichtete Anzahl der Logs (1 Log von heute = 1)
+        now_exponent = rollup_crud.usage_exponent(datetime.now(timezone.utc))
+        weighted_uses = func.coalesce(func.exp(CatalogUsage.score - now_exponent), 0)
+        score = func.word_similarity(q, Food.name) + SEARCH_RECENT_WEIGHT * func.ln(1 + weighted_uses)
+        ranked = ranked.where(
+            or_(literal(q).op('<%')(Food.name), Food.name.ilike(f"{_escape_like(q)}%", escape='\\'))
+        ).order_by(score.desc(), Food.name, Food.id)
+    else:
+        # casefold() in SQL ist str.casefold (siehe database.py), beide Seiten folgen also derselben Regel
+        prefix = q.casefold()
+        ranked = ranked.where(
+            func.casefold(Food.name) >= prefix, func.casefold(Food.name) < prefix + _MAX_CHAR
+        ).order_by(CatalogUsage.score.desc().nulls_last(), func.casefold(Food.name), Food.id)
+
+    # Erst nur die IDs ranken, dann die vollständigen Zeilen der besten `limit` Treffer laden
+    ids = (await db.scalars(ranked)).all()
+    foods = {food.id: food for food in (await db.scalars(select(Food).where(Food.id.in_(ids)))).all()}
+    return [foods[food_id] for food_id in ids]
+
+
+# --- ZULETZT/HÄUFIG GENUTZT ---
+
+async def get_recent_items(db: AsyncSession, user_id: int, parent_model, limit: int) -> list:
+    """
+    Die `limit` Foods bzw. Bewegungsformen mit der höchsten zeitgewichteten Nutzung.
+    Liest nur das Ranking (Index auf user_id, entity, score), nie die Logs.
+    """
+    query = (
+        select(parent_model)
+        .join(CatalogUsage, _usage_join(user_id, parent_model))
+        .where(parent_model.user_id == user_id)
+        .order_by(CatalogUsage.score.desc(), CatalogUsage.last_used.desc())
+        .limit(limit)
+    )
+    return (await db.scalars(query)).all()
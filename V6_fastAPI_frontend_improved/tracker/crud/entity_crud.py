@@ -1,21 +1,86 @@
-from sqlalchemy import select
+from typing import Optional, Tuple, Any
+from sqlalchemy import select, insert, update, delete, tuple_, inspect, union_all, Column
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import aliased
 from sqlalchemy.ext.asyncio import AsyncSession
+from tracker.crud import sync_crud, rollup_crud
 
 
 # --- ASYNC DB CHANGES ---
 
 
+def get_sort_key(model_class):
+    """
+    Liefert (Sortierspalte, ID-Spalte, absteigend) für einen Entity-Typ.
+    Logs werden nach log_date absteigend, Kataloge nach name aufsteigend sortiert,
+    die ID dient jeweils als eindeutiger Tie-Breaker für die Keyset-Pagination.
+    """
+    if hasattr(model_class, 'log_date'):
+        return model_class.log_date, model_class.id, True
+    return model_class.name, model_class.id, False
+
+def _order_by(model_class):
+    sort_col, id_col, descending = get_sort_key(model_class)
+    if descending:
+        return sort_col.desc(), id_col.desc()
+    return sort_col.asc(), id_col.asc()
+
 async def get_items_by_user(db: AsyncSession, user_id: int, model_class):
-    """Holt alle Items eines bestimmten Typs für einen Benutzer """
-    # Sortierspalte dynamisch bestummen
-    order_by_col = model_class.log_date.desc() if hasattr(model_class, 'log_date') else model_class.name
-    
+    """
+    Holt alle Items eines bestimmten Typs für einen Benutzer.
+    Anzeige-Felder der Logs (food_name, calories) sind column_properties und kommen
+    mit derselben Abfrage, Beziehungen müssen dafür nicht geladen werden.
+    """
     # moderne, asynchrone `select`-Syntax
-    query = select(model_class).where(model_class.user_id == user_id).order_by(order_by_col)
+    query = (
+        select(model_class)
+        .where(model_class.user_id == user_id)
+        .order_by(*_order_by(model_class))
+    )
     result = await db.execute(query)
     
     return result.scalars().all()
 
+async def stream_items_by_user(db: AsyncSession, user_id: int, model_class, batch_size: int = 500):
+    """
+    Wie get_items_by_user, aber über einen serverseitigen Cursor: die Zeilen werden
+    in Blöcken von `batch_size` nachgeladen, statt alle auf einmal im Speicher zu halten.
+    """
+    query = (
+        select(model_class)
+        .where(model_class.user_id == user_id)
+        .order_by(*_order_by(model_class))
+        .execution_options(yield_per=batch_size)
+    )
+    return await db.stream_scalars(query)
+
+async def get_items_page(db: AsyncSession, user_id: int, model_class, limit: int,
+                         after: Optional[Tuple[Any, int]] = None):
+    """
+    Holt eine Seite von Items per Keyset-Pagination.
+    `after` ist der (Sortierwert, id)-Schlüssel des letzten Items der vorherigen Seite.
+    Gibt die Items und den Schlüssel für die nächste Seite (oder None) zurück.
+    """
+    sort_col, id_col, descending = get_sort_key(model_class)
+    query = select(model_class).where(model_class.user_id == user_id)
+
+    if after is not None:
+        # Zeilenvergleich (sort_col, id) < / > (wert, id) kann direkt über den Index laufen
+        key = tuple_(sort_col, id_col)
+        query = query.where(key < tuple_(*after) if descending else key > tuple_(*after))
+
+    # Ein Item mehr laden, um zu wissen, ob es eine weitere Seite gibt
+    query = query.order_by(*_order_by(model_class)).limit(limit + 1)
+    result = await db.execute(query)
+    items = list(result.scalars().all())
+
+    next_key = None
+    if len(items) > limit:
+        items = items[:limit]
+        last = items[-1]
+        next_key = (getattr(last, sort_col.key), last.id)
+    return items, next_key
+
 async def get_item_by_id(db: AsyncSession, user_id: int, item_id: int, model_class, pk_attr: str):
     """Holt ein spezifisches Item anhand seiner ID für einen Benutzer """
     query = select(model_class).where(
@@ -25,37 +90,259 @@ async def get_item_by_id(db: AsyncSession, user_id: int, item_id: int, model_cla
     result = await db.execute(query)
     return result.scalar_one_or_none()
 
+def _computed_attributes(model_class) -> list[str]:
+    """Namen der column_properties, die keine eigene Tabellenspalte sind (z.B. calories, food_name)."""
+    return [
+        attr.key for attr in inspect(model_class).column_attrs
+        if not all(isinstance(col, Column) and col.table is model_class.__table__ for col in attr.columns)
+    ]
+
+async def _execute_returning(db: AsyncSession, statement, model_class, user_id: int,
+                             track_logs: bool = False, replaced_id: Optional[int] = None):
+    """
+    Führt ein INSERT/UPDATE ... RETURNING aus und liefert das geschriebene Item inkl.
+    berechneter Felder in einem Round-Trip. Die Subqueries der column_properties lassen
+    sich nicht im RETURNING selbst auswerten, deshalb läuft das Statement auf PostgreSQL
+    als CTE, aus der die Zeile samt Anzeige-Feldern selektiert wird:
+    WITH written AS (INSERT ... RETURNING ...) SELECT ..., (SELECT name FROM foods ...) FROM written
+    Mit track_logs werden Tages-Rollup und Nutzungs-Ranking mitgeführt, bei einem UPDATE
+    (replaced_id) abzüglich der alten Werte. Auf PostgreSQL als weitere CTEs im selben
+    Statement (old sieht die Zeile noch vor dem UPDATE), sonst mit Statements davor und danach.
+    """
+    computed = _computed_attributes(model_class)
+    dialect_name = db.bind.dialect.name
+    if dialect_name == 'postgresql' and (computed or track_logs):
+        written = statement.returning(*model_class.__table__.c).cte('written')
+        query = select(aliased(model_class, written)).execution_options(populate_existing=True)
+        if track_logs:
+            changes = rollup_crud.changed_logs(model_class, written, 1)
+            if replaced_id is not None:
+                table = model_class.__table__
+                old = select(table).where(table.c.user_id == user_id, model_class.id == replaced_id).cte('old')
+                changes = union_all(rollup_crud.changed_logs(model_class, old, -1), changes)
+            statements = rollup_crud.log_change_statements(dialect_name, user_id, model_class, changes.cte('changes'))
+            query = query.add_cte(*(stmt.cte(f"log_changes_{i}") for i, stmt in enumerate(statements)))
+        return (await db.scalars(query)).one_or_none()
+
+    # Andere Datenbanken (z.B. SQLite) kennen kein INSERT/UPDATE in CTEs
+    if track_logs and replaced_id is not None:
+        await rollup_crud.remove_logs(db, user_id, model_class, model_class.id == replaced_id)
+    result = await db.scalars(statement.returning(model_class).execution_options(populate_existing=True))
+    db_item = result.one_or_none()
+    if db_item is not None and computed:
+        await db.refresh(db_item, attribute_names=computed)
+    if db_item is not None and track_logs:
+        await rollup_crud.add_logs(db, user_id, model_class, model_class.id == db_item.id)
+    return db_item
+
+async def check_references(db: AsyncSession, user_id: int, model_class, rows) -> None:
+    """
+    Prüft, dass alle Logs auf ein Food bzw. eine Bewegungsform des Benutzers verweisen
+    (eine Abfrage für alle Zeilen). Wirft ValueError mit den unbekannten IDs.
+    Ohne die Prüfung würden Verweise auf fremde oder nicht existierende Einträge
+    gespeichert (SQLite prüft Foreign Keys standardmäßig nicht).
+    """
+    if model_class not in rollup_crud.ROLLUP_LOGS:
+        return
+    parent_model, fk_col = rollup_crud.ROLLUP_LOGS[model_class]
+    wanted = {row[fk_col.key] for row in rows if row.get(fk_col.key) is not None}
+    if not wanted:
+        return
+    found = set(await db.scalars(
+        select(parent_model.id).where(parent_model.user_id == user_id, parent_model.id.in_(wanted))
+    ))
+    missing = sorted(wanted - found)
+    if missing:
+        raise ValueError(f"Unknown {fk_col.key}: {', '.join(map(str, missing))}")
+
 async def create_item(db: AsyncSession, user_id: int, item_data, model_class):
-    """Erstellt ein neues Item in der Datenbank """
-    
-    # Anstatt model_dump() zu verwenden, das Datentypen in Strings umwandelt,
-    # erstellen wir ein Dictionary, indem wir direkt auf die Attribute des Pydantic-Objekts zugreifen.
-    # Dies bewahrt die korrekten Python-Typen (wie 'datetime').
-    create_data = {}
-    for field in item_data.model_fields:
-        # Wir stellen sicher, dass wir keine 'None'-Werte für Felder übergeben,
-        # die nicht explizit gesetzt wurden (wie das optionale log_date).
-        value = getattr(item_data, field)
-        if value is not None:
-            create_data[field] = value
-            
-    db_item = model_class(**create_data, user_id=user_id)
-    
-    db.add(db_item)
+    """Erstellt ein neues Item in der Datenbank (ein INSERT ... RETURNING)"""
+    # model_dump() im Python-Modus bewahrt die Datentypen (wie 'datetime').
+    # Keine 'None'-Werte übergeben, damit Datenbank-Defaults greifen.
+    create_data = item_data.model_dump(exclude_none=True)
+    await check_references(db, user_id, model_class, [create_data])
+    version = await sync_crud.bump_version(db, user_id, [sync_crud.SYNC_ENTITIES[model_class]])
+
+    db_item = await _execute_returning(
+        db, insert(model_class).values(**create_data, user_id=user_id, row_version=version), model_class,
+        user_id, track_logs=model_class in rollup_crud.ROLLUP_LOGS,
+    )
     await db.commit()
-    await db.refresh(db_item)
     return db_item
 
-async def update_item(db: AsyncSession, db_item, item_data):
-    """Aktualisiert ein bestehendes Item """
+async def create_items(db: AsyncSession, user_id: int, items_data, model_class):
+    """
+    Erstellt mehrere Items in einer Transaktion.
+    Ein einziges INSERT ... RETURNING (bei vielen Zeilen in Batches von SQLAlchemy aufgeteilt),
+    danach eine Abfrage, die die Zeilen inkl. berechneter Felder (calories, food_name) lädt.
+    Verweise aller Zeilen werden vorher mit einer Abfrage geprüft: eine unbekannte
+    food_id/exercise_type_id wirft ValueError, ohne dass etwas geschrieben wurde.
+    """
+    # Wie in create_item: keine None-Werte übergeben, damit Datenbank-Defaults greifen
+    rows = [{**item_data.model_dump(exclude_none=True), 'user_id': user_id} for item_data in items_data]
+    await check_references(db, user_id, model_class, rows)
+    version = await sync_crud.bump_version(db, user_id, [sync_crud.SYNC_ENTITIES[model_class]])
+    for row in rows:
+        row['row_version'] = version
+    result = await db.execute(
+        insert(model_class).returning(model_class.id, sort_by_parameter_order=True),
+        rows
+    )
+    ids = result.scalars().all()
+    if model_class in rollup_crud.ROLLUP_LOGS:
+        # Die neuen Zeilen tragen als einzige die neue row_version
+        await rollup_crud.add_logs(db, user_id, model_class, model_class.row_version == version)
+    await db.commit()
+
+    result = await db.execute(select(model_class).where(model_class.id.in_(ids)))
+    items_by_id = {item.id: item for item in result.scalars().all()}
+    # Reihenfolge der Anfrage beibehalten
+    return [items_by_id[item_id] for item_id in ids]
+
+async def update_item(db: AsyncSession, user_id: int, item_id: int, item_data, model_class):
+    """
+    Aktualisiert ein bestehendes Item mit einem UPDATE ... RETURNING, ohne es vorher zu laden.
+    Gibt None zurück, wenn das Item nicht existiert oder einem anderen Benutzer gehört.
+    """
     update_data = item_data.model_dump(exclude_unset=True)
-    for key, value in update_data.items():
-        setattr(db_item, key, value)
+    await check_references(db, user_id, model_class, [update_data])
+    version = await sync_crud.bump_version(db, user_id, sync_crud.affected_entities(model_class))
+    track_logs = model_class in rollup_crud.ROLLUP_LOGS and bool(rollup_crud.TRACKED_LOG_FIELDS & update_data.keys())
+
+    db_item = await _execute_returning(
+        db,
+        update(model_class)
+        .where(model_class.user_id == user_id, model_class.id == item_id)
+        .values(**update_data, row_version=version),
+        model_class, user_id, track_logs=track_logs, replaced_id=item_id,
+    )
+    if db_item is None:
+        await db.rollback()
+        return None
+
+    # Logs eines geänderten Foods/ExerciseTypes zeigen neue Werte -> ebenfalls neu synchronisieren
+    await sync_crud.touch_dependents(db, db_item, version)
+    # Geänderte Kalorien eines Foods/ExerciseTypes betreffen alle Tage seiner Logs
+    rollup_days = await rollup_crud.affected_days(db, user_id, model_class, [item_id], update_data)
+    await rollup_crud.refresh_days(db, user_id, rollup_days)
     await db.commit()
-    await db.refresh(db_item)
     return db_item
 
 async def delete_item(db: AsyncSession, db_item):
     """Löscht ein Item aus der Datenbank """
+    user_id = db_item.user_id
+    await rollup_crud.remove_deleted(db, user_id, type(db_item), [db_item.id])
     await db.delete(db_item)
-    await db.commit()
\ No newline at end of file
+    # db.deleted enthält nach delete() auch die per Cascade gelöschten Kind-Einträge
+    deleted_items = list(db.deleted)
+    version = await sync_crud.bump_version(
+        db, user_id, [sync_crud.SYNC_ENTITIES[type(item)] for item in deleted_items if type(item) in sync_crud.SYNC_ENTITIES]
+    )
+    sync_crud.record_tombstones(db, user_id, deleted_items, version)
+    if type(db_item) in rollup_crud.USAGE_ENTITIES:
+        await rollup_crud.forget_usage(db, user_id, type(db_item), [db_item.id])
+    await db.commit()
+
+
+# --- BULK UPDATE / DELETE ---
+# Set-basierte Statements über eine Liste von IDs, immer auf user_id eingeschränkt.
+# Schlägt das Statement an einer Constraint fehl, wird es pro ID in einem eigenen
+# Savepoint wiederholt, damit die übrigen IDs trotzdem verarbeitet werden und
+# für jede ID ein Ergebnis gemeldet werden kann.
+
+async def _run_per_id(db: AsyncSession, ids: list[int], statement_for):
+    """
+    Führt statement_for(ids) einmal für alle IDs aus; bei IntegrityError einzeln.
+    Gibt die betroffenen IDs und die IDs mit Konflikt zurück.
+    """
+    try:
+        async with db.begin_nested():
+            return list(await statement_for(ids)), []
+    except IntegrityError:
+        pass
+
+    done, conflicts = [], []
+    for item_id in ids:
+        try:
+            async with db.begin_nested():
+                done.extend(await statement_for([item_id]))
+        except IntegrityError:
+            conflicts.append(item_id)
+    return done, conflicts
+
+def _outcomes(ids: list[int], done: list[int], done_status: str, conflicts: list[int]) -> list[dict]:
+    done, conflicts = set(done), set(conflicts)
+    return [
+        {'id': item_id, 'status': done_status if item_id in done else 'conflict' if item_id in conflicts else 'not_found'}
+        for item_id in ids
+    ]
+
+async def update_items(db: AsyncSession, user_id: int, model_class, ids: list[int], item_data) -> list[dict]:
+    """Setzt dieselben Änderungen für alle IDs mit einem UPDATE ... WHERE id IN (...)."""
+    update_data = item_data.model_dump(exclude_unset=True)
+    await check_references(db, user_id, model_class, [update_data])
+    version = await sync_crud.bump_version(db, user_id, sync_crud.affected_entities(model_class))
+    rollup_days = await rollup_crud.affected_days(db, user_id, model_class, ids, update_data)
+    track_logs = model_class in rollup_crud.ROLLUP_LOGS and bool(rollup_crud.TRACKED_LOG_FIELDS & update_data.keys())
+
+    async def statement_for(batch):
+        # Alte Werte abziehen, neue addieren, beides im Savepoint des Batches
+        if track_logs:
+            await rollup_crud.remove_logs(db, user_id, model_class, model_class.id.in_(batch))
+        result = await db.execute(
+            update(model_class)
+            .where(model_class.user_id == user_id, model_class.id.in_(batch))
+            .values(**update_data, row_version=version)
+            .returning(model_class.id)
+            .execution_options(synchronize_session=False)
+        )
+        updated = result.scalars().all()
+        if track_logs:
+            await rollup_crud.add_logs(db, user_id, model_class, model_class.id.in_(updated))
+        return updated
+
+    updated, conflicts = await _run_per_id(db, ids, statement_for)
+    await sync_crud.touch_dependents_of_ids(db, model_class, updated, version)
+    await rollup_crud.refresh_days(db, user_id, rollup_days)
+    await db.commit()
+    return _outcomes(ids, updated, 'updated', conflicts)
+
+async def delete_items(db: AsyncSession, user_id: int, model_class, ids: list[int]) -> list[dict]:
+    """
+    Löscht alle IDs mit einem DELETE ... WHERE id IN (...).
+    Abhängige Einträge werden wie beim ORM-Cascade des Einzel-Deletes mitgelöscht.
+    """
+    version = await sync_crud.bump_version(db, user_id, sync_crud.affected_entities(model_class))
+    deleted_children = []
+
+    async def statement_for(batch):
+        owned_ids = select(model_class.id).where(model_class.user_id == user_id, model_class.id.in_(batch))
+        await rollup_crud.remove_deleted(db, user_id, model_class, owned_ids)
+        children = []
+        for child_class, fk_col in sync_crud.get_dependents(model_class):
+            result = await db.execute(
+                delete(child_class)
+                .where(fk_col.in_(owned_ids))
+                .returning(child_class.id)
+                .execution_options(synchronize_session=False)
+            )
+            children.append((child_class, result.scalars().all()))
+        result = await db.execute(
+            delete(model_class)
+            .where(model_class.user_id == user_id, model_class.id.in_(batch))
+            .returning(model_class.id)
+            .execution_options(synchronize_session=False)
+        )
+        deleted = result.scalars().all()
+        # Erst nach erfolgreichem Statement merken (ein zurückgerollter Savepoint zählt nicht)
+        deleted_children.extend(children)
+        return deleted
+
+    deleted, conflicts = await _run_per_id(db, ids, statement_for)
+    sync_crud.record_tombstone_ids(db, user_id, model_class, deleted, version)
+    for child_class, child_ids in deleted_children:
+        sync_crud.record_tombstone_ids(db, user_id, child_class, child_ids, version)
+    if model_class in rollup_crud.USAGE_ENTITIES:
+        await rollup_crud.forget_usage(db, user_id, model_class, deleted)
+    await db.commit()
+    return _outcomes(ids, deleted, 'deleted', conflicts)
@@ -3,6 +3,7 @@ from sqlalchemy import select
 from sqlalchemy.ext.asyncio import AsyncSession
 from tracker.schemas import entity_schemas
 from tracker.models import user_models
+from tracker.crud import sync_crud, rollup_crud
 
 
 # --- ASYNC DB CHANGES ---
@@ -28,10 +29,17 @@ async def update_user_profile(db: AsyncSession, user_id: int, profile_data: enti
     # Hole die Update-Daten als Dictionary. exclude_unset=True,
     # damit nur die Felder aktualisiert werden, die der Benutzer auch gesendet hat
     update_data = profile_data.model_dump(exclude_unset=True)
+    timezone_changed = 'timezone' in update_data and update_data['timezone'] != db_profile.timezone
     
     # Aktualisiert die Felder des Datenbank-Objekts dynamisch
     for key, value in update_data.items():
         setattr(db_profile, key, value)
+    db_profile.row_version = await sync_crud.bump_version(db, user_id)
+
+    if timezone_changed:
+        # Andere Tagesgrenzen: Rollup in derselben Transaktion neu aufbauen
+        await db.flush()
+        await rollup_crud.rebuild(db, user_id)
         
     await db.commit()
     await db.refresh(db_profile)
@@ -0,0 +1,272 @@
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Iterable, Optional
+from sqlalchemy import select, delete, insert, update, func, literal, case, null, Float
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from tracker.models.entity_models import ConsumptionLog, ActivityLog, Food, ExerciseType, consumption_kcal, activity_kcal
+from tracker.models.rollup_models import (
+    DailyEnergyRollup, CatalogUsage, log_day, usage_score, usage_weight, usage_exponent,
+    DEFAULT_TIMEZONE,
+)
+from tracker.models.user_models import User, UserProfile
+
+
+# --- TAGES-ROLLUP UND NUTZUNGS-RANKING ---
+# Beide werden in derselben Transaktion wie die Logs gepflegt. Neue, geänderte und gelöschte
+# Logs werden als Deltas eingerechnet: die alten Werte (vor dem Schreiben) mit Vorzeichen -1,
+# die neuen mit +1, jeweils per INSERT ... SELECT bzw. UPDATE ... FROM direkt in SQL, ohne die
+# Logs eines Tages oder Foods erneut zu lesen. Ändern sich die Kalorien eines Foods bzw. einer
+# Bewegungsform, werden die betroffenen Tage dagegen aus den Logs neu berechnet.
+# Die Tage werden in der Zeitzone des Benutzers gebildet, nach einer Änderung der
+# Zeitzone im Profil wird der Rollup des Benutzers neu aufgebaut.
+# Tage bzw. Ranking-Einträge, deren letzter Log wegfällt, bleiben mit Anzahl 0 stehen.
+
+# Log-Model -> (Parent-Model, FK-Spalte)
+ROLLUP_LOGS = {
+    ConsumptionLog: (Food, ConsumptionLog.food_id),
+    ActivityLog: (ExerciseType, ActivityLog.exercise_type_id),
+}
+# Log-Model -> (kcal-Ausdruck, Mengen-Spalte, Spalte im Rollup)
+ROLLUP_KCAL = {
+    ConsumptionLog: (consumption_kcal, ConsumptionLog.amount_g, 'kcal_in'),
+    ActivityLog: (activity_kcal, ActivityLog.duration_min, 'kcal_out_active'),
+}
+# Parent-Model -> (Log-Model, Kalorien-Feld, das den Rollup beeinflusst)
+ROLLUP_PARENTS = {
+    Food: (ConsumptionLog, 'calories_kcal'),
+    ExerciseType: (ActivityLog, 'calories_per_hour'),
+}
+# Parent-Model -> Wert von CatalogUsage.entity
+USAGE_ENTITIES = {
+    Food: 'foods',
+    ExerciseType: 'exercise_types',
+}
+# Felder eines Logs, deren Änderung Rollup bzw. Ranking betrifft
+TRACKED_LOG_FIELDS = {
+    'log_date',
+    *(fk_col.key for _, fk_col in ROLLUP_LOGS.values()),
+    *(amount_col.key for _, amount_col, _ in ROLLUP_KCAL.values()),
+}
+
+
+def timezone_of(user_id: int):
+    """SQL-Ausdruck für die Zeitzone des Benutzers (ohne Profil bzw. Angabe: UTC)."""
+    return func.coalesce(
+        select(UserProfile.timezone).where(UserProfile.user_id == user_id).scalar_subquery(),
+        literal(DEFAULT_TIMEZONE),
+    )
+
+async def user_timezone(db: AsyncSession, user_id: int) -> str:
+    """Zeitzone des Benutzers für Umrechnungen in Python."""
+    return await db.scalar(select(timezone_of(user_id)))
+
+
+def _insert(dialect_name: str):
+    # ON CONFLICT gibt es nur in den Dialekt-Varianten von insert()
+    return postgresql.insert if dialect_name == 'postgresql' else sqlite.insert
+
+def changed_logs(log_model, rows, sign: int):
+    """
+    (sign, item_id, amount, log_date) der Logs in `rows` (Log-Tabelle oder CTE mit ihren Spalten).
+    sign ist 1 für neue Werte und -1 für alte bzw. gelöschte.
+    """
+    _, fk_col = ROLLUP_LOGS[log_model]
+    _, amount_col, _ = ROLLUP_KCAL[log_model]
+    return select(
+        literal(sign).label('sign'), rows.c[fk_col.name].label('item_id'),
+        rows.c[amount_col.name].label('amount'), rows.c.log_date,
+    )
+
+def log_change_statements(dialect_name: str, user_id: int, log_model, changes) -> list:
+    """
+    Statements, die `changes` (changed_logs als Subquery/CTE, Vorzeichen auch gemischt) einrechnen:
+    Upsert der kcal und Anzahl pro Tag, UPDATE der vorhandenen Ranking-Einträge, INSERT der neuen.
+    In dieser Reihenfolge ausführen. Ohne ON CONFLICT beim Ranking: Schreibvorgänge eines
+    Benutzers sind über die SyncState-Zeile serialisiert (siehe sync_crud.bump_version).
+    """
+    parent_model, _ = ROLLUP_LOGS[log_model]
+    kcal_of, _, rollup_field = ROLLUP_KCAL[log_model]
+    _, calories_field = ROLLUP_PARENTS[parent_model]
+
+    kcal = {'kcal_in': literal(0.0), 'kcal_out_active': literal(0.0)}
+    kcal[rollup_field] = func.sum(changes.c.sign * kcal_of(changes.c.amount, getattr(parent_model, calories_field)))
+    per_day = (
+        select(
+            literal(user_id), log_day(changes.c.log_date, timezone_of(user_id)).label('day'),
+            kcal['kcal_in'], kcal['kcal_out_active'], func.sum(changes.c.sign),
+        )
+        .select_from(changes)
+        .join(parent_model, changes.c.item_id == parent_model.id)
+        .where(parent_model.user_id == user_id)
+        .group_by('day')
+    )
+    upsert = _insert(dialect_name)(DailyEnergyRollup).from_select(
+        ['user_id', 'day', 'kcal_in', 'kcal_out_active', 'n_entries'], per_day
+    )
+    rollup = upsert.on_conflict_do_update(
+        index_elements=[DailyEnergyRollup.user_id, DailyEnergyRollup.day],
+        set_={name: getattr(DailyEnergyRollup, name) + getattr(upsert.excluded, name)
+              for name in ('kcal_in', 'kcal_out_active', 'n_entries')},
+    )
+
+    # Gewichte relativ zu jetzt (siehe usage_weight), pro Food bzw. Bewegungsform summiert
+    entity = USAGE_ENTITIES[parent_model]
+    reference = literal(usage_exponent(datetime.now(timezone.utc)), Float)
+    delta = (
+        select(
+            changes.c.item_id,
+            func.sum(changes.c.sign * usage_weight(changes.c.log_date, reference)).label('weight'),
+            func.sum(changes.c.sign).label('uses'),
+            func.max(case((changes.c.sign > 0, changes.c.log_date))).label('last_used'),
+        )
+        .group_by(changes.c.item_id)
+        .subquery('usage_delta')
+    )
+    uses = CatalogUsage.use_count + delta.c.uses
+    # Ein Eintrag ohne Nutzungen behält seinen letzten Score, der zählt beim nächsten Log nicht mit
+    previous_score = case((CatalogUsage.use_count > 0, CatalogUsage.score))
+    # last_used wird beim Entfernen nicht zurückgesetzt; es entscheidet nur bei gleichem Score
+    update_usage = (
+        update(CatalogUsage)
+        .where(CatalogUsage.user_id == user_id, CatalogUsage.entity == entity, CatalogUsage.item_id == delta.c.item_id)
+        .values(
+            score=case((uses > 0, usage_score(previous_score, delta.c.weight, reference)), else_=CatalogUsage.score),
+            use_count=uses,
+            last_used=case((delta.c.last_used > CatalogUsage.last_used, delta.c.last_used), else_=CatalogUsage.last_used),
+        )
+    )
+    known = (
+        select(CatalogUsage.item_id)
+        .where(CatalogUsage.user_id == user_id, CatalogUsage.entity == entity, CatalogUsage.item_id == delta.c.item_id)
+    )
+    insert_usage = insert(CatalogUsage).from_select(
+        ['user_id', 'entity', 'item_id', 'score', 'use_count', 'last_used'],
+        select(
+            literal(user_id), literal(entity), delta.c.item_id,
+            usage_score(null(), delta.c.weight, reference), delta.c.uses, delta.c.last_used,
+        ).where(delta.c.uses > 0, ~known.exists())
+    )
+    return [rollup, update_usage, insert_usage]
+
+async def _apply(db: AsyncSession, user_id: int, log_model, sign: int, criteria) -> None:
+    table = log_model.__table__
+    changes = changed_logs(log_model, table, sign).where(table.c.user_id == user_id, *criteria).subquery('changes')
+    statements = log_change_statements(db.bind.dialect.name, user_id, log_model, changes)
+    if sign < 0:
+        # Neue Ranking-Einträge entstehen nur durch hinzukommende Logs
+        statements = statements[:2]
+    for statement in statements:
+        await db.execute(statement.execution_options(synchronize_session=False))
+
+async def add_logs(db: AsyncSession, user_id: int, log_model, *criteria) -> None:
+    """Rechnet die Logs, die `criteria` erfüllen, in Rollup und Ranking ein (nach dem Schreiben, ohne Commit)."""
+    await _apply(db, user_id, log_model, 1, criteria)
+
+async def remove_logs(db: AsyncSession, user_id: int, log_model, *criteria) -> None:
+    """Zieht die Logs, die `criteria` erfüllen, aus Rollup und Ranking ab (vor dem Ändern/Löschen, ohne Commit)."""
+    await _apply(db, user_id, log_model, -1, criteria)
+
+async def remove_deleted(db: AsyncSession, user_id: int, model_class, ids) -> None:
+    """
+    Zieht Logs bzw. die Logs von Foods/Bewegungsformen (werden mitgelöscht) mit den IDs `ids`
+    (Liste oder Subquery) aus Rollup und Ranking ab. Vor dem Löschen aufrufen (ohne Commit).
+    """
+    if model_class in ROLLUP_LOGS:
+        await remove_logs(db, user_id, model_class, model_class.id.in_(ids))
+    elif model_class in ROLLUP_PARENTS:
+        log_model, _ = ROLLUP_PARENTS[model_class]
+        _, fk_col = ROLLUP_LOGS[log_model]
+        await remove_logs(db, user_id, log_model, fk_col.in_(ids))
+
+async def forget_usage(db: AsyncSession, user_id: int, parent_model, item_ids: list[int]) -> None:
+    """Entfernt die Ranking-Einträge gelöschter Foods/Bewegungsformen (ohne Commit)."""
+    if item_ids:
+        await db.execute(
+            delete(CatalogUsage)
+            .where(CatalogUsage.user_id == user_id, CatalogUsage.entity == USAGE_ENTITIES[parent_model],
+                   CatalogUsage.item_id.in_(item_ids))
+            .execution_options(synchronize_session=False)
+        )
+
+
+# --- NEUBERECHNUNG ---
+
+def _aggregate_queries(user_id: int, days: list[date]):
+    """(Tag, kcal, Anzahl) pro Tag für Konsum- und Aktivitäts-Logs der Tage `days`."""
+    queries = []
+    for log_model, (kcal_of, amount_col, _) in ROLLUP_KCAL.items():
+        parent_model, fk_col = ROLLUP_LOGS[log_model]
+        _, calories_field = ROLLUP_PARENTS[parent_model]
+        kcal = kcal_of(amount_col, getattr(parent_model, calories_field))
+        day = log_day(log_model.log_date, timezone_of(user_id))
+        # Bereichsfilter für den (user_id, log_date)-Index, dann exakt auf die Tage.
+        # Einen Tag Puffer je Seite, damit jeder UTC-Versatz (max. ±14 h) abgedeckt ist.
+        start = datetime.combine(days[0] - timedelta(days=1), time.min, tzinfo=timezone.utc)
+        end = datetime.combine(days[-1] + timedelta(days=2), time.min, tzinfo=timezone.utc)
+        queries.append(
+            select(day.label('day'), func.sum(kcal), func.count())
+            .join(parent_model, fk_col == parent_model.id)
+            .where(log_model.user_id == user_id, log_model.log_date >= start, log_model.log_date < end, day.in_(days))
+            .group_by('day')
+        )
+    return queries
+
+async def refresh_days(db: AsyncSession, user_id: int, days: Iterable[Optional[date]]) -> None:
+    """Berechnet die Rollup-Zeilen der angegebenen Tage aus den Logs neu (ohne Commit)."""
+    days = sorted({day for day in days if day is not None})
+    if not days:
+        return
+    consumption_query, activity_query = _aggregate_queries(user_id, days)
+    totals = {}
+    for day, kcal, count in (await db.execute(consumption_query)).all():
+        totals[day] = {'kcal_in': float(kcal or 0), 'kcal_out_active': 0.0, 'n_entries': count}
+    for day, kcal, count in (await db.execute(activity_query)).all():
+        entry = totals.setdefault(day, {'kcal_in': 0.0, 'kcal_out_active': 0.0, 'n_entries': 0})
+        entry['kcal_out_active'] += float(kcal or 0)
+        entry['n_entries'] += count
+
+    await db.execute(
+        delete(DailyEnergyRollup)
+        .where(DailyEnergyRollup.user_id == user_id, DailyEnergyRollup.day.in_(days))
+        .execution_options(synchronize_session=False)
+    )
+    if totals:
+        await db.execute(
+            insert(DailyEnergyRollup),
+            [{'user_id': user_id, 'day': day, **values} for day, values in totals.items()]
+        )
+
+async def affected_days(db: AsyncSession, user_id: int, parent_model, ids: list[int],
+                        update_data: Optional[dict] = None) -> set[date]:
+    """
+    Tage mit Logs der Foods/Bewegungsformen `ids`, deren Rollup sich durch ein Update (update_data)
+    der Kalorien ändert. Muss vor dem Schreibvorgang aufgerufen werden.
+    """
+    if parent_model not in ROLLUP_PARENTS:
+        return set()
+    log_model, calories_field = ROLLUP_PARENTS[parent_model]
+    if update_data is not None and calories_field not in update_data:
+        return set()
+    _, fk_col = ROLLUP_LOGS[log_model]
+    query = select(log_day(log_model.log_date, timezone_of(user_id))).distinct().where(
+        log_model.user_id == user_id, fk_col.in_(ids)
+    )
+    return set((await db.scalars(query)).all())
+
+async def rebuild(db: AsyncSession, user_id: int) -> None:
+    """Baut Tages-Rollup und Nutzungs-Ranking eines Benutzers aus den Logs neu auf (ohne Commit)."""
+    for model_class in (DailyEnergyRollup, CatalogUsage):
+        await db.execute(
+            delete(model_class).where(model_class.user_id == user_id).execution_options(synchronize_session=False)
+        )
+    for log_model in ROLLUP_LOGS:
+        await add_logs(db, user_id, log_model)
+
+async def rebuild_all(db: AsyncSession) -> int:
+    """Baut die Rollups aller Benutzer neu auf, ein Commit pro Benutzer. Gibt die Anzahl zurück."""
+    user_ids = (await db.scalars(select(User.user_id).order_by(User.user_id))).all()
+    for user_id in user_ids:
+        await rebuild(db, user_id)
+        await db.commit()
+    return len(user_ids)
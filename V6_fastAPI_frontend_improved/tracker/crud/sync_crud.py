@@ -0,0 +1,143 @@
+from typing import Iterable
+from sqlalchemy import select, update, inspect
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import RelationshipDirection
+
+from tracker.models import entity_models, user_models
+from tracker.models.sync_models import SyncState, DeletedItem
+
+
+# --- DELTA-SYNC ---
+# Jeder Schreibvorgang zählt den Änderungszähler des Benutzers hoch und stempelt
+# die geänderten Zeilen mit dem neuen Stand (row_version). Das UPDATE auf die
+# SyncState-Zeile sperrt sie bis zum Commit, dadurch sind die Versionen pro
+# Benutzer streng monoton in Commit-Reihenfolge.
+
+# Model -> Schlüssel im Frontend-State (entspricht den Namen der ENTITY_MAP)
+SYNC_ENTITIES = {
+    entity_models.Food: 'foods',
+    entity_models.ExerciseType: 'exercise_types',
+    entity_models.ConsumptionLog: 'consumption_logs',
+    entity_models.ActivityLog: 'activity_logs',
+}
+
+
+def _entity_version_column(entity_name: str):
+    return getattr(SyncState, f"{entity_name}_version")
+
+async def get_version(db: AsyncSession, user_id: int) -> int:
+    """Liefert den aktuellen (committeten) Änderungszähler eines Benutzers."""
+    version = await db.scalar(select(SyncState.version).where(SyncState.user_id == user_id))
+    return version or 0
+
+async def get_entity_version(db: AsyncSession, user_id: int, entity_name: str) -> int:
+    """Liefert den Zählerstand der letzten Änderung eines Entity-Typs (eine PK-Abfrage)."""
+    version = await db.scalar(select(_entity_version_column(entity_name)).where(SyncState.user_id == user_id))
+    return version or 0
+
+async def bump_version(db: AsyncSession, user_id: int, entity_names: Iterable[str] = ()) -> int:
+    """
+    Zählt den Änderungszähler in der laufenden Transaktion hoch und gibt den neuen Stand zurück.
+    Die Versionen der betroffenen Entity-Typen werden im selben Statement auf den neuen Stand gesetzt.
+    """
+    entity_names = set(entity_names)
+    values = {'version': SyncState.version + 1}
+    for entity_name in entity_names:
+        values[f"{entity_name}_version"] = SyncState.version + 1
+
+    result = await db.execute(
+        update(SyncState)
+        .where(SyncState.user_id == user_id)
+        .values(**values)
+        .returning(SyncState.version)
+    )
+    version = result.scalar_one_or_none()
+    if version is not None:
+        return version
+
+    # Erster Schreibvorgang des Benutzers: Zeile anlegen. Legt eine parallele
+    # Transaktion sie zeitgleich an, greift beim zweiten Versuch das UPDATE.
+    try:
+        async with db.begin_nested():
+            db.add(SyncState(user_id=user_id, version=1, **{f"{name}_version": 1 for name in entity_names}))
+        return 1
+    except IntegrityError:
+        return await bump_version(db, user_id, entity_names)
+
+def get_dependents(model_class):
+    """(Kind-Model, FK-Spalte) aller one-to-many Beziehungen auf synchronisierte Entities."""
+    for rel in inspect(model_class).relationships:
+        if rel.direction is RelationshipDirection.ONETOMANY and rel.mapper.class_ in SYNC_ENTITIES:
+            (fk_col,) = rel.remote_side
+            yield rel.mapper.class_, fk_col
+
+def affected_entities(model_class) -> list[str]:
+    """Entity-Typen, deren Antworten sich ändern, wenn ein Item von `model_class` geändert wird."""
+    return [SYNC_ENTITIES[model_class]] + [SYNC_ENTITIES[child] for child, _ in get_dependents(model_class)]
+
+async def touch_dependents(db: AsyncSession, db_item, version: int) -> None:
+    """
+    Markiert abhängige Zeilen (one-to-many, z.B. Logs eines Foods) als geändert,
+    weil sich deren berechnete Felder (calories, food_name) mit dem Parent ändern.
+    """
+    await touch_dependents_of_ids(db, type(db_item), [db_item.id], version)
+
+async def touch_dependents_of_ids(db: AsyncSession, model_class, ids: list[int], version: int) -> None:
+    """Wie touch_dependents, aber für mehrere Parents in einem Statement pro Kind-Tabelle."""
+    if not ids:
+        return
+    for child_class, fk_col in get_dependents(model_class):
+        await db.execute(
+            update(child_class)
+            .where(fk_col.in_(ids))
+            .values(row_version=version)
+            .execution_options(synchronize_session=False)
+        )
+
+def record_tombstones(db: AsyncSession, user_id: int, deleted_items, version: int) -> None:
+    """Legt Tombstones für gelöschte (auch per Cascade gelöschte) Einträge an."""
+    for item in deleted_items:
+        entity_name = SYNC_ENTITIES.get(type(item))
+        if entity_name:
+            db.add(DeletedItem(user_id=user_id, entity_name=entity_name, item_id=item.id, row_version=version))
+
+def record_tombstone_ids(db: AsyncSession, user_id: int, model_class, ids: list[int], version: int) -> None:
+    """Legt Tombstones für per Set-Statement gelöschte Einträge an (ohne geladene Objekte)."""
+    entity_name = SYNC_ENTITIES[model_class]
+    db.add_all(
+        DeletedItem(user_id=user_id, entity_name=entity_name, item_id=item_id, row_version=version)
+        for item_id in ids
+    )
+
+async def get_changes(db: AsyncSession, user_id: int, since: int) -> dict:
+    """
+    Sammelt alle Einträge, die nach `since` erstellt, geändert oder gelöscht wurden.
+    Die Version wird zuerst gelesen: Änderungen, die währenddessen committet werden,
+    kommen im Zweifel beim nächsten Abgleich doppelt, gehen aber nie verloren.
+    """
+    version = await get_version(db, user_id)
+    changes = {'version': version}
+
+    for model_class, entity_name in SYNC_ENTITIES.items():
+        result = await db.execute(
+            select(model_class)
+            .where(model_class.user_id == user_id, model_class.row_version > since)
+            .order_by(model_class.row_version)
+        )
+        changes[entity_name] = result.scalars().all()
+
+    result = await db.execute(
+        select(DeletedItem.entity_name, DeletedItem.item_id)
+        .where(DeletedItem.user_id == user_id, DeletedItem.row_version > since)
+    )
+    deleted = {entity_name: [] for entity_name in SYNC_ENTITIES.values()}
+    for entity_name, item_id in result.all():
+        deleted[entity_name].append(item_id)
+    changes['deleted'] = deleted
+
+    changes['user_profile'] = await db.scalar(
+        select(user_models.UserProfile)
+        .where(user_models.UserProfile.user_id == user_id, user_models.UserProfile.row_version > since)
+    )
+    return changes
@@ -1,8 +1,11 @@
-import asyncio
-from sqlalchemy import select
+from fastapi import HTTPException
+from sqlalchemy import select, update
 from tracker.schemas import entity_schemas
 from tracker.models import user_models
 from tracker import security
+from tracker.auth.hash_pool import hash_pool
+from tracker.auth.user_cache import user_cache
+from tracker.database import AsyncSessionLocal
 from typing import Optional
 from sqlalchemy.ext.asyncio import AsyncSession
 
@@ -28,9 +31,9 @@ async def get_user_by_email(db: AsyncSession, email: str) -> Optional[user_model
 async def create_user(db: AsyncSession, user: entity_schemas.UserCreate) -> user_models.User:
     """Erstellt einen neuen Benutzer in der Datenbank """
     
-    # Führe die CPU-intensive Hashing-Operation in separaten Thread aus
-    # um den Server nicht zu blockieren
-    hashed_password = await asyncio.to_thread(security.get_password_hash, user.password)
+    # Führe die CPU-intensive Hashing-Operation im eigenen Hash-Pool aus
+    # um den Server nicht zu blockieren (bei Überlast: 503)
+    hashed_password = await hash_pool.run(security.get_password_hash, user.password)
     
     db_user = user_models.User(
         email=user.email, 
@@ -53,7 +56,7 @@ async def authenticate_user(db: AsyncSession, email: str, password: str) -> Opti
         return None
         
     # Die Passwort-Verifizierung ist ebenfalls CPU-intensiv und wird ausgelagert
-    is_password_correct = await asyncio.to_thread(
+    is_password_correct = await hash_pool.run(
         security.verify_password, password, user.password_hash
     )
     
@@ -62,5 +65,23 @@ async def authenticate_user(db: AsyncSession, email: str, password: str) -> Opti
         
     return user
 
+async def upgrade_password_hash(user_id: int, password: str) -> None:
+    """
+    Hasht das Passwort mit den aktuellen Parametern (BCRYPT_ROUNDS) neu und speichert es.
+    Läuft als Background-Task nach dem Login, daher mit eigener Session.
+    """
+    try:
+        new_hash = await hash_pool.run(security.get_password_hash, password)
+    except HTTPException:
+        # Hash-Pool ausgelastet: der nächste Login versucht es erneut
+        return
 
-
+    async with AsyncSessionLocal() as db:
+        await db.execute(
+            update(user_models.User)
+            .where(user_models.User.user_id == user_id)
+            .values(password_hash=new_hash)
+        )
+        await db.commit()
+    # Bulk-Update löst keine ORM-Events aus, daher explizit invalidieren
+    user_cache.invalidate(user_id)
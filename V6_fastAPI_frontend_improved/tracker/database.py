@@ -1,17 +1,49 @@
+import asyncio
+from sqlalchemy import inspect, event
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from sqlalchemy.schema import CreateColumn
 from sqlalchemy.ext.declarative import declarative_base
 from tracker.config import settings
+from tracker.models.base_model import Base as ModelBase
+from tracker.models.entity_models import casefold
+from tracker.models.rollup_models import local_day, sqlite_usage_score, sqlite_usage_weight
 
 if not settings.SQLALCHEMY_DATABASE_URI:
     raise ValueError("Die Datenbank-URL (SQLALCHEMY_DATABASE_URI) ist nicht konfiguriert. Bitte überprüfen Sie Ihre .env-Datei.")
 
+_url = make_url(str(settings.SQLALCHEMY_DATABASE_URI))
+# In-Memory-SQLite läuft über einen StaticPool mit genau einer Verbindung, ohne Poolgröße
+_is_memory_sqlite = _url.get_backend_name() == 'sqlite' and _url.database in (None, '', ':memory:')
+pool_options = {} if _is_memory_sqlite else {
+    'pool_size': settings.DB_POOL_SIZE,
+    'max_overflow': settings.DB_MAX_OVERFLOW,
+}
+
 # Create the SQLAlchemy engine using the database URI from settings
 # The pool_pre_ping is a good practice to check connections before handing them out
 engine = create_async_engine(
     str(settings.SQLALCHEMY_DATABASE_URI), 
-    pool_pre_ping=True
+    pool_pre_ping=True,
+    **pool_options
 )
 
+# Obergrenze für Verbindungen, die parallele Abfragen (asyncio.gather auf eigenen Sessions)
+# über alle Requests hinweg gleichzeitig belegen. Die andere Hälfte des Pools bleibt für die
+# normalen Request-Sessions, damit einige gleichzeitige Hydrierungen den Pool nicht leeren.
+parallel_query_slots = asyncio.Semaphore(max(1, (settings.DB_POOL_SIZE + settings.DB_MAX_OVERFLOW) // 2))
+
+if engine.dialect.name == 'sqlite':
+    @event.listens_for(engine.sync_engine, "connect")
+    def _register_sqlite_functions(dbapi_connection, connection_record):
+        # Für log_day(): Kalendertag in der Zeitzone des Benutzers (PostgreSQL nutzt AT TIME ZONE)
+        dbapi_connection.create_function("local_day", 2, local_day, deterministic=True)
+        # Für die Namenssuche und ihren Index ix_foods_user_id_casefold_name (Unicode statt nur ASCII)
+        dbapi_connection.create_function("casefold", 1, casefold, deterministic=True)
+        # Für usage_weight()/usage_score(): inkrementelles Nutzungs-Ranking (PostgreSQL rechnet mit exp/ln)
+        dbapi_connection.create_function("usage_weight", 2, sqlite_usage_weight, deterministic=True)
+        dbapi_connection.create_function("usage_score", 3, sqlite_usage_score, deterministic=True)
+
 # Create a session factory
 AsyncSessionLocal = async_sessionmaker(engine, expire_on_commit=False)
 
@@ -27,3 +59,85 @@ async def get_db():
     """
     async with AsyncSessionLocal() as session:
         yield session
+
+
+def has_table(sync_conn, table_name: str) -> bool:
+    """Prüft, ob eine Tabelle bereits existiert (für conn.run_sync())."""
+    return inspect(sync_conn).has_table(table_name)
+
+
+def create_extensions(sync_conn):
+    """
+    PostgreSQL-Erweiterungen, die Indizes der Models voraussetzen (pg_trgm und btree_gin für
+    die Food-Suche). Muss vor create_all() laufen. Beide sind ab PostgreSQL 13 "trusted", der
+    Besitzer der Datenbank darf sie also ohne Superuser-Rechte anlegen.
+    """
+    if sync_conn.dialect.name == 'postgresql':
+        sync_conn.exec_driver_sql("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        sync_conn.exec_driver_sql("CREATE EXTENSION IF NOT EXISTS btree_gin")
+
+
+def _existing_index_names(sync_conn) -> set[str]:
+    if sync_conn.dialect.name == 'sqlite':
+        # Der Inspector überspringt bei SQLite Ausdrucks-Indizes wie casefold(name)
+        return set(sync_conn.exec_driver_sql("SELECT name FROM sqlite_master WHERE type = 'index'").scalars())
+    inspector = inspect(sync_conn)
+    return {index['name'] for table_name in inspector.get_table_names() for index in inspector.get_indexes(table_name)}
+
+
+def create_missing_indexes(sync_conn):
+    """
+    create_all() legt Indizes nur für neue Tabellen an. Für bestehende Datenbanken
+    werden hier alle im Model deklarierten, aber noch fehlenden Indizes nachgezogen
+    (dialektspezifische Indizes per ddl_if nur auf ihrem Dialekt).
+    Wird im Lifespan über conn.run_sync() aufgerufen.
+    """
+    existing = _existing_index_names(sync_conn)
+    for table in ModelBase.metadata.sorted_tables:
+        for index in table.indexes:
+            if index.name not in existing:
+                index.create(sync_conn)
+
+
+def convert_json_columns(sync_conn):
+    """
+    Bestehende PostgreSQL-Datenbanken haben die Nährstoff-Spalten noch als JSON.
+    Spalten, die im Model JSONB sind, werden per ALTER COLUMN ... TYPE jsonb umgestellt,
+    damit die GIN-Indizes angelegt werden können. Wird im Lifespan über conn.run_sync() aufgerufen.
+    """
+    if sync_conn.dialect.name != 'postgresql':
+        return
+    inspector = inspect(sync_conn)
+    preparer = sync_conn.dialect.identifier_preparer
+    for table in ModelBase.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        existing = {column['name']: column['type'] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name not in existing or column.type.compile(dialect=sync_conn.dialect) != 'JSONB':
+                continue
+            if existing[column.name].compile(dialect=sync_conn.dialect) != 'JSON':
+                continue
+            name = preparer.quote(column.name)
+            sync_conn.exec_driver_sql(
+                f"ALTER TABLE {preparer.format_table(table)} ALTER COLUMN {name} TYPE jsonb USING {name}::jsonb"
+            )
+
+
+def add_missing_columns(sync_conn):
+    """
+    create_all() ändert bestehende Tabellen nicht. Neu im Model hinzugekommene Spalten
+    werden hier per ALTER TABLE ... ADD COLUMN ergänzt (nur nullable Spalten oder
+    solche mit konstantem server_default). Wird im Lifespan über conn.run_sync() aufgerufen.
+    """
+    inspector = inspect(sync_conn)
+    preparer = sync_conn.dialect.identifier_preparer
+    for table in ModelBase.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        existing = {column['name'] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name in existing:
+                continue
+            column_ddl = CreateColumn(column).compile(dialect=sync_conn.dialect)
+            sync_conn.exec_driver_sql(f"ALTER TABLE {preparer.format_table(table)} ADD COLUMN {column_ddl}")
@@ -1,5 +1,21 @@
+from datetime import datetime, timezone
+from typing import Optional
+from sqlalchemy import BigInteger, TIMESTAMP
 from sqlalchemy.ext.asyncio import AsyncAttrs
-from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
 
 class Base(AsyncAttrs, DeclarativeBase):
-    pass
\ No newline at end of file
+    pass
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc)
+
+class VersionedMixin:
+    """
+    Spalten für die Delta-Synchronisation mit dem Frontend.
+    `row_version` ist der Stand des Änderungszählers des Benutzers (SyncState)
+    bei der letzten Änderung der Zeile, `updated_at` nur zur Information.
+    """
+    row_version: Mapped[int] = mapped_column(BigInteger, default=0, server_default='0')
+    updated_at: Mapped[Optional[datetime]] = mapped_column(TIMESTAMP(timezone=True), default=_utcnow, onupdate=_utcnow)
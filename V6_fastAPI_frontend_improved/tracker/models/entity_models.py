@@ -1,13 +1,53 @@
 from __future__ import annotations
 from typing import List, Optional
 from datetime import datetime
-from sqlalchemy import JSON, ForeignKey, TIMESTAMP
-from sqlalchemy.orm import relationship, Mapped, mapped_column
-from tracker.models.base_model import Base
+from sqlalchemy import JSON, ForeignKey, TIMESTAMP, Index, Float, Numeric, select, func, cast, literal
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import relationship, Mapped, mapped_column, column_property
+from tracker.models.base_model import Base, VersionedMixin
 
 
-class Food(Base):
+# --- Kalorien als SQL-Ausdrücke ---
+# Diese Ausdrücke werden sowohl für die column_properties der Logs als auch für
+# Aggregationen (Dashboard) genutzt, damit die Berechnung nur an einer Stelle steht.
+# Gerechnet wird in NUMERIC: PostgreSQL rundet double precision mit round() auf die
+# gerade Zahl (4.5 -> 4), numeric dagegen wie SQLite kaufmännisch (4.5 -> 5).
+
+def _rounded_kcal(product, divisor: int):
+    return cast(func.round(cast(product, Numeric) / literal(divisor, Numeric)), Float)
+
+def consumption_kcal(amount_g, calories_kcal):
+    """kcal eines Konsum-Logs: amount_g / 100 * kcal pro 100g, kaufmännisch gerundet."""
+    return _rounded_kcal(amount_g * func.coalesce(calories_kcal, 0), 100)
+
+def activity_kcal(duration_min, calories_per_hour):
+    """kcal eines Aktivitäts-Logs: duration_min / 60 * kcal pro Stunde, kaufmännisch gerundet."""
+    return _rounded_kcal(duration_min * func.coalesce(calories_per_hour, 0), 60)
+
+
+# Nährstoff-Dokumente (vitamins, minerals, other_compounds): auf PostgreSQL als JSONB,
+# damit sie per GIN-Index durchsucht und in SQL mit jsonb_each aggregiert werden können.
+NutrientJSON = JSON().with_variant(JSONB(), 'postgresql')
+
+
+class Food(VersionedMixin, Base):
     __tablename__ = 'foods'
+    # Kataloge werden immer pro Benutzer nach Namen sortiert abgefragt (inkl. Keyset-Pagination)
+    __table_args__ = (
+        Index('ix_foods_user_id_name', 'user_id', 'name', 'food_id'),
+        # Delta-Sync: geänderte Zeilen eines Benutzers seit einer Version
+        Index('ix_foods_user_id_row_version', 'user_id', 'row_version'),
+        # Schlüsselsuche in den Nährstoff-Dokumenten (z.B. vitamins ? 'C', vitamins @> '{...}'), nur PostgreSQL
+        Index('ix_foods_vitamins', 'vitamins', postgresql_using='gin').ddl_if(dialect='postgresql'),
+        Index('ix_foods_minerals', 'minerals', postgresql_using='gin').ddl_if(dialect='postgresql'),
+        Index('ix_foods_other_compounds', 'other_compounds', postgresql_using='gin').ddl_if(dialect='postgresql'),
+        # Namenssuche (/api/foods/search): Trigramme für Ähnlichkeit und ILIKE, zusammen mit user_id
+        # in einem GIN-Index (btree_gin), damit nur die Foods des Benutzers durchsucht werden.
+        # Braucht pg_trgm und btree_gin (siehe database.create_extensions)
+        Index('ix_foods_user_id_name_trgm', 'user_id', 'name', postgresql_using='gin',
+              postgresql_ops={'name': 'gin_trgm_ops'})
+        .ddl_if(dialect='postgresql'),
+    )
     id: Mapped[int] = mapped_column('food_id', primary_key=True)
     user_id: Mapped[int] = mapped_column(ForeignKey('users.user_id'))
     name: Mapped[str] = mapped_column()
@@ -27,15 +67,32 @@ class Food(Base):
     cholesterol_mg: Mapped[Optional[float]] = mapped_column()
     sodium_mg: Mapped[Optional[float]] = mapped_column()
     #vitamine minerale und anderes zeug
-    vitamins: Mapped[Optional[dict]] = mapped_column(JSON)
-    minerals: Mapped[Optional[dict]] = mapped_column(JSON)
+    vitamins: Mapped[Optional[dict]] = mapped_column(NutrientJSON)
+    minerals: Mapped[Optional[dict]] = mapped_column(NutrientJSON)
     # koffein und der ganze bullshit
-    other_compounds: Mapped[Optional[dict]] = mapped_column(JSON)
+    other_compounds: Mapped[Optional[dict]] = mapped_column(NutrientJSON)
     
     consumptions: Mapped[List["ConsumptionLog"]] = relationship(back_populates='food', cascade="all, delete-orphan")
 
-class ExerciseType(Base):
+# SQLite-Fallback der Namenssuche: Präfix-Bereich auf casefold(name) pro Benutzer.
+# SQLites lower() faltet nur ASCII ("ÄPFEL" bliebe "Äpfel"), casefold() ist Pythons str.casefold
+# und wird in database.py pro Verbindung registriert. Achtung: Wer foods ohne diese Funktion
+# beschreibt (z.B. das sqlite3-CLI), bekommt "no such function: casefold", weil SQLite den
+# Index bei jedem INSERT/UPDATE des Namens mitrechnet.
+Index('ix_foods_user_id_casefold_name', Food.user_id, func.casefold(Food.name)).ddl_if(dialect='sqlite')
+
+
+def casefold(value: str | None) -> str | None:
+    """SQLite-Funktion hinter func.casefold(): Groß-/Kleinschreibung nach Unicode falten."""
+    return None if value is None else value.casefold()
+
+
+class ExerciseType(VersionedMixin, Base):
     __tablename__ = 'exercisetypes'
+    __table_args__ = (
+        Index('ix_exercisetypes_user_id_name', 'user_id', 'name', 'exercise_type_id'),
+        Index('ix_exercisetypes_user_id_row_version', 'user_id', 'row_version'),
+    )
     # MAP: Map the 'exercise_type_id' database column to the 'id' attribute.
     id: Mapped[int] = mapped_column('exercise_type_id', primary_key=True)
     user_id: Mapped[int] = mapped_column(ForeignKey('users.user_id'))
@@ -44,8 +101,13 @@ class ExerciseType(Base):
 
     activities: Mapped[List["ActivityLog"]] = relationship(back_populates='exercise_type', cascade="all, delete-orphan")
 
-class ConsumptionLog(Base):
+class ConsumptionLog(VersionedMixin, Base):
     __tablename__ = 'consumptionlogs'
+    # Logs werden pro Benutzer nach Datum sortiert bzw. nach Zeitraum gefiltert (Dashboard)
+    __table_args__ = (
+        Index('ix_consumptionlogs_user_id_log_date', 'user_id', 'log_date', 'consumption_log_id'),
+        Index('ix_consumptionlogs_user_id_row_version', 'user_id', 'row_version'),
+    )
     id: Mapped[int] = mapped_column('consumption_log_id', primary_key=True)
     user_id: Mapped[int] = mapped_column(ForeignKey('users.user_id'))
     food_id: Mapped[int] = mapped_column(ForeignKey('foods.food_id'))
@@ -54,19 +116,34 @@ class ConsumptionLog(Base):
     
     food: Mapped["Food"] = relationship(back_populates='consumptions')
 
-    @property
-    def calories(self) -> float:
-        # zugriff auf food_stats Objekt
-        if self.food and self.amount_g and self.food.calories_kcal:
-            return round((self.amount_g / 100.0) * self.food.calories_kcal)
-        return 0.0
-    
-    @property
-    def food_name(self) -> str:
-        return self.food.name if self.food else ""
+    # Werden von der Datenbank mit jeder Log-Abfrage mitgeliefert (korrelierte Subqueries),
+    # das zugehörige Food-Objekt muss dafür nicht geladen werden.
+    # coalesce außerhalb der Subquery: fehlt das Food, liefert sie gar keine Zeile (NULL)
+    calories: Mapped[float] = column_property(
+        func.coalesce(
+            select(consumption_kcal(amount_g, Food.calories_kcal))
+            .where(Food.id == food_id)
+            .correlate_except(Food)
+            .scalar_subquery(),
+            0.0,
+        )
+    )
+    food_name: Mapped[str] = column_property(
+        func.coalesce(
+            select(Food.name)
+            .where(Food.id == food_id)
+            .correlate_except(Food)
+            .scalar_subquery(),
+            '',
+        )
+    )
 
-class ActivityLog(Base):
+class ActivityLog(VersionedMixin, Base):
     __tablename__ = 'activitylogs'
+    __table_args__ = (
+        Index('ix_activitylogs_user_id_log_date', 'user_id', 'log_date', 'activity_log_id'),
+        Index('ix_activitylogs_user_id_row_version', 'user_id', 'row_version'),
+    )
     id: Mapped[int] = mapped_column('activity_log_id', primary_key=True)
     user_id: Mapped[int] = mapped_column(ForeignKey('users.user_id'))
     exercise_type_id: Mapped[int] = mapped_column(ForeignKey('exercisetypes.exercise_type_id'))
@@ -75,13 +152,22 @@ class ActivityLog(Base):
     
     exercise_type: Mapped["ExerciseType"] = relationship(back_populates='activities')
 
-    @property
-    def calories(self) -> float:
-        if self.exercise_type and self.duration_min:
-            return round((self.duration_min / 60) * self.exercise_type.calories_per_hour)
-        return 0.0
-
-    @property
-    def exercise_name(self) -> str:
-        return self.exercise_type.name if self.exercise_type else ""
+    calories: Mapped[float] = column_property(
+        func.coalesce(
+            select(activity_kcal(duration_min, ExerciseType.calories_per_hour))
+            .where(ExerciseType.id == exercise_type_id)
+            .correlate_except(ExerciseType)
+            .scalar_subquery(),
+            0.0,
+        )
+    )
+    exercise_name: Mapped[str] = column_property(
+        func.coalesce(
+            select(ExerciseType.name)
+            .where(ExerciseType.id == exercise_type_id)
+            .correlate_except(ExerciseType)
+            .scalar_subquery(),
+            '',
+        )
+    )
 
@@ -0,0 +1,180 @@
+from __future__ import annotations
+import math
+from datetime import date, datetime, time, timedelta, timezone
+from zoneinfo import ZoneInfo
+from sqlalchemy import ForeignKey, Date, Float, String, TIMESTAMP, Index
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.sql.functions import FunctionElement
+from tracker.models.base_model import Base
+
+
+class DailyEnergyRollup(Base):
+    """
+    Tagessummen pro Benutzer (materialisiert). Wird bei jedem Schreibvorgang auf Logs,
+    Foods und Bewegungsformen in derselben Transaktion für die betroffenen Tage neu
+    berechnet, das Dashboard summiert dadurch höchstens 366 Zeilen statt aller Logs.
+    Die Tage sind Kalendertage in der Zeitzone des Benutzers (UserProfile.timezone).
+    """
+    __tablename__ = 'dailyenergyrollups'
+    user_id: Mapped[int] = mapped_column(ForeignKey('users.user_id'), primary_key=True)
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+    kcal_in: Mapped[float] = mapped_column(default=0)
+    kcal_out_active: Mapped[float] = mapped_column(default=0)
+    n_entries: Mapped[int] = mapped_column(default=0)
+
+
+class CatalogUsage(Base):
+    """
+    Nutzungs-Ranking pro Benutzer und Food bzw. Bewegungsform (für /recent).
+    `score` ist ln(Σ exp(λ·t)) über alle Logs des Eintrags (t = Tage seit USAGE_EPOCH,
+    λ aus der Halbwertszeit in rollup_crud). Neuere Logs zählen damit exponentiell mehr,
+    und weil alle Scores gleich schnell "altern", muss nie ein bestehender Score
+    herabgesetzt werden: die Reihenfolge nach score ist jederzeit die aktuelle.
+    """
+    __tablename__ = 'catalogusage'
+    __table_args__ = (
+        Index('ix_catalogusage_user_id_entity_score', 'user_id', 'entity', 'score'),
+    )
+    user_id: Mapped[int] = mapped_column(ForeignKey('users.user_id'), primary_key=True)
+    # 'foods' oder 'exercise_types'
+    entity: Mapped[str] = mapped_column(String(20), primary_key=True)
+    item_id: Mapped[int] = mapped_column(primary_key=True)
+    score: Mapped[float] = mapped_column()
+    use_count: Mapped[int] = mapped_column()
+    last_used: Mapped[datetime] = mapped_column(TIMESTAMP(timezone=True))
+
+
+# Bezugspunkt der Usage-Scores (beliebig, muss nur fest bleiben)
+USAGE_EPOCH = datetime(2020, 1, 1, tzinfo=timezone.utc)
+# Halbwertszeit einer Nutzung im Score und die Zerfallsrate λ pro Tag
+USAGE_HALF_LIFE_DAYS = 14
+USAGE_RATE = math.log(2) / USAGE_HALF_LIFE_DAYS
+# exp() wird auf ±700 begrenzt (double reicht bis ~709), also auf ca. 38 Jahre Abstand zum Bezug
+_EXP_LIMIT = 700
+# Anteil des bisherigen Scores, der beim Abziehen einer Nutzung mindestens bleibt
+# (Rundungsfehler bei exp(S) - exp(x) dürfen den Score nicht auf ln(0) bringen)
+_MIN_REMAINDER = 1e-12
+
+# Zeitzone für Benutzer ohne (gültige) Angabe im Profil
+DEFAULT_TIMEZONE = 'UTC'
+
+
+class log_day(FunctionElement):
+    """
+    Kalendertag eines Log-Zeitstempels in einer IANA-Zeitzone als DATE,
+    z.B. log_day(ConsumptionLog.log_date, 'Europe/Berlin'). Die Zeitzone darf auch
+    ein SQL-Ausdruck sein (siehe rollup_crud.timezone_of).
+    """
+    type = Date()
+    name = 'log_day'
+    inherit_cache = True
+
+@compiles(log_day)
+def _compile_log_day(element, compiler, **kw):
+    # SQLite kennt keine Zeitzonen, local_day() wird in database.py pro Verbindung registriert
+    return "local_day(%s)" % compiler.process(element.clauses, **kw)
+
+@compiles(log_day, 'postgresql')
+def _compile_log_day_postgresql(element, compiler, **kw):
+    # timestamptz AT TIME ZONE liefert die Ortszeit, unabhängig von der TimeZone-Einstellung der Session.
+    # Entspricht date_trunc('day', ...), nur direkt als DATE.
+    log_date, tz = element.clauses
+    return "CAST((%s AT TIME ZONE %s) AS DATE)" % (compiler.process(log_date, **kw), compiler.process(tz, **kw))
+
+
+def log_day_of(log_date: datetime | None, tz: str = DEFAULT_TIMEZONE) -> date | None:
+    """Python-Gegenstück zu log_day für bereits geladene Werte (naive Werte gelten als UTC)."""
+    if log_date is None:
+        return None
+    if log_date.tzinfo is None:
+        log_date = log_date.replace(tzinfo=timezone.utc)
+    return log_date.astimezone(ZoneInfo(tz)).date()
+
+
+def utc_range(start_day: date, end_day: date, tz: str = DEFAULT_TIMEZONE) -> tuple[datetime, datetime]:
+    """
+    Zeitraum [Beginn von start_day, Beginn des Folgetags von end_day) in der Zeitzone tz,
+    umgerechnet nach UTC (so werden die Zeitstempel gespeichert). Berücksichtigt die
+    Sommerzeit, ein Tag kann also 23 oder 25 Stunden lang sein.
+    """
+    zone = ZoneInfo(tz)
+    start = datetime.combine(start_day, time.min, tzinfo=zone).astimezone(timezone.utc)
+    end = datetime.combine(end_day + timedelta(days=1), time.min, tzinfo=zone).astimezone(timezone.utc)
+    return start, end
+
+
+def _as_utc(value: datetime) -> datetime:
+    # SQLite liefert die Zeitstempel ohne Zeitzone (gespeichert in UTC)
+    return value if value.tzinfo is not None else value.replace(tzinfo=timezone.utc)
+
+
+def usage_exponent(log_date: datetime) -> float:
+    """λ·t eines Zeitstempels (t in Tagen seit USAGE_EPOCH)."""
+    return USAGE_RATE * (_as_utc(log_date) - USAGE_EPOCH).total_seconds() / 86400
+
+
+class usage_weight(FunctionElement):
+    """
+    Gewicht exp(λ·t - reference) eines Log-Zeitstempels im Nutzungs-Ranking. Der Bezug
+    (z.B. usage_exponent von jetzt) hält die Summen über mehrere Logs im Bereich von double.
+    """
+    type = Float()
+    name = 'usage_weight'
+    inherit_cache = True
+
+@compiles(usage_weight)
+def _compile_usage_weight(element, compiler, **kw):
+    # SQLite: Python-Funktion usage_weight() unten, in database.py registriert
+    return "usage_weight(%s)" % compiler.process(element.clauses, **kw)
+
+@compiles(usage_weight, 'postgresql')
+def _compile_usage_weight_postgresql(element, compiler, **kw):
+    log_date, reference = (compiler.process(clause, **kw) for clause in element.clauses)
+    exponent = "%r * (EXTRACT(EPOCH FROM %s) - %r) / 86400" % (USAGE_RATE, log_date, USAGE_EPOCH.timestamp())
+    return "exp(LEAST(GREATEST(%s - %s, -%d), %d))" % (exponent, reference, _EXP_LIMIT, _EXP_LIMIT)
+
+
+class usage_score(FunctionElement):
+    """
+    Neuer Score ln(exp(score) + Σ Gewichte) nach dem Addieren (Gewicht > 0) bzw. Abziehen
+    (Gewicht < 0) von Nutzungen, z.B. usage_score(CatalogUsage.score, weight, reference).
+    score NULL steht für einen Eintrag ohne bisherige Nutzung.
+    """
+    type = Float()
+    name = 'usage_score'
+    inherit_cache = True
+
+@compiles(usage_score)
+def _compile_usage_score(element, compiler, **kw):
+    return "usage_score(%s)" % compiler.process(element.clauses, **kw)
+
+@compiles(usage_score, 'postgresql')
+def _compile_usage_score_postgresql(element, compiler, **kw):
+    score, weight, reference = (compiler.process(clause, **kw) for clause in element.clauses)
+    base = "COALESCE(exp(LEAST(GREATEST(%s - %s, -%d), %d)), 0)" % (score, reference, _EXP_LIMIT, _EXP_LIMIT)
+    return "(%s + ln(GREATEST(%s + %s, %s * %r, 1e-300)))" % (reference, base, weight, base, _MIN_REMAINDER)
+
+
+def _clamped_exp(value: float) -> float:
+    return math.exp(min(max(value, -_EXP_LIMIT), _EXP_LIMIT))
+
+
+def local_day(value: str | None, tz: str | None) -> str | None:
+    """SQLite-Funktion hinter log_day: UTC-Zeitstempel als Text -> Kalendertag (ISO) in tz."""
+    if value is None:
+        return None
+    return log_day_of(datetime.fromisoformat(value), tz or DEFAULT_TIMEZONE).isoformat()
+
+
+def sqlite_usage_weight(value: str | None, reference: float) -> float | None:
+    """SQLite-Funktion hinter usage_weight."""
+    if value is None:
+        return None
+    return _clamped_exp(usage_exponent(datetime.fromisoformat(value)) - reference)
+
+
+def sqlite_usage_score(score: float | None, weight: float, reference: float) -> float:
+    """SQLite-Funktion hinter usage_score."""
+    base = 0.0 if score is None else _clamped_exp(score - reference)
+    return reference + math.log(max(base + weight, base * _MIN_REMAINDER, 1e-300))
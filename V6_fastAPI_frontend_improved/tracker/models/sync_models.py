@@ -0,0 +1,29 @@
+from __future__ import annotations
+from sqlalchemy import ForeignKey, BigInteger, String, Index
+from sqlalchemy.orm import Mapped, mapped_column
+from tracker.models.base_model import Base
+
+
+class SyncState(Base):
+    """
+    Änderungszähler pro Benutzer, wird bei jedem Schreibvorgang hochgezählt.
+    Die *_version-Spalten halten den Zählerstand der letzten Änderung des jeweiligen
+    Entity-Typs und dienen als günstige Grundlage für ETags der Listen-Endpunkte.
+    """
+    __tablename__ = 'syncstates'
+    user_id: Mapped[int] = mapped_column(ForeignKey('users.user_id'), primary_key=True)
+    version: Mapped[int] = mapped_column(BigInteger, default=0)
+    foods_version: Mapped[int] = mapped_column(BigInteger, default=0, server_default='0')
+    exercise_types_version: Mapped[int] = mapped_column(BigInteger, default=0, server_default='0')
+    consumption_logs_version: Mapped[int] = mapped_column(BigInteger, default=0, server_default='0')
+    activity_logs_version: Mapped[int] = mapped_column(BigInteger, default=0, server_default='0')
+
+class DeletedItem(Base):
+    """Tombstone für gelöschte Einträge, damit Clients Löschungen per Delta erfahren."""
+    __tablename__ = 'deleteditems'
+    __table_args__ = (Index('ix_deleteditems_user_id_row_version', 'user_id', 'row_version'),)
+    id: Mapped[int] = mapped_column('deleted_item_id', primary_key=True)
+    user_id: Mapped[int] = mapped_column(ForeignKey('users.user_id'))
+    entity_name: Mapped[str] = mapped_column(String(30))
+    item_id: Mapped[int] = mapped_column()
+    row_version: Mapped[int] = mapped_column(BigInteger)
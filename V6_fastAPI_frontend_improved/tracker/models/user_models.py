@@ -3,7 +3,7 @@ from typing import Optional
 from datetime import date
 from sqlalchemy import String, ForeignKey
 from sqlalchemy.orm import relationship, Mapped, mapped_column
-from tracker.models.base_model import Base
+from tracker.models.base_model import Base, VersionedMixin
 
 
 class User(Base):
@@ -15,7 +15,7 @@ class User(Base):
     
     profile: Mapped["UserProfile"] = relationship(back_populates='user', uselist=False, cascade="all, delete-orphan")
 
-class UserProfile(Base):
+class UserProfile(VersionedMixin, Base):
     __tablename__ = 'userprofiles'
     id: Mapped[int] = mapped_column(primary_key=True)
     user_id: Mapped[int] = mapped_column(ForeignKey('users.user_id'), unique=True)
@@ -25,6 +25,8 @@ class UserProfile(Base):
     weight_kg: Mapped[Optional[float]] = mapped_column()
     tracking_start_date: Mapped[Optional[date]] = mapped_column()
     balance_goal_kcal: Mapped[Optional[int]] = mapped_column()
+    # IANA-Zeitzone (z.B. 'Europe/Berlin') für die Tagesgrenzen im Dashboard, None = UTC
+    timezone: Mapped[Optional[str]] = mapped_column(String(64))
     user: Mapped["User"] = relationship(back_populates='profile')
 
 class Role(Base):
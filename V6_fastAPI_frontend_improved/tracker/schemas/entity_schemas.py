@@ -1,6 +1,7 @@
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, field_validator
 from datetime import datetime, date
-from typing import Optional, List, Union
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+from typing import Optional, List, Dict, Union, Any, Literal
 
 # ==============================================================================
 # Base Schemas (Definieren die Kern-Attribute)
@@ -34,12 +35,13 @@ class ExerciseTypeBase(BaseModel):
 class ConsumptionLogBase(BaseModel):
     food_id: int
     amount_g: int
-    log_date: Optional[datetime] = None
+    # Pflichtfeld: die Spalte ist NOT NULL, ein fehlendes Datum soll 422 pro Eintrag ergeben
+    log_date: datetime
 
 class ActivityLogBase(BaseModel):
     exercise_type_id: int
     duration_min: int
-    log_date: Optional[datetime] = None
+    log_date: datetime
 
 class UserProfileBase(BaseModel):
     gender: Optional[str] = None
@@ -48,6 +50,19 @@ class UserProfileBase(BaseModel):
     weight_kg: Optional[float] = None
     tracking_start_date: Optional[date] = None
     balance_goal_kcal: Optional[int] = None
+    timezone: Optional[str] = None
+
+    @field_validator('timezone')
+    @classmethod
+    def check_timezone(cls, value: Optional[str]) -> Optional[str]:
+        """Nur gültige IANA-Namen zulassen (Tagesgrenzen für Rollup und Dashboard)."""
+        if value is None:
+            return None
+        try:
+            ZoneInfo(value)
+        except (ZoneInfoNotFoundError, ValueError):
+            raise ValueError(f"Unknown timezone: {value}")
+        return value
 
 # ==============================================================================
 # Schemas für Authentifizierung & Benutzer
@@ -155,9 +170,82 @@ class User(BaseModel):
     profile: Optional[UserProfile] = None
     model_config = ConfigDict(from_attributes=True)
 
+class CurrentUser(BaseModel):
+    """
+    Unveränderlicher Schnappschuss des angemeldeten Benutzers (Rückgabe von get_current_user).
+    Wird im UserCache zwischen Requests geteilt, darf daher kein ORM-Objekt sein.
+    """
+    user_id: int
+    email: str
+    name: Optional[str] = None
+    model_config = ConfigDict(from_attributes=True, frozen=True)
+
 class AllTrackingData(BaseModel):
     foods: List[Food]
     exercise_types: List[ExerciseType]
     consumption_logs: List[ConsumptionLog]
     activity_logs: List[ActivityLog]
-    user_profile: Optional[UserProfile] = None
\ No newline at end of file
+    user_profile: Optional[UserProfile] = None
+    # Stand des Änderungszählers, ab dem der Client per Delta-Sync weitermacht
+    version: int = 0
+
+class DeletedIds(BaseModel):
+    foods: List[int] = []
+    exercise_types: List[int] = []
+    consumption_logs: List[int] = []
+    activity_logs: List[int] = []
+
+class TrackingDataChanges(BaseModel):
+    version: int
+    foods: List[Food]
+    exercise_types: List[ExerciseType]
+    consumption_logs: List[ConsumptionLog]
+    activity_logs: List[ActivityLog]
+    deleted: DeletedIds
+    user_profile: Optional[UserProfile] = None
+
+class DashboardData(BaseModel):
+    labels: List[str]
+    calories_in: List[float]
+    calories_out_active: List[float]
+    calories_out_bmr: List[float]
+    details_in: List[List[str]]
+    details_out: List[List[str]]
+    total_in: float
+    total_out: float
+    balance: float
+    balance_goal: int
+
+class NutrientTotals(BaseModel):
+    from_date: date
+    to_date: date
+    # Nährstoff -> Summe über alle Konsum-Logs des Zeitraums (skaliert mit amount_g / 100)
+    macros: Dict[str, float]
+    vitamins: Dict[str, float]
+    minerals: Dict[str, float]
+    other_compounds: Dict[str, float]
+
+class BulkDelete(BaseModel):
+    ids: List[int]
+
+class BulkUpdate(BaseModel):
+    ids: List[int]
+    # Wird in der Route gegen das Update-Schema des Entity-Typs validiert
+    changes: dict
+
+class BulkItemResult(BaseModel):
+    id: int
+    status: Literal['updated', 'deleted', 'not_found', 'conflict']
+
+class BulkResult(BaseModel):
+    results: List[BulkItemResult]
+
+class ImportRowError(BaseModel):
+    line: int
+    error: str
+
+class ImportResult(BaseModel):
+    imported: int
+    failed: int
+    batches: int
+    errors: List[ImportRowError]
@@ -1,4 +1,3 @@
-import asyncio
 import jwt
 from datetime import datetime, timedelta, timezone
 from typing import Optional
@@ -7,15 +6,18 @@ from fastapi.security import OAuth2PasswordBearer
 from passlib.context import CryptContext
 from sqlalchemy.ext.asyncio import AsyncSession
 from tracker.crud import user_crud
+from tracker.auth.user_cache import user_cache
+from tracker.auth.token_cache import token_cache
 
 
 from tracker.config import settings
 from tracker.database import get_db
-from tracker.models import user_models
+from tracker.schemas.entity_schemas import CurrentUser
 
 # --- Configuration ---
 # Password hashing context
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Der Kostenfaktor kommt aus den Settings; needs_update() meldet Hashes mit abweichendem Faktor
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=settings.BCRYPT_ROUNDS)
 
 
 # das ist der kleine arbeiter welcher wenn er benötig wird die request bekommt diese nach dem token durchsucht und gibt eine string alles nach "Bearer " zurück
@@ -31,6 +33,10 @@ def get_password_hash(password: str) -> str:
     """Hashes a plain password."""
     return pwd_context.hash(password)
 
+def password_needs_rehash(hashed_password: str) -> bool:
+    """Checks (cheaply, without hashing) whether a hash uses outdated parameters."""
+    return pwd_context.needs_update(hashed_password)
+
 # --- JWT Utilities ---
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """Creates a new JWT access token."""
@@ -44,8 +50,21 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     encoded_jwt = jwt.encode(to_encode, settings.JWT_SECRET_KEY, algorithm=settings.JWT_ALGORITHM)
     return encoded_jwt
 
+def decode_access_token(token: str) -> dict:
+    """
+    Verifiziert ein JWT und gibt dessen Claims zurück.
+    HS256 dauert nur Mikrosekunden, daher wird direkt im Event-Loop dekodiert
+    (ein Thread-Wechsel wäre teurer und konkurriert mit dem bcrypt-Hashing).
+    Bereits verifizierte Tokens kommen bis zu ihrem `exp` aus dem token_cache.
+    """
+    payload = token_cache.get(token)
+    if payload is None:
+        payload = jwt.decode(token, settings.JWT_SECRET_KEY, algorithms=[settings.JWT_ALGORITHM])
+        token_cache.set(token, payload)
+    return payload
+
 # --- Dependency for getting the current user ---
-async def get_current_user(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_db)) -> user_models.User:
+async def get_current_user(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_db)) -> CurrentUser:
     """
     Abhängigkeit, um den aktuellen Benutzer aus einem JWT-Token zu holen.
     Diese wird verwendet, um Endpunkte zu schützen.
@@ -57,19 +76,27 @@ async def get_current_user(token: str = Depends(oauth2_scheme), db: AsyncSession
         headers={"WWW-Authenticate": "Bearer"},
     )
     try:
-        # "State of the Art": Führe die CPU-intensive Dekodierung in einem Thread aus.
-        payload = await asyncio.to_thread(
-            jwt.decode, token, settings.JWT_SECRET_KEY, algorithms=[settings.JWT_ALGORITHM]
-        )
+        payload = decode_access_token(token)
         user_id: str = payload.get("sub")
         if user_id is None:
             raise credentials_exception
     except jwt.PyJWTError: # Fängt alle JWT-bezogenen Fehler ab
         raise credentials_exception
     
+    # Im Normalfall kommt der Benutzer aus dem Cache, nur bei einem Miss wird die DB gefragt
+    user = user_cache.get(int(user_id))
+    if user is not None:
+        return user
+
     # Delegiert Datenbankabfrage an asynchrone CRUD-Schicht
-    user = await user_crud.get_user_by_id(db, user_id=int(user_id))
+    db_user = await user_crud.get_user_by_id(db, user_id=int(user_id))
     
-    if user is None:
+    if db_user is None:
         raise credentials_exception
+    # Auch beim Cache-Miss den Schnappschuss liefern, damit Handler immer denselben Typ sehen
+    user = CurrentUser.model_validate(db_user, from_attributes=True)
+    # Verbindung sofort an den Pool zurückgeben, statt sie bis zum Ende des Requests zu halten
+    # (z.B. während /api/tracking-data parallel auf eigenen Sessions abfragt)
+    await db.rollback()
+    user_cache.set(user)
     return user
\ No newline at end of file
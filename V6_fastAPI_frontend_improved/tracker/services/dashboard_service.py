@@ -0,0 +1,209 @@
+import calendar
+from datetime import datetime, time, date, timedelta, timezone
+from zoneinfo import ZoneInfo
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from tracker.models.entity_models import ConsumptionLog, ActivityLog, Food, ExerciseType, consumption_kcal, activity_kcal
+from tracker.models.user_models import UserProfile
+from tracker.models.rollup_models import DailyEnergyRollup, log_day, utc_range, DEFAULT_TIMEZONE
+from tracker.crud import profile_crud
+
+
+# --- ASYNC DB CHANGES ---
+# Im Gegensatz zur v5 werden die Logs nicht mehr einzeln geladen und in Python gezählt.
+# Die Kalorien pro Bucket kommen aus dem Tages-Rollup (höchstens 366 Zeilen pro Abfrage),
+# die Tooltip-Details (kcal pro Name) aus einer nach Tag und Food/Bewegungsform gruppierten
+# Abfrage pro Log-Typ. Die Tage werden in Python wie beim Rollup den Buckets zugeordnet.
+# Tage, Wochen, Monate und "heute" gelten in der Zeitzone aus dem Profil (Standard: UTC),
+# damit die Buckets nicht von der Zeitzone des Servers oder Browsers abhängen.
+
+
+def _get_time_period(period_str: str, today_date: date):
+    """Liefert ersten Tag, letzten Tag und Chart-Labels für den angegebenen Zeitraum."""
+    match period_str:
+        case 'day':
+            start_day, end_day = today_date, today_date
+            chart_labels = ['Heute']
+        case 'week':
+            start_day = today_date - timedelta(days=today_date.weekday())
+            end_day = start_day + timedelta(days=6)
+            chart_labels = ['Mo', 'Di', 'Mi', 'Do', 'Fr', 'Sa', 'So']
+        case 'month':
+            start_day = today_date.replace(day=1)
+            end_day = today_date.replace(day=calendar.monthrange(today_date.year, today_date.month)[1])
+            chart_labels = [str(d) for d in range(1, end_day.day + 1)]
+        case 'year':
+            start_day = today_date.replace(month=1, day=1)
+            end_day = today_date.replace(month=12, day=31)
+            chart_labels = ['Jan', 'Feb', 'Mär', 'Apr', 'Mai', 'Jun', 'Jul', 'Aug', 'Sep', 'Okt', 'Nov', 'Dez']
+        case _:
+            return None, None, None
+    return start_day, end_day, chart_labels
+
+
+def _calculate_bmr(profile: UserProfile | None):
+    """Berechnet den Grundumsatz (Harris-Benedict) und gibt ihn mit dem Tracking-Start zurück."""
+    if not (profile and profile.gender and profile.age and profile.height_cm and profile.weight_kg):
+        return 0, None
+
+    bmr_val = 0
+    if profile.gender.lower() == 'female':
+        bmr_val = 655.1 + (9.6 * profile.weight_kg) + (1.8 * profile.height_cm) - (4.7 * profile.age)
+    elif profile.gender.lower() == 'male':
+        bmr_val = 66.47 + (13.7 * profile.weight_kg) + (5 * profile.height_cm) - (6.8 * profile.age)
+
+    return round(bmr_val), profile.tracking_start_date
+
+
+def _bucket_index(period_str: str, day: date, start_day: date) -> int:
+    """Index des Chart-Buckets eines Kalendertags (gleiche Logik wie get_interval_index in der v5)."""
+    match period_str:
+        case 'day' | 'week':
+            return (day - start_day).days
+        case 'month':
+            return day.day - 1
+        case 'year':
+            return day.month - 1
+    raise ValueError("Invalid period specified")
+
+
+async def _rollup_totals(db: AsyncSession, user_id: int, period_str: str, start_day: date, end_day: date, num_labels: int):
+    """Summiert die Tageswerte des Rollups pro Bucket (aufgenommen, aktiv verbrannt)."""
+    result = await db.execute(
+        select(DailyEnergyRollup.day, DailyEnergyRollup.kcal_in, DailyEnergyRollup.kcal_out_active)
+        .where(DailyEnergyRollup.user_id == user_id, DailyEnergyRollup.day.between(start_day, end_day))
+    )
+    return _bucket_totals(period_str, start_day, num_labels, result.all())
+
+
+def _bucket_totals(period_str: str, start_day: date, num_labels: int, rows):
+    """Ordnet Zeilen (Tag, kcal_in, kcal_out_active) den Buckets zu und summiert sie."""
+    calories_in = [0] * num_labels
+    calories_out_active = [0] * num_labels
+    for day, kcal_in, kcal_out_active in rows:
+        idx = _bucket_index(period_str, day, start_day)
+        if 0 <= idx < num_labels:
+            calories_in[idx] += kcal_in or 0
+            calories_out_active[idx] += kcal_out_active or 0
+
+    return [round(c) for c in calories_in], [round(c) for c in calories_out_active]
+
+
+async def _aggregate_details(db: AsyncSession, query, period_str: str, start_day: date, num_labels: int):
+    """
+    Führt eine gruppierte Abfrage (Tag, Name, kcal) aus und baut daraus die Detail-Texte
+    pro Bucket. Gleichnamige Einträge eines Buckets werden zusammengefasst.
+    """
+    kcal_by_bucket = [{} for _ in range(num_labels)]
+
+    result = await db.execute(query)
+    for day, name, kcal in result.all():
+        idx = _bucket_index(period_str, day, start_day)
+        if 0 <= idx < num_labels:
+            kcal_by_name = kcal_by_bucket[idx]
+            kcal_by_name[name] = kcal_by_name.get(name, 0) + float(kcal or 0)
+
+    return [[f"{name}: {round(kcal)} kcal" for name, kcal in kcal_by_name.items()] for kcal_by_name in kcal_by_bucket]
+
+
+def _consumption_query(user_id: int, start: datetime, end: datetime, tz: str):
+    """Summiert die aufgenommenen Kalorien pro Kalendertag und Nahrungsmittel."""
+    day = log_day(ConsumptionLog.log_date, tz).label('day')
+    kcal = consumption_kcal(ConsumptionLog.amount_g, Food.calories_kcal)
+    return (
+        select(day, Food.name, func.sum(kcal))
+        .join(Food, ConsumptionLog.food_id == Food.id)
+        .where(ConsumptionLog.user_id == user_id, ConsumptionLog.log_date >= start, ConsumptionLog.log_date < end)
+        .group_by('day', Food.id, Food.name)
+    )
+
+
+def _activity_query(user_id: int, start: datetime, end: datetime, tz: str):
+    """Summiert die verbrannten Kalorien pro Kalendertag und Bewegungsform."""
+    day = log_day(ActivityLog.log_date, tz).label('day')
+    kcal = activity_kcal(ActivityLog.duration_min, ExerciseType.calories_per_hour)
+    return (
+        select(day, ExerciseType.name, func.sum(kcal))
+        .join(ExerciseType, ActivityLog.exercise_type_id == ExerciseType.id)
+        .where(ActivityLog.user_id == user_id, ActivityLog.log_date >= start, ActivityLog.log_date < end)
+        .group_by('day', ExerciseType.id, ExerciseType.name)
+    )
+
+
+def _get_bmr_list_for_period(num_labels, daily_bmr, period_str, start_day, today_date, tracking_start):
+    """Erstellt eine Liste mit den BMR-Werten für den angegebenen Zeitraum."""
+    bmr_list = [0] * num_labels
+    if not (daily_bmr > 0 and tracking_start):
+        return bmr_list
+
+    match period_str:
+        case 'day':
+            day_date = start_day
+            if day_date >= tracking_start and len(bmr_list) > 0:
+                bmr_list[0] = daily_bmr
+        case 'week' | 'month':
+            limit_index = today_date.weekday() if period_str == 'week' else today_date.day - 1
+            for i in range(len(bmr_list)):
+                day_date = start_day + timedelta(days=i)
+                if i <= limit_index and day_date >= tracking_start:
+                    bmr_list[i] = daily_bmr
+        case 'year':
+            limit_month_index = today_date.month - 1
+            for i in range(len(bmr_list)):
+                month_start = date(today_date.year, i + 1, 1)
+                if month_start < tracking_start.replace(day=1):
+                    continue
+                if i < limit_month_index:
+                    days_in_month = calendar.monthrange(today_date.year, i + 1)[1]
+                    bmr_list[i] = daily_bmr * days_in_month
+                elif i == limit_month_index:
+                    start_day = max(1, tracking_start.day if tracking_start.month == i + 1 else 1)
+                    days_to_add = today_date.day - start_day + 1
+                    if days_to_add > 0:
+                        bmr_list[i] = daily_bmr * days_to_add
+
+    return [round(b) for b in bmr_list]
+
+
+async def get_dashboard_data_for_period(db: AsyncSession, user_id: int, period: str) -> dict:
+    """
+    Sammelt und verarbeitet alle Daten für das Dashboard und liefert getrennte Verbrauchsdaten.
+    Die Summen kommen aus dem Tages-Rollup, die Details aus je einer
+    gruppierten Abfrage pro Log-Typ.
+    """
+    profile = await profile_crud.get_user_profile(db, user_id=user_id)
+    tz = profile.timezone if profile and profile.timezone else DEFAULT_TIMEZONE
+
+    today = datetime.now(ZoneInfo(tz)).date()
+    start_day, end_day, labels = _get_time_period(period, today)
+    if not start_day:
+        raise ValueError("Invalid period specified")
+
+    daily_bmr, tracking_start = _calculate_bmr(profile)
+    goal_kcal = profile.balance_goal_kcal if profile and profile.balance_goal_kcal is not None else 0
+
+    calories_in, calories_out_active = await _rollup_totals(db, user_id, period, start_day, end_day, len(labels))
+    start, end = utc_range(start_day, end_day, tz)
+    details_in = await _aggregate_details(db, _consumption_query(user_id, start, end, tz), period, start_day, len(labels))
+    details_out = await _aggregate_details(db, _activity_query(user_id, start, end, tz), period, start_day, len(labels))
+
+    # BMR als separate Liste abrufen
+    calories_out_bmr = _get_bmr_list_for_period(len(labels), daily_bmr, period, start_day, today, tracking_start)
+
+    total_in = sum(calories_in)
+    total_out = sum(calories_out_active) + sum(calories_out_bmr)
+    balance = round(total_in - total_out)
+
+    return {
+        'labels': labels,
+        'calories_in': calories_in,
+        'calories_out_active': calories_out_active,
+        'calories_out_bmr': calories_out_bmr,
+        'details_in': details_in,
+        'details_out': details_out,
+        'total_in': total_in,
+        'total_out': total_out,
+        'balance': balance,
+        'balance_goal': goal_kcal
+    }
@@ -0,0 +1,86 @@
+import csv
+import io
+import json
+from typing import AsyncIterator
+
+from tracker.api.api_entity_config import ENTITY_MAP
+from tracker.api.responses import get_type_adapter
+from tracker.crud import entity_crud, profile_crud
+from tracker.database import AsyncSessionLocal
+from tracker.schemas import entity_schemas
+
+
+# --- EXPORT ---
+# Die Exporte sind Async-Generatoren für eine StreamingResponse. Die Zeilen kommen
+# blockweise über einen serverseitigen Cursor und jeder Block wird sofort als Chunk
+# geschrieben, der Speicherbedarf hängt also nicht von der Größe der Historie ab.
+# Jeder Export nutzt eine eigene Session, weil der Generator erst nach dem Ende
+# der Route (und damit nach dem Schließen der Request-Session) abgearbeitet wird.
+
+EXPORT_BATCH_SIZE = 500
+
+
+async def _stream_entities(db, user_id: int):
+    """Liefert (entity_name, Schema, Block von ORM-Objekten) für alle Entity-Typen."""
+    for entity_name, config in ENTITY_MAP.items():
+        result = await entity_crud.stream_items_by_user(
+            db, user_id=user_id, model_class=config['model'], batch_size=EXPORT_BATCH_SIZE
+        )
+        async for batch in result.partitions():
+            yield entity_name, config['schema'], batch
+
+
+def _ndjson_line(entity_name: str, item_json: bytes) -> bytes:
+    return b'{"entity":"' + entity_name.encode() + b'","item":' + item_json + b'}\n'
+
+async def export_ndjson(user_id: int) -> AsyncIterator[bytes]:
+    """Eine JSON-Zeile pro Eintrag: {"entity": "...", "item": {...}}, zuletzt das Profil."""
+    async with AsyncSessionLocal() as db:
+        async for entity_name, Schema, batch in _stream_entities(db, user_id):
+            adapter = get_type_adapter(Schema)
+            yield b''.join(
+                _ndjson_line(entity_name, adapter.dump_json(adapter.validate_python(item, from_attributes=True)))
+                for item in batch
+            )
+
+        profile = await profile_crud.get_user_profile(db, user_id=user_id)
+        if profile:
+            adapter = get_type_adapter(entity_schemas.UserProfile)
+            yield _ndjson_line('user_profile', adapter.dump_json(adapter.validate_python(profile, from_attributes=True)))
+
+
+def _csv_value(value):
+    # Verschachtelte Felder (vitamins, minerals, ...) als JSON in eine Zelle schreiben
+    if isinstance(value, (dict, list)):
+        return json.dumps(value)
+    return value
+
+def _csv_chunk(rows) -> str:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(rows)
+    return buffer.getvalue()
+
+async def export_csv(user_id: int) -> AsyncIterator[str]:
+    """
+    Ein Abschnitt pro Entity-Typ (und Profil), getrennt durch eine Leerzeile.
+    Jeder Abschnitt beginnt mit einer eigenen Kopfzeile, die erste Spalte ist der Entity-Typ.
+    """
+    def section(entity_name, Schema, items, with_header):
+        fields = list(Schema.model_fields)
+        rows = [['entity', *fields]] if with_header else []
+        for item in items:
+            data = Schema.model_validate(item, from_attributes=True).model_dump(mode='json')
+            rows.append([entity_name, *(_csv_value(data[field]) for field in fields)])
+        return rows
+
+    async with AsyncSessionLocal() as db:
+        current = None
+        async for entity_name, Schema, batch in _stream_entities(db, user_id):
+            new_section = entity_name != current
+            prefix = '\n' if new_section and current is not None else ''
+            current = entity_name
+            yield prefix + _csv_chunk(section(entity_name, Schema, batch, with_header=new_section))
+
+        profile = await profile_crud.get_user_profile(db, user_id=user_id)
+        if profile:
+            yield '\n' + _csv_chunk(section('user_profile', entity_schemas.UserProfile, [profile], with_header=True))
@@ -0,0 +1,264 @@
+import codecs
+import csv
+import json
+from datetime import datetime, timezone
+from typing import AsyncIterator, List
+
+from pydantic import ValidationError
+from sqlalchemy import select, insert, inspect
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from tracker.api.responses import get_type_adapter
+from tracker.crud import sync_crud, rollup_crud
+from tracker.models import entity_models
+from tracker.schemas import entity_schemas
+
+
+# --- IMPORT ---
+# Für Migrationen mit sehr vielen Log-Zeilen. Die Eingabe wird zeilenweise gelesen und
+# blockweise verarbeitet: validieren, Namen auflösen, per COPY laden, committen.
+# Jeder Block ist eine eigene Transaktion, ein Fehler in einem Block verwirft also
+# nicht die bereits importierten Blöcke. Pro Block wird ein Bericht zurückgegeben
+# (die CLI gibt ihn aus, die API fasst die Berichte mit summarize_import zusammen).
+
+IMPORT_BATCH_SIZE = 5000
+# Mehr Fehler pro Block werden nur noch gezählt, nicht einzeln gemeldet
+MAX_ERRORS_PER_BATCH = 100
+# Ebenso in der Zusammenfassung (summarize_import) über alle Blöcke
+MAX_REPORTED_ERRORS = 100
+
+IMPORTABLE = {
+    'consumption_logs': {
+        'model': entity_models.ConsumptionLog,
+        'create_schema': entity_schemas.ConsumptionLogCreate,
+        'fk': 'food_id',
+        'name_field': 'food_name',
+        'parent': entity_models.Food,
+    },
+    'activity_logs': {
+        'model': entity_models.ActivityLog,
+        'create_schema': entity_schemas.ActivityLogCreate,
+        'fk': 'exercise_type_id',
+        'name_field': 'exercise_name',
+        'parent': entity_models.ExerciseType,
+    },
+}
+
+
+class NameLookup:
+    """
+    Einmal pro Import geladene Zuordnung Name -> ID der Foods bzw. Bewegungsformen des Benutzers.
+    Rows mit bekannter ID werden direkt übernommen, sonst wird über den Namen aufgelöst
+    (z.B. bei Daten aus anderen Trackern oder einem Export eines anderen Kontos).
+    """
+
+    def __init__(self, rows):
+        self.ids = set()
+        self.by_name = {}
+        for item_id, name in rows:
+            self.ids.add(item_id)
+            # Bei doppelten Namen gewinnt der älteste Eintrag
+            self.by_name.setdefault(name.strip().lower(), item_id)
+
+    @classmethod
+    async def load(cls, db: AsyncSession, user_id: int, parent_model) -> "NameLookup":
+        result = await db.execute(
+            select(parent_model.id, parent_model.name)
+            .where(parent_model.user_id == user_id)
+            .order_by(parent_model.id)
+        )
+        return cls(result.all())
+
+    def resolve(self, item_id, name):
+        if item_id not in (None, '') and int(item_id) in self.ids:
+            return int(item_id)
+        if name:
+            return self.by_name.get(str(name).strip().lower())
+        return None
+
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """Zerlegt einen Byte-Stream (Request-Body, Datei) in Textzeilen, ohne ihn komplett zu laden."""
+    decoder = codecs.getincrementaldecoder('utf-8-sig')()
+    pending = ''
+    async for chunk in chunks:
+        pending += decoder.decode(chunk)
+        *lines, pending = pending.split('\n')
+        for line in lines:
+            yield line.rstrip('\r')
+    pending += decoder.decode(b'', final=True)
+    if pending:
+        yield pending.rstrip('\r')
+
+
+async def _iter_ndjson(lines: AsyncIterator[str], entity_name: str):
+    """(Zeilennummer, Dict oder Fehlertext). Zeilen im Format von /api/export werden entpackt."""
+    line_no = 0
+    async for line in lines:
+        line_no += 1
+        if not line.strip():
+            continue
+        try:
+            data = json.loads(line)
+        except ValueError:
+            yield line_no, "Invalid JSON"
+            continue
+        if isinstance(data, dict) and 'entity' in data and 'item' in data:
+            if data['entity'] != entity_name:
+                continue
+            data = data['item']
+        yield line_no, data
+
+async def _iter_csv(lines: AsyncIterator[str], entity_name: str):
+    """
+    (Zeilennummer, Dict). Die erste Zeile ist die Kopfzeile, leere Zellen zählen als nicht gesetzt.
+    Hat die Kopfzeile eine Spalte 'entity' (Format von /api/export), werden nur Zeilen dieses
+    Entity-Typs übernommen; dort beginnt nach einer Leerzeile ein Abschnitt mit eigener Kopfzeile.
+    Zellen mit Zeilenumbrüchen werden nicht unterstützt, weil die Eingabe zeilenweise gelesen wird.
+    """
+    header = None
+    line_no = 0
+    async for line in lines:
+        line_no += 1
+        if not line.strip():
+            if header and 'entity' in header:
+                header = None
+            continue
+        (values,) = csv.reader([line])
+        if header is None:
+            header = [name.strip() for name in values]
+            continue
+        data = {key: value for key, value in zip(header, values) if value != ''}
+        if 'entity' in header and data.pop('entity', None) != entity_name:
+            continue
+        yield line_no, data
+
+async def _batches(rows, size: int):
+    batch = []
+    async for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _validate_batch(batch, config, lookup: NameLookup):
+    """
+    Validiert einen Block gegen das Create-Schema (ein TypeAdapter-Aufruf für den ganzen Block,
+    nur bei Fehlern zeilenweise) und löst Food-/Exercise-Namen auf.
+    Gibt die gültigen Werte-Dicts und die Fehler (Zeilennummer, Text) zurück.
+    """
+    fk, name_field = config['fk'], config['name_field']
+    rows, errors = [], []
+    for line_no, data in batch:
+        if not isinstance(data, dict):
+            errors.append((line_no, data if isinstance(data, str) else "Expected an object"))
+            continue
+        data = dict(data)
+        try:
+            data[fk] = lookup.resolve(data.get(fk), data.get(name_field))
+        except (TypeError, ValueError):
+            data[fk] = None
+        if data[fk] is None:
+            errors.append((line_no, f"Unknown {fk} / {name_field}"))
+            continue
+        if not data.get('log_date'):
+            errors.append((line_no, "log_date is required"))
+            continue
+        rows.append((line_no, data))
+
+    adapter = get_type_adapter(List[config['create_schema']])
+    try:
+        items = adapter.validate_python([data for _, data in rows])
+        return items, sorted(errors)
+    except ValidationError:
+        pass
+
+    item_adapter = get_type_adapter(config['create_schema'])
+    items = []
+    for line_no, data in rows:
+        try:
+            items.append(item_adapter.validate_python(data))
+        except ValidationError as e:
+            error = e.errors()[0]
+            errors.append((line_no, f"{'.'.join(map(str, error['loc']))}: {error['msg']}"))
+    return items, sorted(errors)
+
+
+async def _copy_rows(db: AsyncSession, model_class, columns: list[str], records: list[tuple]) -> None:
+    """Lädt die Zeilen per COPY (asyncpg) in der laufenden Transaktion, sonst per executemany."""
+    if db.bind.dialect.name == 'postgresql':
+        connection = await db.connection()
+        raw_connection = await connection.get_raw_connection()
+        await raw_connection.driver_connection.copy_records_to_table(
+            model_class.__tablename__, records=records, columns=columns
+        )
+    else:
+        await db.execute(insert(model_class.__table__), [dict(zip(columns, record)) for record in records])
+
+
+async def import_logs(db: AsyncSession, user_id: int, entity_name: str, lines: AsyncIterator[str],
+                      format: str = 'ndjson') -> AsyncIterator[dict]:
+    """
+    Importiert Consumption- oder Activity-Logs aus NDJSON- oder CSV-Zeilen.
+    Liefert nach jedem Block einen Bericht (importierte Zeilen, Fehler mit Zeilennummer).
+    """
+    config = IMPORTABLE[entity_name]
+    model_class = config['model']
+    lookup = await NameLookup.load(db, user_id, config['parent'])
+
+    fields = list(config['create_schema'].model_fields)
+    # COPY umgeht die Python-Defaults des Models, deshalb werden alle Spalten explizit gesetzt
+    mapper_columns = inspect(model_class).columns
+    columns = [mapper_columns[field].name for field in fields] + ['user_id', 'row_version', 'updated_at']
+
+    rows = _iter_csv(lines, entity_name) if format == 'csv' else _iter_ndjson(lines, entity_name)
+    total = 0
+    batch_no = 0
+    async for batch in _batches(rows, IMPORT_BATCH_SIZE):
+        batch_no += 1
+        items, errors = _validate_batch(batch, config, lookup)
+        if items:
+            version = await sync_crud.bump_version(db, user_id, [entity_name])
+            now = datetime.now(timezone.utc)
+            records = [
+                tuple(getattr(item, field) for field in fields) + (user_id, version, now)
+                for item in items
+            ]
+            await _copy_rows(db, model_class, columns, records)
+            # Der Block ist an seiner row_version erkennbar (eigener Versions-Bump)
+            await rollup_crud.add_logs(db, user_id, model_class, model_class.row_version == version)
+            await db.commit()
+            total += len(items)
+
+        yield {
+            'batch': batch_no,
+            'rows': len(batch),
+            'imported': len(items),
+            'failed': len(errors),
+            'total_imported': total,
+            'errors': [{'line': line_no, 'error': error} for line_no, error in errors[:MAX_ERRORS_PER_BATCH]],
+        }
+
+
+async def summarize_import(reports: AsyncIterator[dict]) -> dict:
+    """
+    Fasst die Block-Berichte von import_logs zusammen, ohne sie zu sammeln: Summen und
+    höchstens MAX_REPORTED_ERRORS Fehler, damit die Antwort bei großen Importen klein bleibt.
+    """
+    summary = {'imported': 0, 'failed': 0, 'batches': 0, 'errors': []}
+    async for report in reports:
+        summary['batches'] += 1
+        summary['imported'] += report['imported']
+        summary['failed'] += report['failed']
+        summary['errors'] += report['errors'][:MAX_REPORTED_ERRORS - len(summary['errors'])]
+    return summary
+
+
+async def iter_file_chunks(path: str, chunk_size: int = 1 << 16) -> AsyncIterator[bytes]:
+    """Liest eine Datei blockweise (für die CLI)."""
+    with open(path, 'rb') as f:
+        while chunk := f.read(chunk_size):
+            yield chunk
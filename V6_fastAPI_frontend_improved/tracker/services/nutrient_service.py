@@ -0,0 +1,107 @@
+from datetime import date, datetime
+from typing import Optional
+from zoneinfo import ZoneInfo
+from sqlalchemy import select, func, literal, case, cast, true, union_all, Numeric
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from tracker.crud import rollup_crud
+from tracker.models.entity_models import ConsumptionLog, Food
+from tracker.models.rollup_models import utc_range
+
+
+# --- NÄHRSTOFF-SUMMEN ---
+# Summiert Makros und alle Schlüssel der Nährstoff-Dokumente (vitamins, minerals,
+# other_compounds) der Konsum-Logs eines Zeitraums, jeweils skaliert mit amount_g / 100.
+# Alles in einer Abfrage: zuerst die Gramm pro Food im Zeitraum summieren, dann jedes
+# Food-Dokument nur einmal (statt einmal pro Log) per json(b)_each entpacken und mit den
+# Gramm gewichten. Die Makros werden dafür als zusätzliches Dokument gebaut.
+# Nicht-numerische Werte (Text, verschachtelte Objekte) werden übersprungen.
+
+# Makro-Spalten von Food (Angaben pro 100 g)
+MACRO_FIELDS = (
+    'calories_kcal', 'calories_kJ', 'protein_g',
+    'carbs_total_g', 'carbs_sugar_g', 'carbs_fiber_g',
+    'fat_total_g', 'fat_saturated_g', 'fat_monounsaturated_g', 'fat_polyunsaturated_g', 'fat_trans_g',
+    'cholesterol_mg', 'sodium_mg',
+)
+# Freie Nährstoff-Dokumente von Food (Schlüssel -> Menge pro 100 g)
+DOCUMENT_FIELDS = ('vitamins', 'minerals', 'other_compounds')
+
+
+def _json_functions(dialect_name: str):
+    """(Objekt bauen, Typ eines Dokuments, Einträge eines Dokuments, Filter/Wert eines Eintrags) je Dialekt."""
+    if dialect_name == 'postgresql':
+        def entries(document):
+            return func.jsonb_each(document).table_valued('key', 'value')
+
+        def numeric_value(entry):
+            return func.jsonb_typeof(entry.c.value) == 'number', cast(entry.c.value, Numeric)
+
+        return func.jsonb_build_object, func.jsonb_typeof, entries, numeric_value
+
+    # SQLite (JSON1): json_each liefert den SQL-Wert und dessen JSON-Typ als eigene Spalte
+    def entries(document):
+        return func.json_each(document).table_valued('key', 'value', 'type')
+
+    def numeric_value(entry):
+        return entry.c.type.in_(('integer', 'real')), entry.c.value
+
+    return func.json_object, func.json_type, entries, numeric_value
+
+
+def _nutrient_query(dialect_name: str, user_id: int, start, end):
+    build_object, type_of, entries_of, numeric_value = _json_functions(dialect_name)
+
+    def as_object(document):
+        # json(b)_each schlägt bei Arrays/Skalaren fehl bzw. liefert Indizes, daher nur Objekte entpacken
+        return case((type_of(document) == 'object', document))
+
+    grams = (
+        select(ConsumptionLog.food_id, (func.sum(ConsumptionLog.amount_g) / 100.0).label('factor'))
+        .where(ConsumptionLog.user_id == user_id, ConsumptionLog.log_date >= start, ConsumptionLog.log_date < end)
+        .group_by(ConsumptionLog.food_id)
+        .subquery('grams')
+    )
+    macros = build_object(*[part for field in MACRO_FIELDS for part in (literal(field), getattr(Food, field))])
+    foods = (
+        select(
+            grams.c.factor,
+            macros.label('macros'),
+            *[as_object(getattr(Food, field)).label(field) for field in DOCUMENT_FIELDS],
+        )
+        .join_from(grams, Food, grams.c.food_id == Food.id)
+        .cte('foods_in_range')
+    )
+
+    parts = []
+    for group in ('macros', *DOCUMENT_FIELDS):
+        entries = entries_of(foods.c[group]).alias(f'{group}_entries')
+        is_numeric, value = numeric_value(entries)
+        parts.append(
+            select(literal(group).label('nutrient_group'), entries.c.key, func.sum(foods.c.factor * value))
+            .select_from(foods)
+            .join(entries, true())
+            .where(is_numeric)
+            .group_by(entries.c.key)
+        )
+    return union_all(*parts)
+
+
+async def get_nutrient_totals(db: AsyncSession, user_id: int, start_day: Optional[date] = None,
+                              end_day: Optional[date] = None) -> dict:
+    """
+    Nährstoff-Summen aller Konsum-Logs von start_day bis end_day (inklusive, Tage in der
+    Zeitzone des Benutzers, ohne Angabe: heute). Gerundet auf zwei Nachkommastellen.
+    """
+    tz = await rollup_crud.user_timezone(db, user_id)
+    end_day = end_day or datetime.now(ZoneInfo(tz)).date()
+    start_day = start_day or end_day
+    if start_day > end_day:
+        raise ValueError("'from' must not be after 'to'")
+    start, end = utc_range(start_day, end_day, tz)
+
+    totals = {'from_date': start_day, 'to_date': end_day, 'macros': {}, **{field: {} for field in DOCUMENT_FIELDS}}
+    result = await db.execute(_nutrient_query(db.bind.dialect.name, user_id, start, end))
+    for group, key, total in result.all():
+        totals[group][key] = round(float(total or 0), 2)
+    return totals
@@ -1,7 +1,7 @@
 import { Auth_Component } from './components/Auth.js';
 import { Entity_Management_Component } from './components/Entity_Management.js';
 import { Profile_Component } from './components/Profile.js';
-import { Dashboard_Service } from './services/Dashboard_Service.js';
+import { api_fetch, Auth_Error } from './services/api.js';
 import { State_Service } from './services/State_Service.js';
 // KORREKTUR: Alle benötigten UI-Funktionen werden importiert
 import './DataTable.js';
@@ -44,15 +44,19 @@ async function show_view(view_name) {
  * Updates the dashboard UI based on the current state and selected period.
  * @param {string} period - The time period ('day', 'week', 'month', 'year').
  */
-function update_dashboard(period) {
+async function update_dashboard(period) {
     if (!dom.dashboard) return;
-    const allData = State_Service.get_local_state();
-    if (!allData) return;
-    const dashboard_data = Dashboard_Service.get_dashboard_data(period, allData);
+    try {
+        // Die Aggregation passiert serverseitig, geladen werden nur die Summen pro Bucket.
+        const dashboard_data = await api_fetch(`/api/dashboard?period=${period}`);
 
-    // KORREKTUR: Ruft die ausgelagerten UI-Funktionen auf.
-    update_dashboard_cards(dom.dashboard, dashboard_data);
-    render_chart(dom.dashboard.chart_canvas, dashboard_data);
+        // KORREKTUR: Ruft die ausgelagerten UI-Funktionen auf.
+        update_dashboard_cards(dom.dashboard, dashboard_data);
+        render_chart(dom.dashboard.chart_canvas, dashboard_data);
+    } catch (error) {
+        if (error instanceof Auth_Error) return logout();
+        console.error("Dashboard could not be loaded:", error);
+    }
 }
 
 /**
@@ -87,7 +91,7 @@ async function initialize_app() {
         Entity_Management_Component.init(dom, update_dashboard);
 
         // Initial dashboard render
-        update_dashboard("week");
+        await update_dashboard("week");
         
         // Bind dashboard period selector
         if (dom.dashboard.period_selector) {
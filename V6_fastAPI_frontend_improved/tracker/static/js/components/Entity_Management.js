@@ -4,6 +4,12 @@ import { clear_modal_error, show_modal_error, show_toast } from '../ui.js';
 
 let _dom, _update_dashboard;
 let choices_instance = null;
+let food_search_timer = null;
+
+// Food-Picker: Treffer kommen von /api/foods/search (serverseitig gerankt), statt im
+// kompletten lokalen Katalog zu filtern
+const FOOD_SEARCH_DELAY_MS = 200;
+const FOOD_SEARCH_LIMIT = 20;
 
 function get_entity_label(entity) {
     const labels = {
@@ -80,6 +86,26 @@ async function save_item(entity, id) {
     }
 }
 
+function attach_food_search(select_element) {
+    select_element.addEventListener('search', (event) => {
+        clearTimeout(food_search_timer);
+        const query = event.detail.value.trim();
+        if (!query) return;
+        food_search_timer = setTimeout(async () => {
+            try {
+                const params = new URLSearchParams({ q: query, limit: FOOD_SEARCH_LIMIT });
+                const foods = await api_fetch(`/api/foods/search?${params}`);
+                if (!choices_instance) return;
+                const choices = foods.map(f => ({ value: String(f.id), label: f.name }));
+                choices_instance.setChoices(choices, 'value', 'label', true);
+            } catch (error) {
+                if (error instanceof Auth_Error) return window.app.logout();
+                show_modal_error(_dom.modal.element, error.message);
+            }
+        }, FOOD_SEARCH_DELAY_MS);
+    });
+}
+
 async function delete_item(entity, id) {
     const label = get_entity_label(entity);
     _dom.modal.confirm_message.textContent = `Sind Sie sicher, dass Sie "${label}" löschen möchten?`;
@@ -110,6 +136,7 @@ async function delete_item(entity, id) {
 }
 
 function open_modal(entity, id = null) {
+    clearTimeout(food_search_timer);
     if (choices_instance) choices_instance.destroy();
     clear_modal_error(_dom.modal.element);
     
@@ -127,7 +154,13 @@ function open_modal(entity, id = null) {
     
     const select_element = _dom.modal.form.querySelector('select');
     if (select_element) {
-        choices_instance = new Choices(select_element, { searchPlaceholderValue: 'Suchen...', itemSelectText: 'Auswählen', shouldSort: false });
+        const is_food_picker = select_element.id === 'form-food_id';
+        choices_instance = new Choices(select_element, {
+            searchPlaceholderValue: 'Suchen...', itemSelectText: 'Auswählen', shouldSort: false,
+            // Beim Food-Picker filtert der Server, Choices zeigt die Treffer nur an
+            searchChoices: !is_food_picker
+        });
+        if (is_food_picker) attach_food_search(select_element);
     }
 
     if (id) {
@@ -30,7 +30,9 @@ async function handle_profile_submit(e) {
         height_cm: _dom.profile.height.value ? parseInt(_dom.profile.height.value, 10) : null,
         weight_kg: _dom.profile.weight.value ? parseFloat(_dom.profile.weight.value) : null,
         tracking_start_date: _dom.profile.start_date.value || null,
-        balance_goal_kcal: _dom.profile.balance_goal.value ? parseInt(_dom.profile.balance_goal.value, 10) : null
+        balance_goal_kcal: _dom.profile.balance_goal.value ? parseInt(_dom.profile.balance_goal.value, 10) : null,
+        // Tagesgrenzen im Dashboard richten sich nach der Zeitzone des Browsers
+        timezone: Intl.DateTimeFormat().resolvedOptions().timeZone || null
     };
 
     try {
@@ -1,24 +1,43 @@
 import { api_fetch, Auth_Error } from './api.js';
 
 const CACHE_KEY = 'app_data_cache';
+const ENTITY_NAMES = ['foods', 'exercise_types', 'consumption_logs', 'activity_logs'];
 
 // Das In-Memory-Abbild des Caches für schnellen Zugriff.
 let state = null;
 
 /**
- * Schreibt den aktuellen In-Memory-State in den Session Storage,
- * um ihn bei einem Refresh der Seite wiederherstellen zu können.
+ * Liest die Benutzer-ID (Claim 'sub') aus dem gespeicherten JWT, ohne ihn zu prüfen.
+ * Der Cache im Local Storage überlebt einen Benutzerwechsel im selben Browser und
+ * wird deshalb nur für denselben Benutzer weiterverwendet.
+ * @private
+ * @returns {string|null} Die Benutzer-ID oder null ohne (lesbaren) Token.
+ */
+const _current_user_id = () => {
+    const token = localStorage.getItem("jwt_token");
+    if (!token) return null;
+    try {
+        const payload = token.split('.')[1].replace(/-/g, '+').replace(/_/g, '/');
+        return String(JSON.parse(atob(payload)).sub ?? '') || null;
+    } catch (error) {
+        return null;
+    }
+};
+
+/**
+ * Schreibt den aktuellen In-Memory-State in den Local Storage,
+ * um ihn bei einem Refresh oder in einem neuen Tab per Delta-Sync weiterzuverwenden.
  * @private
  */
 const _commit = () => {
     if (state) {
-        sessionStorage.setItem(CACHE_KEY, JSON.stringify(state));
+        localStorage.setItem(CACHE_KEY, JSON.stringify(state));
     }
 };
 
 /**
  * Lädt die gesamten Anwendungsdaten vom neuen Backend-Endpunkt.
- * Dies sollte nur einmal pro Sitzung geschehen.
+ * Dies ist nur ohne gültigen Cache nötig, sonst reicht der Delta-Sync.
  * @private
  * @returns {Promise<object|null>} Die geladenen Daten oder null bei einem Fehler.
  */
@@ -31,6 +50,8 @@ const _fetch_and_init_local_state = async () => {
             consumption_logs: data.consumption_logs || [],
             activity_logs: data.activity_logs || [],
             user_profile: data.user_profile || {},
+            version: data.version || 0,
+            user_id: _current_user_id(),
         };
         _commit();
         console.log("State successfully fetched from server and cached.");
@@ -46,18 +67,67 @@ const _fetch_and_init_local_state = async () => {
     }
 };
 
+/**
+ * Wendet die Änderungen seit der gecachten Version auf den State an
+ * (geänderte Einträge ersetzen, gelöschte entfernen).
+ * @private
+ * @param {object} changes - Antwort von /api/tracking-data/changes.
+ */
+const _apply_changes = (changes) => {
+    for (const entity_name of ENTITY_NAMES) {
+        const deleted_ids = new Set(changes.deleted[entity_name] || []);
+        const changed = new Map((changes[entity_name] || []).map(item => [item.id, item]));
+        state[entity_name] = (state[entity_name] || [])
+            .filter(item => !deleted_ids.has(item.id) && !changed.has(item.id))
+            .concat([...changed.values()]);
+    }
+    if (changes.user_profile) {
+        state.user_profile = changes.user_profile;
+    }
+    state.version = changes.version;
+};
+
+/**
+ * Holt nur die Änderungen seit der gecachten Version vom Server.
+ * @private
+ * @returns {Promise<boolean>} true, wenn der gecachte State aktualisiert wurde,
+ * false, wenn komplett neu geladen werden muss.
+ */
+const _sync_local_state = async () => {
+    if (!state || typeof state.version !== 'number') return false;
+    try {
+        const changes = await api_fetch(`/api/tracking-data/changes?since=${state.version}`);
+        // Server-Version kleiner als unsere: Datenbank wurde zurückgesetzt
+        if (changes.version < state.version) return false;
+        _apply_changes(changes);
+        _commit();
+        return true;
+    } catch (error) {
+        // Auth-Fehler werden beim anschließenden vollständigen Laden behandelt
+        console.warn("Delta sync failed, falling back to full fetch.", error);
+        return false;
+    }
+};
+
 export const State_Service = {
     /**
-     * Initialisiert den State. Versucht zuerst, ihn aus dem Session-Cache zu laden.
-     * Wenn kein Cache vorhanden ist, werden die Daten vom Server geholt.
+     * Initialisiert den State. Ist ein Cache desselben Benutzers vorhanden, werden nur die
+     * Änderungen seit dessen Version geholt. Ohne (gültigen) Cache werden alle Daten vom Server geladen.
      * @returns {Promise<object>} Den initialisierten Anwendungsstatus.
      */
     async init_state_service() {
-        const cached_data = sessionStorage.getItem(CACHE_KEY);
+        const cached_data = localStorage.getItem(CACHE_KEY);
         if (cached_data) {
             state = JSON.parse(cached_data);
-            console.log("State initialized from cache.");
-            return state;
+            const user_id = _current_user_id();
+            if (!user_id || state.user_id !== user_id) {
+                // Cache eines anderen (oder unbekannten) Benutzers: verwerfen, nie anzeigen
+                state = null;
+                localStorage.removeItem(CACHE_KEY);
+            } else if (await _sync_local_state()) {
+                console.log("State initialized from cache and synced with server.");
+                return state;
+            }
         }
         return await _fetch_and_init_local_state();
     },
@@ -67,7 +137,7 @@ export const State_Service = {
      */
     clear_local_state() {
         state = null;
-        sessionStorage.removeItem(CACHE_KEY);
+        localStorage.removeItem(CACHE_KEY);
         console.log("State and cache cleared.");
     },
 
@@ -0,0 +1,66 @@
+import mimetypes
+import os
+from starlette.datastructures import Headers, QueryParams
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import StaticFiles, NotModifiedResponse
+from starlette.types import Scope
+
+# Reihenfolge = Präferenz, falls der Client beides akzeptiert
+PRECOMPRESSED_VARIANTS = (("br", ".br"), ("gzip", ".gz"))
+
+# Dateien mit ?v=<hash> ändern sich nie (neuer Inhalt -> neuer Hash), alles andere wird revalidiert
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE_CONTROL = "no-cache"
+
+
+def _accepted_encodings(request_headers: Headers) -> set[str]:
+    accept_encoding = request_headers.get("accept-encoding", "")
+    encodings = set()
+    for part in accept_encoding.split(","):
+        encoding, _, params = part.strip().partition(";")
+        if encoding and params.replace(" ", "") != "q=0":
+            encodings.add(encoding.lower())
+    return encodings
+
+
+class PrecompressedStaticFiles(StaticFiles):
+    """
+    StaticFiles, die vorkomprimierte Varianten (`datei.br` / `datei.gz`, erzeugt von
+    precompress_static.py) direkt ausliefern, statt bei jedem Request zu komprimieren.
+    Eine Variante wird nur genutzt, wenn sie nicht älter als das Original ist.
+    """
+
+    def file_response(self, full_path, stat_result: os.stat_result, scope: Scope, status_code: int = 200) -> Response:
+        request_headers = Headers(scope=scope)
+        response = None
+
+        accepted = _accepted_encodings(request_headers)
+        for encoding, suffix in PRECOMPRESSED_VARIANTS:
+            if encoding not in accepted:
+                continue
+            variant_path = f"{full_path}{suffix}"
+            try:
+                variant_stat = os.stat(variant_path)
+            except OSError:
+                continue
+            if variant_stat.st_mtime < stat_result.st_mtime:
+                continue
+            media_type = mimetypes.guess_type(str(full_path))[0] or "text/plain"
+            response = FileResponse(
+                variant_path,
+                status_code=status_code,
+                stat_result=variant_stat,
+                media_type=media_type,
+                headers={"Content-Encoding": encoding},
+            )
+            if self.is_not_modified(response.headers, request_headers):
+                response = NotModifiedResponse(response.headers)
+            break
+
+        if response is None:
+            response = super().file_response(full_path, stat_result, scope, status_code)
+
+        response.headers["Vary"] = "Accept-Encoding"
+        versioned = "v" in QueryParams(scope.get("query_string", b""))
+        response.headers["Cache-Control"] = IMMUTABLE_CACHE_CONTROL if versioned else REVALIDATE_CACHE_CONTROL
+        return response